@@ -0,0 +1,118 @@
+"""
+Benchmark the NumPy correlation engine against DataFrame.corr().
+
+For every number of columns, times pandas and the engine (float64 and
+float32 products) for Pearson and Spearman correlation, on dense data
+and with missing values (pairwise-complete), and checks that the
+results agree. Exits with status 1 if a difference exceeds the
+tolerance of its precision.
+
+Usage:
+    python -m benchmarks.bench_correlation --rows 100000 --columns 30 100 200
+"""
+import argparse
+import sys
+import timeit
+import numpy as np
+import pandas as pd
+from src.transform.correlation_engine import correlation_matrix
+
+# Largest difference to pandas accepted, per precision of the products
+TOLERANCE = {"float64": 1e-9, "float32": 1e-4}
+
+
+def make_frame(
+    rows: int, columns: int, missing: float, seed: int = 0
+) -> pd.DataFrame:
+    # Correlated columns (a few shared factors plus noise); every fourth
+    # column is rounded, so ranks have ties as the integer columns of the
+    # customers do. A tenth of the columns have missing values.
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(rows, 5))
+    values = factors @ rng.normal(size=(5, columns))
+    values += rng.normal(size=(rows, columns))
+    values[:, ::4] = np.round(values[:, ::4])
+    if missing > 0:
+        with_missing = np.arange(columns) % 10 == 0
+        holes = rng.random((rows, columns)) < missing
+        values[holes & with_missing] = np.nan
+    return pd.DataFrame(values, columns=[f"col_{i}" for i in range(columns)])
+
+
+def best_time(func, repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def max_difference(a: pd.DataFrame, b: pd.DataFrame) -> float:
+    # Both must have the same undefined (NaN) entries
+    if not np.array_equal(np.isnan(a.values), np.isnan(b.values)):
+        return np.inf
+    return float(np.nanmax(np.abs(a.values - b.values)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument(
+        "--columns", type=int, nargs="+", default=[30, 100, 200]
+    )
+    parser.add_argument(
+        "--methods",
+        nargs="+",
+        choices=["pearson", "spearman"],
+        default=["pearson", "spearman"],
+    )
+    parser.add_argument(
+        "--missing",
+        type=float,
+        default=0.02,
+        help="Fraction of missing values in the columns that have some",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    failed = False
+    print(
+        f"{'columns':>7} {'method':>8} {'data':>7} {'pandas':>9} "
+        f"{'float64':>9} {'float32':>9} {'speed-up':>8} "
+        f"{'max diff f64':>12} {'max diff f32':>12}"
+    )
+    for columns in args.columns:
+        frames = {
+            "dense": make_frame(args.rows, columns, 0.0),
+            "missing": make_frame(args.rows, columns, args.missing),
+        }
+        for method in args.methods:
+            for data, df in frames.items():
+                expected = df.corr(method=method)
+                pandas_time = best_time(
+                    lambda: df.corr(method=method), args.repeat
+                )
+                times, differences = {}, {}
+                for dtype in TOLERANCE:
+                    result = correlation_matrix(df, method=method, dtype=dtype)
+                    differences[dtype] = max_difference(expected, result)
+                    times[dtype] = best_time(
+                        lambda: correlation_matrix(
+                            df, method=method, dtype=dtype
+                        ),
+                        args.repeat,
+                    )
+                    if differences[dtype] > TOLERANCE[dtype]:
+                        failed = True
+                print(
+                    f"{columns:>7} {method:>8} {data:>7} "
+                    f"{pandas_time:>8.3f}s {times['float64']:>8.3f}s "
+                    f"{times['float32']:>8.3f}s "
+                    f"{pandas_time / times['float64']:>7.1f}x "
+                    f"{differences['float64']:>12.1e} "
+                    f"{differences['float32']:>12.1e}"
+                )
+
+    if failed:
+        print("Results differ from pandas beyond the tolerance")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
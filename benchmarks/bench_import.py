@@ -0,0 +1,137 @@
+"""
+Benchmark the import time of the ETL command line with -X importtime.
+
+Importing scripts.run_etl must stay cheap: pandas, SQLAlchemy and the
+pipeline modules are only imported by the stages that use them, and
+loggers open their files on the first record. Exits with status 1 when
+the import takes longer than the budget or pulls in a heavy dependency.
+
+Usage:
+    python -m benchmarks.bench_import --budget 100
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget for importing the CLI, in milliseconds. Interpreter start-up
+# (site, encodings) is not part of it.
+IMPORT_BUDGET_MS = 100.0
+
+# Packages the CLI must not import before a stage runs
+HEAVY_MODULES = ["pandas", "numpy", "sqlalchemy", "psycopg2", "pyarrow"]
+
+
+class ImportProfile(NamedTuple):
+    module: str
+    total_ms: float
+    # Cumulative time of every module it imported, in milliseconds
+    modules: Dict[str, float]
+
+    def heavy_imports(self) -> List[str]:
+        return [name for name in HEAVY_MODULES if name in self.modules]
+
+    def slowest(self, count: int) -> List[tuple]:
+        return sorted(
+            self.modules.items(), key=lambda item: item[1], reverse=True
+        )[:count]
+
+
+def parse_importtime(output: str) -> List[Tuple[str, float, int]]:
+    """
+    Parse the -X importtime report, lines like
+        import time:       347 |      22033 |   certifi
+    A module is reported after the modules it imports, which are
+    indented one level deeper.
+
+    Returns:
+        List[Tuple[str, float, int]]: Name, cumulative import time in ms
+        and nesting depth of every module, in report order.
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            entries.append((name.strip(), int(cumulative) / 1000, depth))
+    return entries
+
+
+def profile_import(module: str) -> ImportProfile:
+    """
+    Import a module in a fresh interpreter and profile the import.
+
+    Raises:
+        RuntimeError: If the import fails.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    # The module's own imports are the entries since the previous
+    # top-level one (interpreter start-up, such as site)
+    entries = parse_importtime(result.stderr)
+    end = max(
+        (i for i, (name, _, depth) in enumerate(entries) if depth == 0),
+        default=-1,
+    )
+    start = end
+    while start > 0 and entries[start - 1][2] > 0:
+        start -= 1
+    modules = {name: ms for name, ms, _ in entries[start:end + 1]}
+    total_ms = entries[end][1] if end >= 0 else 0.0
+    return ImportProfile(module, total_ms, modules)
+
+
+def best_profile(module: str, repeat: int) -> ImportProfile:
+    # The fastest run is the least disturbed by the rest of the machine
+    return min(
+        (profile_import(module) for _ in range(repeat)),
+        key=lambda profile: profile.total_ms,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="scripts.run_etl")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=IMPORT_BUDGET_MS,
+        help="Maximum import time in milliseconds",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    profile = best_profile(args.module, args.repeat)
+    print(
+        f"import {profile.module}: {profile.total_ms:.1f} ms "
+        f"(budget {args.budget:.0f} ms, best of {args.repeat})"
+    )
+    for name, cumulative in profile.slowest(args.top):
+        print(f"{cumulative:>9.1f} ms  {name}")
+
+    failed = False
+    heavy = profile.heavy_imports()
+    if heavy:
+        print(f"Heavy dependencies imported: {', '.join(heavy)}")
+        failed = True
+    if profile.total_ms > args.budget:
+        print(f"Over budget by {profile.total_ms - args.budget:.1f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark the correlation load path: DataFrame.to_sql INSERTs against
+COPY ... FROM STDIN.
+
+Needs a reachable target database configured in .env.dev/.env.test.
+Rows are written to a scratch table which is dropped afterwards.
+
+Usage:
+    python -m benchmarks.bench_load dev --rows 100000 --batch-size 50000
+"""
+import argparse
+import timeit
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from config.env_config import setup_env
+from config.db_config import load_db_config, load_pool_config
+from src.utils.db_utils import db_connection
+from src.load.bulk_copy import copy_dataframe_to_table, COPY_BATCH_SIZE
+from src.load.load_correlation import TARGET_SCHEMA, correlation_dtypes
+
+BENCH_TABLE = "rp_capstone_load_bench"
+
+
+def make_frame(rows: int, columns: int) -> pd.DataFrame:
+    # Same layout as the correlation table: a feature name plus floats
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        rng.uniform(-1, 1, (rows, columns)),
+        columns=[f"col_{i}" for i in range(columns)],
+    )
+    df.insert(0, "feature", [f"feature_{i}" for i in range(rows)])
+    return df
+
+
+def load_to_sql(connection, df: pd.DataFrame, batch_size: int) -> None:
+    df.to_sql(
+        BENCH_TABLE,
+        connection,
+        schema=TARGET_SCHEMA,
+        if_exists="replace",
+        dtype=correlation_dtypes(df.columns),
+        index=False,
+    )
+    connection.commit()
+
+
+def load_copy(connection, df: pd.DataFrame, batch_size: int) -> None:
+    copy_dataframe_to_table(
+        connection,
+        df,
+        BENCH_TABLE,
+        TARGET_SCHEMA,
+        dtype=correlation_dtypes(df.columns),
+        if_exists="replace",
+        batch_size=batch_size,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("env", help="Environment to run in, e.g. dev")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--columns", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=COPY_BATCH_SIZE)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup_env(["bench_load", args.env])
+    df = make_frame(args.rows, args.columns)
+    connection_details = load_db_config()["target_database"]
+
+    print(f"Loading {args.rows} rows x {args.columns + 1} columns")
+    with db_connection(
+        connection_details, **load_pool_config()
+    ) as connection:
+        try:
+            for name, method in [
+                ("to_sql", load_to_sql),
+                ("copy", load_copy),
+            ]:
+                times = []
+                for _ in range(args.repeat):
+                    start = timeit.default_timer()
+                    method(connection, df, args.batch_size)
+                    times.append(timeit.default_timer() - start)
+                best = min(times)
+                print(
+                    f"{name:>7}: best {best:.3f} s "
+                    f"({args.rows / best:,.0f} rows/s) "
+                    f"over {args.repeat} runs"
+                )
+        finally:
+            connection.execute(
+                text(
+                    f'DROP TABLE IF EXISTS "{TARGET_SCHEMA}"."{BENCH_TABLE}"'
+                )
+            )
+            connection.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Compare the memory used by the raw customers when pandas infers the
+dtypes against the registered compact schema.
+
+Usage:
+    python -m benchmarks.bench_memory
+"""
+import pandas as pd
+from config.schema_config import CUSTOMER_DTYPES
+from src.extract.extract_all import FILE_PATH
+
+
+def main():
+    inferred = pd.read_csv(FILE_PATH)
+    compact = pd.read_csv(FILE_PATH, dtype=CUSTOMER_DTYPES)
+
+    before = inferred.memory_usage(deep=True)
+    after = compact.memory_usage(deep=True)
+
+    report = pd.DataFrame(
+        {
+            "inferred_dtype": inferred.dtypes.astype(str),
+            "inferred_bytes": before.drop("Index"),
+            "schema_dtype": compact.dtypes.astype(str),
+            "schema_bytes": after.drop("Index"),
+        }
+    )
+    print(report.to_string())
+    print(
+        f"\nTotal: {before.sum() / 1e6:.1f} MB inferred, "
+        f"{after.sum() / 1e6:.1f} MB with schema "
+        f"({before.sum() / after.sum():.1f}x smaller)"
+    )
+
+
+if __name__ == "__main__":
+    main()
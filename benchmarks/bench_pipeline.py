@@ -0,0 +1,256 @@
+"""
+Benchmark the ETL stages on synthetic data at several scales.
+
+For every scale a schema-faithful medical_insurance.csv is generated
+(see benchmarks/synthetic_data.py) and each stage is timed on it:
+extract_all, every step of clean_customers, produce_correlation_table,
+save_dataframe_to_csv and, when an environment is given, the
+correlation load. Wall time, throughput and peak RSS are written to a
+JSON report, which can be compared against the report of another
+version with --compare.
+
+Outputs go to a scratch directory, data/raw and data/processed are not
+touched.
+
+Usage:
+    python -m benchmarks.bench_pipeline --rows 100000 1000000 10000000
+    python -m benchmarks.bench_pipeline --output new.json --compare old.json
+    python -m benchmarks.bench_pipeline dev   # also time the load
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import timeit
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import psutil
+
+import src.extract.extract_all as extract_all_module
+import src.transform.transform_all as transform_all_module
+from benchmarks.synthetic_data import write_synthetic_csv
+from src.transform.encoding import encode_categoricals
+from src.utils.file_utils import (
+    save_dataframe_to_csv,
+    save_dataframe_to_parquet,
+)
+from src.utils.logging_utils import PeakRSS
+
+SCALES = [100_000, 1_000_000, 10_000_000]
+
+
+def run_stage(
+    stages: List[Dict[str, Any]], name: str, rows: int, func: Callable
+) -> Any:
+    """
+    Time one stage, record it in stages and return its result.
+
+    Args:
+        stages: Report entries of the current scale.
+        name: Stage name.
+        rows: Rows processed by the stage, for the throughput.
+        func: Stage to run, without arguments.
+    """
+    with PeakRSS() as rss:
+        start = timeit.default_timer()
+        result = func()
+        seconds = timeit.default_timer() - start
+
+    stages.append(
+        {
+            "stage": name,
+            "rows": rows,
+            "seconds": round(seconds, 4),
+            "rows_per_second": round(rows / seconds) if seconds else None,
+            "peak_rss_mb": round(rss.peak / 1e6, 1),
+        }
+    )
+    print(
+        f"{rows:>10} rows  {name:<28} {seconds:8.3f} s  "
+        f"{rows / max(seconds, 1e-9):>12,.0f} rows/s  "
+        f"{rss.peak / 1e6:8.1f} MB"
+    )
+    return result
+
+
+@contextmanager
+def redirect_io(raw_dir: str, output_dir: str) -> Iterator[None]:
+    # Point extraction and transform outputs at the scratch directories
+    saved = extract_all_module.RAW_DIR, transform_all_module.OUTPUT_DIR
+    extract_all_module.RAW_DIR = raw_dir
+    transform_all_module.OUTPUT_DIR = output_dir
+    try:
+        yield
+    finally:
+        extract_all_module.RAW_DIR, transform_all_module.OUTPUT_DIR = saved
+
+
+def bench_scale(rows: int, work_dir: str, load: bool) -> Dict[str, Any]:
+    """Generate the data for one scale and time every stage on it."""
+    raw_dir = os.path.join(work_dir, str(rows))
+    output_dir = os.path.join(work_dir, f"{rows}_processed")
+    os.makedirs(raw_dir, exist_ok=True)
+    csv_path = os.path.join(raw_dir, "medical_insurance.csv")
+    if not os.path.exists(csv_path):
+        print(f"Generating {rows} rows...")
+        write_synthetic_csv(rows, csv_path)
+
+    stages: List[Dict[str, Any]] = []
+    with redirect_io(raw_dir, output_dir):
+        customers = run_stage(
+            stages, "extract_all", rows, extract_all_module.extract_all
+        )
+        customers = run_stage(
+            stages,
+            "trim_values",
+            len(customers),
+            lambda: transform_all_module.trim_values(customers),
+        )
+        customers = run_stage(
+            stages,
+            "drop_duplicates",
+            len(customers),
+            lambda: transform_all_module.drop_duplicates(customers),
+        )
+        customers = run_stage(
+            stages,
+            "encode_categoricals",
+            len(customers),
+            lambda: encode_categoricals(customers),
+        )
+        run_stage(
+            stages,
+            "save_dataframe_to_parquet",
+            len(customers),
+            lambda: save_dataframe_to_parquet(
+                customers,
+                output_dir,
+                transform_all_module.FILE_NAME_CLEAN_CUSTOMERS,
+            ),
+        )
+        correlation_table = run_stage(
+            stages,
+            "produce_correlation_table",
+            len(customers),
+            lambda: transform_all_module.produce_correlation_table(
+                customers
+            ),
+        )
+        run_stage(
+            stages,
+            "save_dataframe_to_csv",
+            len(customers),
+            lambda: save_dataframe_to_csv(
+                customers,
+                output_dir,
+                transform_all_module.FILE_NAME_CLEAN_CUSTOMERS_CSV,
+            ),
+        )
+
+    if load:
+        # Imported here so the benchmark runs without a database driver
+        from src.load.load_correlation import load_correlation_exec
+
+        run_stage(
+            stages,
+            "load_correlation",
+            len(correlation_table),
+            lambda: load_correlation_exec(correlation_table),
+        )
+
+    return {
+        "rows": rows,
+        "columns": customers.shape[1],
+        "csv_bytes": os.path.getsize(csv_path),
+        "stages": stages,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_reports(old: Dict[str, Any], new: Dict[str, Any]) -> None:
+    # Print the time of every stage in new relative to old
+    old_times = {
+        (scale["rows"], stage["stage"]): stage["seconds"]
+        for scale in old["results"]
+        for stage in scale["stages"]
+    }
+    print(f"\nCompared with {old.get('git_commit')} (new / old time):")
+    for scale in new["results"]:
+        for stage in scale["stages"]:
+            before = old_times.get((scale["rows"], stage["stage"]))
+            if not before:
+                continue
+            print(
+                f"{scale['rows']:>10} rows  {stage['stage']:<28} "
+                f"{before:8.3f} s -> {stage['seconds']:8.3f} s  "
+                f"x{stage['seconds'] / before:.2f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "env",
+        nargs="?",
+        help="Environment with a target database, to time the load",
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=SCALES)
+    parser.add_argument(
+        "--data-dir",
+        help="Keep the generated CSV files here and reuse them",
+    )
+    parser.add_argument("--output", default="benchmark_report.json")
+    parser.add_argument("--compare", help="Earlier report to compare to")
+    args = parser.parse_args()
+
+    if args.env:
+        from config.env_config import setup_env
+
+        setup_env(["bench_pipeline", args.env])
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "cpu_count": os.cpu_count(),
+        "total_memory_mb": round(psutil.virtual_memory().total / 1e6),
+        "results": [],
+    }
+
+    with tempfile.TemporaryDirectory() as scratch:
+        work_dir = args.data_dir or scratch
+        for rows in args.rows:
+            report["results"].append(
+                bench_scale(rows, work_dir, load=bool(args.env))
+            )
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare_reports(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Generate a synthetic medical_insurance.csv with the same 54 columns,
+dtypes and category labels as the real dataset.
+
+Values are random but within realistic ranges, a share of alcohol_freq
+answers is missing and a share of rows is repeated, so every cleaning
+step has work to do. Rows are written in blocks, so 10M rows never need
+to be in memory at once.
+
+Usage:
+    python -m benchmarks.synthetic_data 1000000 /tmp/medical_insurance.csv
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from config.encoding_config import ENCODINGS
+from config.schema_config import (
+    CUSTOMER_DTYPES,
+    FLAG_COLUMNS,
+    MEASUREMENT_COLUMNS,
+)
+
+BLOCK_SIZE = 500_000
+DUPLICATE_SHARE = 0.01
+MISSING_ALCOHOL_SHARE = 0.3
+
+CATEGORIES = {
+    "sex": ["Female", "Male", "Other"],
+    "region": ["North", "South", "East", "West", "Central"],
+    "urban_rural": ["Urban", "Suburban", "Rural"],
+    "marital_status": ["Single", "Married", "Divorced", "Widowed"],
+    "employment_status": [
+        "Employed",
+        "Self-employed",
+        "Unemployed",
+        "Retired",
+    ],
+    "plan_type": ["HMO", "PPO", "EPO", "POS"],
+    "network_tier": ["Bronze", "Silver", "Gold", "Platinum"],
+    **{col: spec["categories"] for col, spec in ENCODINGS.items()},
+}
+
+# (low, high) for uniform measurements
+MEASUREMENT_RANGES = {
+    "bmi": (16.0, 45.0),
+    "systolic_bp": (90.0, 180.0),
+    "diastolic_bp": (55.0, 110.0),
+    "ldl": (50.0, 220.0),
+    "hba1c": (4.5, 11.0),
+    "provider_quality": (1.0, 5.0),
+    "risk_score": (0.0, 1.0),
+}
+
+PROCEDURE_COLUMNS = [
+    "proc_imaging_count",
+    "proc_surgery_count",
+    "proc_physio_count",
+    "proc_consult_count",
+    "proc_lab_count",
+]
+
+
+def make_block(
+    rows: int, first_id: int, rng: np.random.Generator
+) -> pd.DataFrame:
+    """
+    Build one block of synthetic customers.
+
+    Args:
+        rows: Number of rows in the block.
+        first_id: person_id of the first row.
+        rng: Random generator, shared between blocks.
+
+    Returns:
+        DataFrame with the columns of medical_insurance.csv, in order.
+    """
+    age = rng.integers(18, 90, rows)
+    household_size = rng.integers(1, 8, rows)
+    flags = {col: rng.binomial(1, 0.15, rows) for col in FLAG_COLUMNS}
+    claims_count = rng.poisson(1.5, rows)
+    avg_claim_amount = rng.gamma(2.0, 600.0, rows).round(2)
+    annual_medical_cost = (rng.gamma(2.0, 1500.0, rows) + age * 40).round(2)
+    annual_premium = (annual_medical_cost * 0.7 + 400).round(2)
+
+    block = pd.DataFrame(
+        {
+            "person_id": np.arange(first_id, first_id + rows),
+            "age": age,
+            "household_size": household_size,
+            "dependents": np.maximum(household_size - 2, 0),
+            "income": (rng.lognormal(10.7, 0.6, rows)).round(2),
+            "visits_last_year": rng.poisson(3, rows),
+            "hospitalizations_last_3yrs": rng.poisson(0.3, rows),
+            "days_hospitalized_last_3yrs": rng.poisson(1, rows),
+            "medication_count": rng.poisson(2, rows),
+            "deductible": rng.choice([500, 1000, 2000, 5000], rows),
+            "copay": rng.choice([10, 20, 30, 50], rows),
+            "policy_term_years": rng.integers(1, 11, rows),
+            "policy_changes_last_2yrs": rng.integers(0, 4, rows),
+            "annual_medical_cost": annual_medical_cost,
+            "annual_premium": annual_premium,
+            "monthly_premium": (annual_premium / 12).round(2),
+            "claims_count": claims_count,
+            "avg_claim_amount": avg_claim_amount,
+            "total_claims_paid": (avg_claim_amount * claims_count).round(2),
+            "chronic_count": sum(flags[col] for col in FLAG_COLUMNS[:10]),
+            **flags,
+            **{col: rng.poisson(0.5, rows) for col in PROCEDURE_COLUMNS},
+            **{
+                col: rng.uniform(*MEASUREMENT_RANGES[col], rows).round(2)
+                for col in MEASUREMENT_COLUMNS
+            },
+            **{
+                col: rng.choice(labels, rows)
+                for col, labels in CATEGORIES.items()
+            },
+        }
+    )
+    block["alcohol_freq"] = block["alcohol_freq"].mask(
+        rng.random(rows) < MISSING_ALCOHOL_SHARE
+    )
+
+    # Repeat a share of the rows, as seen in the raw drops
+    picked = rng.choice(rows, 2 * int(rows * DUPLICATE_SHARE), replace=False)
+    sources, targets = np.split(picked, 2)
+    order = np.arange(rows)
+    order[targets] = sources
+    block = block.iloc[order].reset_index(drop=True)
+
+    return block[list(CUSTOMER_DTYPES)]
+
+
+def write_synthetic_csv(rows: int, path: str, seed: int = 0) -> None:
+    """
+    Write a synthetic medical_insurance.csv.
+
+    Args:
+        rows: Number of rows to write.
+        path: Destination file path.
+        seed: Seed of the random generator, for repeatable files.
+    """
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, BLOCK_SIZE):
+        block = make_block(min(BLOCK_SIZE, rows - start), start + 1, rng)
+        block.to_csv(
+            path,
+            mode="w" if start == 0 else "a",
+            header=start == 0,
+            index=False,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("rows", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_synthetic_csv(args.rows, args.path, args.seed)
+    print(f"Wrote {args.rows} rows to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
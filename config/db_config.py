@@ -1,7 +1,7 @@
 import os
 import logging
 from src.utils.logging_utils import setup_logger
-from typing import Dict, Literal
+from typing import Dict, Literal, Union
 
 
 # Create a Custom Exception for Database Config errors
@@ -76,3 +76,20 @@ def validate_db_config(config):
                 raise DatabaseConfigError(
                     f"Configuration error: {db_key} {key} is set to 'error'"
                 )
+
+
+def load_pool_config() -> Dict[str, Union[int, bool]]:
+    """
+    Load connection pool settings from environment variables.
+    Every target database gets one pooled engine per process,
+    so these settings apply to all loads and queries.
+
+    :return: Keyword arguments for the SQLAlchemy engine pool.
+    """
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower()
+        in ("1", "true", "yes"),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
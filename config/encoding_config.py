@@ -0,0 +1,49 @@
+# Declarative encodings for categorical columns, applied by
+# src.transform.encoding.encode_categoricals in a single pass.
+#
+# Each entry maps a column to:
+#   categories - the expected labels, in order
+#   codes      - the number each label is encoded as
+#   default    - code for missing values, or None to reject them
+#   dtype      - dtype of the encoded column
+#
+# Unexpected labels are always rejected. To encode another column, e.g.
+# network_tier, add an entry such as:
+#   "network_tier": {
+#       "categories": ["Bronze", "Silver", "Gold", "Platinum"],
+#       "codes": [0, 1, 2, 3],
+#       "default": None,
+#       "dtype": "int8",
+#   },
+# The encoded column is numeric, so it is picked up by the correlation
+# table automatically.
+ENCODINGS = {
+    # Drinking days per month; no answer means does not drink
+    "alcohol_freq": {
+        "categories": ["Occasional", "Weekly", "Daily"],
+        "codes": [2, 7, 30],
+        "default": 0,
+        "dtype": "int8",
+    },
+    # Smoking days per month
+    "smoker": {
+        "categories": ["Never", "Former", "Current"],
+        "codes": [0, 7, 30],
+        "default": None,
+        "dtype": "int8",
+    },
+    # Highest level of education attained
+    "education": {
+        "categories": [
+            "No HS",
+            "HS",
+            "Some College",
+            "Bachelors",
+            "Masters",
+            "Doctorate",
+        ],
+        "codes": [0, 1, 2, 3, 4, 5],
+        "default": None,
+        "dtype": "int8",
+    },
+}
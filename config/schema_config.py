@@ -0,0 +1,119 @@
+import logging
+import pandas as pd
+from typing import Dict, Optional
+from src.utils.logging_utils import setup_logger
+
+# Configure the logger
+logger = setup_logger(__name__, "schema.log", level=logging.DEBUG)
+
+# Explicit dtypes for the 54 columns of medical_insurance.csv.
+# Used when reading the raw data so pandas does not fall back to
+# int64/float64/object for everything:
+#   - yes/no flags          -> int8
+#   - counts                -> int16 (int32 where values can be large)
+#   - low-cardinality text  -> category
+#   - measurements          -> float32 (7 significant digits is plenty)
+#   - money                 -> float64 (cents would be lost in float32)
+FLAG_COLUMNS = [
+    "hypertension",
+    "diabetes",
+    "asthma",
+    "copd",
+    "cardiovascular_disease",
+    "cancer_history",
+    "kidney_disease",
+    "liver_disease",
+    "arthritis",
+    "mental_health",
+    "is_high_risk",
+    "had_major_procedure",
+]
+
+COUNT_COLUMNS = [
+    "age",
+    "household_size",
+    "dependents",
+    "visits_last_year",
+    "hospitalizations_last_3yrs",
+    "days_hospitalized_last_3yrs",
+    "medication_count",
+    "copay",
+    "policy_term_years",
+    "policy_changes_last_2yrs",
+    "claims_count",
+    "chronic_count",
+    "proc_imaging_count",
+    "proc_surgery_count",
+    "proc_physio_count",
+    "proc_consult_count",
+    "proc_lab_count",
+]
+
+CATEGORY_COLUMNS = [
+    "sex",
+    "region",
+    "urban_rural",
+    "education",
+    "marital_status",
+    "employment_status",
+    "smoker",
+    "alcohol_freq",
+    "plan_type",
+    "network_tier",
+]
+
+MEASUREMENT_COLUMNS = [
+    "bmi",
+    "systolic_bp",
+    "diastolic_bp",
+    "ldl",
+    "hba1c",
+    "provider_quality",
+    "risk_score",
+]
+
+MONEY_COLUMNS = [
+    "income",
+    "annual_medical_cost",
+    "annual_premium",
+    "monthly_premium",
+    "avg_claim_amount",
+    "total_claims_paid",
+]
+
+CUSTOMER_DTYPES: Dict[str, str] = {
+    "person_id": "int32",
+    "deductible": "int32",
+    **{col: "int8" for col in FLAG_COLUMNS},
+    **{col: "int16" for col in COUNT_COLUMNS},
+    **{col: "category" for col in CATEGORY_COLUMNS},
+    **{col: "float32" for col in MEASUREMENT_COLUMNS},
+    **{col: "float64" for col in MONEY_COLUMNS},
+}
+
+
+def apply_schema(
+    df: pd.DataFrame, log: Optional[logging.Logger] = None
+) -> pd.DataFrame:
+    """
+    Cast a DataFrame to the registered customer dtypes and log how much
+    memory that saved. Columns that are not in the schema keep their
+    dtype.
+
+    :param df: DataFrame read without the schema.
+    :param log: Logger for the report, this module's by default.
+    :return: DataFrame using the compact dtypes.
+    """
+    before = df.memory_usage(deep=True).sum()
+    dtypes = {
+        col: dtype for col, dtype in CUSTOMER_DTYPES.items() if col in df
+    }
+    df = df.astype(dtypes)
+    after = df.memory_usage(deep=True).sum()
+
+    (log or logger).info(
+        f"Memory usage: {before / 1e6:.1f} MB before schema, "
+        f"{after / 1e6:.1f} MB after "
+        f"({before / max(after, 1):.1f}x smaller)"
+    )
+    return df
@@ -1,48 +1,370 @@
 import os
 import sys
-from config.env_config import setup_env
-from src.extract.extract import extract_data
-from src.utils.logging_utils import setup_logger
-from src.transform.transform import transform_data
-from src.load.load import load_data
+import argparse
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+# Only the standard library is imported here, so --help and argument
+# errors are instant. pandas, SQLAlchemy and the pipeline modules are
+# imported by the stages that use them (see
+# benchmarks/bench_import.py for the import-time budget).
+if TYPE_CHECKING:
+    from src.utils.dag import Stage
+    from src.utils.manifest import RunManifest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGE_CACHE_DIR = os.path.join(PROJECT_ROOT, "data", "cache")
+
+# Code whose source is part of each stage's cache key
+EXTRACT_CODE = ["src/extract", "config/schema_config.py"]
+TRANSFORM_CODE = [
+    "src/transform",
+    "config/encoding_config.py",
+    "src/utils/file_utils.py",
+]
+# Stages of a run, by mode (see build_stages)
+BATCH_STAGE_NAMES = ["extract", "transform", "load"]
+STREAM_STAGE_NAMES = ["extract_and_transform", "load"]
+
+
+def positive_int(value):
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
+    return number
+
+
+def parse_args(argv):
+    """
+    Parse the run_etl command line, e.g.
+        run_etl dev
+        run_etl dev --chunk-size 50000
+        run_etl dev --export-csv
+        run_etl dev --incremental
+        run_etl dev --force transform
+
+    The environment name is validated by setup_env.
+    """
+    parser = argparse.ArgumentParser(
+        prog="run_etl", description="Run the insurance ETL pipeline."
+    )
+    parser.add_argument(
+        "env", nargs="?", help="Environment to run in, e.g. dev or test"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=positive_int,
+        default=None,
+        help="Stream the raw CSV through extract and transform in chunks "
+        "of this many rows instead of loading it all into memory",
+    )
+    parser.add_argument(
+        "--export-csv",
+        action="store_true",
+        help="Also write cleaned_customers.csv next to the Parquet output",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only clean customers that are new or changed since the last "
+        "incremental run and merge them into the existing outputs",
+    )
+    parser.add_argument(
+        "--force",
+        action="append",
+        metavar="STAGE",
+        help="Run this stage (and every later stage) even if its cached "
+        f"output is up to date; one of {', '.join(BATCH_STAGE_NAMES)}, "
+        f"or with --chunk-size {', '.join(STREAM_STAGE_NAMES)}. "
+        "Can be repeated",
+    )
+    args = parser.parse_args(argv[1:])
+    if args.incremental and args.chunk_size:
+        parser.error("--incremental cannot be combined with --chunk-size")
+    stage_names = STREAM_STAGE_NAMES if args.chunk_size else BATCH_STAGE_NAMES
+    for stage in args.force or ():
+        if stage not in stage_names:
+            parser.error(
+                f"argument --force: invalid choice: {stage!r} "
+                f"(choose from {', '.join(stage_names)})"
+            )
+    return args
+
+
+def plan_incremental_run(
+    manifest: "RunManifest", logger
+) -> Tuple[Optional[List[str]], List[str]]:
+    """
+    Decide which raw files an incremental run has to extract.
+
+    Args:
+        manifest (RunManifest): Manifest of the last run.
+        logger: Logger for the decision.
+
+    Returns:
+        Tuple: The files to extract (None when nothing changed and the
+        run can be skipped), and all current raw files.
+    """
+    from src.extract.extract_all import discover_raw_files
+    from src.transform.transform_all import reset_incremental_outputs
+
+    files = [path for path in discover_raw_files() if os.path.exists(path)]
+    changes = manifest.diff_inputs(files)
+    outputs_intact = manifest.outputs_intact()
+    logger.info(
+        f"Raw files: {len(changes.new)} new, {len(changes.changed)} "
+        f"changed, {len(changes.removed)} removed, "
+        f"{len(changes.unchanged)} unchanged"
+    )
+
+    if not changes.any and outputs_intact:
+        return None, files
+    if changes.changed or changes.removed or not outputs_intact:
+        # Customers of changed or removed files cannot be taken out of
+        # the outputs: rebuild them from every raw file
+        logger.info("Rebuilding the outputs from all raw files")
+        reset_incremental_outputs()
+        return files, files
+    return changes.new, files
+
+
+def raw_input_files(files: Optional[List[str]]) -> List[str]:
+    # Raw files a run reads, for the stage cache keys
+    from src.extract.extract_all import discover_raw_files
+
+    files = files or discover_raw_files()
+    return [path for path in files if os.path.exists(path)]
+
+
+def extract_stage(files: Optional[List[str]], logger):
+    from src.extract.extract import extract_data
+    from src.utils.logging_utils import track_stage
+
+    print(f'{"="*200}')
+    logger.info(f'{"="*20} Beginning data extraction phase {"="*20}')
+    print(f'{"="*200}')
+    with track_stage("extract", logger) as stage:
+        extracted_data = extract_data(files)
+        stage.set_output(extracted_data)
+
+    logger.info("Data extraction phase completed")
+    return extracted_data
+
+
+def transform_stage(extracted_data, args, logger):
+    from src.transform.transform import transform_data
+    from src.utils.logging_utils import track_stage
+
+    print(f'{"="*200}')
+    logger.info(f'{"="*20} Beginning data transformation phase {"="*20}')
+    print(f'{"="*200}')
+    with track_stage("transform", logger, extracted_data) as stage:
+        transformed_data = transform_data(
+            extracted_data,
+            export_csv=args.export_csv,
+            incremental=args.incremental,
+        )
+        stage.set_output(transformed_data[0])
+    logger.info(
+        f"Data transformation phase completed. "
+        f"transformed_data: type = {type(transformed_data)}"
+    )
+    return transformed_data
+
+
+def extract_and_transform_stage(args, logger):
+    # Streaming mode: extract and transform are pipelined. The next chunk
+    # is read while the current one is cleaned, and cleaned chunks are
+    # written in the background; the bounded queues between them keep at
+    # most a few chunks in memory
+    from src.extract.extract import extract_data_chunks
+    from src.transform.transform import transform_data_stream
+    from src.utils.logging_utils import track_stage
+    from src.utils.pipeline import prefetch
+
+    print(f'{"="*200}')
+    logger.info(
+        f'{"="*20} Beginning streaming extract and transform phase '
+        f'(chunk size {args.chunk_size}) {"="*20}'
+    )
+    print(f'{"="*200}')
+    with track_stage("extract_and_transform", logger) as stage:
+        correlation_table = transform_data_stream(
+            prefetch(extract_data_chunks(args.chunk_size)),
+            export_csv=args.export_csv,
+        )
+        stage.set_output(correlation_table)
+    logger.info("Streaming extract and transform phase completed")
+    return correlation_table
+
+
+def load_stage(correlation_table, cleaned_customers, logger) -> None:
+    from src.load.load import load_data
+    from src.utils.logging_utils import track_stage
+
+    print(f'{"="*200}')
+    logger.info(f'{"="*20} Beginning loading phase {"="*20}')
+    print(f'{"="*200}')
+
+    with track_stage("load", logger, correlation_table):
+        load_data(correlation_table, cleaned_customers)
+    logger.info("Data load phase completed")
+
+
+def build_stages(
+    args, files: Optional[List[str]], logger
+) -> List["Stage"]:
+    """
+    Declare the pipeline as a DAG of stages.
+
+    Every stage lists the code, settings and input files its result
+    depends on, which make up its cache key, and the files it writes,
+    which must be unchanged for its cached output to be reused (see
+    src.utils.dag). The load is not cached: whether the database still
+    holds what was loaded cannot be told from local files, so it runs
+    on every run (the loads replace or version their tables, so
+    repeating one is safe).
+
+    Args:
+        args: Parsed command line.
+        files (List[str], optional): Raw files to extract, all of them
+            when None.
+        logger: Pipeline logger.
+
+    Returns:
+        List[Stage]: extract, transform and load, or, in streaming mode,
+        extract_and_transform and load.
+    """
+    from src.transform.transform_all import (
+        read_cleaned_customers,
+        transform_output_paths,
+    )
+    from src.utils.dag import Stage
+
+    def transform_outputs():
+        return transform_output_paths(args.export_csv)
+
+    if args.chunk_size:
+        # In streaming mode the customers are never held in memory, so
+        # only the correlation table is loaded
+        return [
+            Stage(
+                "extract_and_transform",
+                lambda: extract_and_transform_stage(args, logger),
+                code=EXTRACT_CODE + TRANSFORM_CODE,
+                config={
+                    "chunk_size": args.chunk_size,
+                    "export_csv": args.export_csv,
+                },
+                inputs=lambda: raw_input_files(None),
+                outputs=transform_outputs,
+            ),
+            Stage(
+                "load",
+                lambda correlation_table: load_stage(
+                    correlation_table, None, logger
+                ),
+                deps=["extract_and_transform"],
+                cache=False,
+            ),
+        ]
+
+    return [
+        # Re-reading the raw CSVs is cheaper than caching their contents
+        Stage(
+            "extract",
+            lambda: extract_stage(files, logger),
+            code=EXTRACT_CODE,
+            inputs=lambda: raw_input_files(files),
+            cache=False,
+        ),
+        Stage(
+            "transform",
+            lambda extracted_data: transform_stage(
+                extracted_data, args, logger
+            ),
+            deps=["extract"],
+            code=TRANSFORM_CODE,
+            config={
+                "export_csv": args.export_csv,
+                "incremental": args.incremental,
+            },
+            outputs=transform_outputs,
+            # The cleaned customers are already saved to Parquet, so
+            # only the correlation table is pickled
+            to_cache=lambda transformed_data: transformed_data[1],
+            from_cache=lambda correlation_table: (
+                read_cleaned_customers(),
+                correlation_table,
+            ),
+        ),
+        Stage(
+            "load",
+            lambda transformed_data: load_stage(
+                transformed_data[1], transformed_data[0], logger
+            ),
+            deps=["transform"],
+            cache=False,
+        ),
+    ]
 
 
 def main():
     # Get the argument from the run_etl command and set up the environment
-    setup_env(sys.argv)
+    args = parse_args(sys.argv)
+    from config.env_config import setup_env
+
+    setup_env(sys.argv[:1] + ([args.env] if args.env else []))
+
+    from src.transform.transform_all import (
+        OUTPUT_DIR,
+        FILE_NAME_RUN_MANIFEST,
+        incremental_output_paths,
+    )
+    from src.utils.dag import StageCache, run_dag
+    from src.utils.file_utils import ROOT_DIR, get_output_path
+    from src.utils.logging_utils import (
+        setup_logger,
+        track_stage,
+        reset_stage_records,
+        format_stage_summary,
+    )
+    from src.utils.manifest import RunManifest
+
     logger = setup_logger("etl_pipeline", "etl_pipeline.log")
+    reset_stage_records()
+    manifest = None
+    files = None
 
     try:
 
         logger.info("Starting ETL pipeline")
 
-        # Extract phase
-        print(f'{"="*200}')
-        logger.info(f'{"="*20} Beginning data extraction phase {"="*20}')
-        print(f'{"="*200}')
-        extracted_data = extract_data()
-
-        logger.info("Data extraction phase completed")
-
-        # Transform phase
-        print(f'{"="*200}')
-        logger.info(f'{"="*20} Beginning data transformation phase {"="*20}')
-        print(f'{"="*200}')
-        transformed_data = transform_data(extracted_data)
-        logger.info(
-            f"Data transformation phase completed. "
-            f"transformed_data: type = {type(transformed_data)}"
-        )
-
-        cleaned_customers, correlation_table = transformed_data
+        if args.incremental:
+            manifest = RunManifest(
+                get_output_path(OUTPUT_DIR, FILE_NAME_RUN_MANIFEST), ROOT_DIR
+            )
+            with track_stage("plan_incremental_run", logger):
+                files, all_files = plan_incremental_run(manifest, logger)
+            if files is None:
+                logger.info(
+                    "No raw file changed since the last run, nothing to do"
+                )
+                return
 
-        # Load phase
-        print(f'{"="*200}')
-        logger.info(f'{"="*20} Beginning loading phase {"="*20}')
-        print(f'{"="*200}')
+        stages = build_stages(args, files, logger)
+        # Incremental runs keep their own state (fingerprint index and
+        # run manifest), so their stage outputs are not cached
+        cache = None if args.incremental else StageCache(STAGE_CACHE_DIR)
+        outputs = run_dag(stages, cache, force=args.force or ())
 
-        load_data(correlation_table)
-        logger.info("Data load phase completed")
+        if manifest is not None:
+            manifest.record_run(
+                all_files,
+                incremental_output_paths(),
+                extracted_files=len(files),
+                cleaned_customers=len(outputs["transform"][0]),
+            )
+            logger.info(f"Run manifest saved to {manifest.path}")
         print("*" * 200)
         print(
             f'{"*"*74} ETL pipeline run successfully in '
@@ -52,6 +374,9 @@ def main():
     except Exception as e:
         logger.error(f"ETL pipeline failed: {e}")
         sys.exit(1)
+    finally:
+        # Per-stage timings of this run; details in src/logs/performance.jsonl
+        print(format_stage_summary())
 
 
 if __name__ == "__main__":
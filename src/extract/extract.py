@@ -1,16 +1,19 @@
 import pandas as pd
-from src.extract.extract_all import extract_all
+from typing import Iterator, List, Optional
+from src.extract.extract_all import extract_all, extract_all_chunks
 from src.utils.logging_utils import setup_logger
 import logging
 
 logger = setup_logger(__name__, "extract.log", level=logging.DEBUG)
 
 
-def extract_data() -> tuple[pd.DataFrame, pd.DataFrame]:
+def extract_data(
+    files: Optional[List[str]] = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
     try:
         logger.info("Starting data extraction process")
 
-        customers = extract_all()
+        customers = extract_all(files=files)
 
         logger.info(
             f"Data extraction completed successfully - "
@@ -20,3 +23,15 @@ def extract_data() -> tuple[pd.DataFrame, pd.DataFrame]:
     except Exception as e:
         logger.error(f"Data extraction failed: {str(e)}")
         raise
+
+
+def extract_data_chunks(chunk_size: int) -> Iterator[pd.DataFrame]:
+    logger.info(
+        f"Starting chunked data extraction process - chunk size: {chunk_size}"
+    )
+    try:
+        yield from extract_all_chunks(chunk_size)
+        logger.info("Chunked data extraction completed successfully")
+    except Exception as e:
+        logger.error(f"Data extraction failed: {str(e)}")
+        raise
@@ -1,39 +1,92 @@
 import os
+import glob
 import logging
 import pandas as pd
 import timeit
-from src.utils.logging_utils import setup_logger, log_extract_success
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+from pandas.api.types import union_categoricals
+from config.schema_config import CUSTOMER_DTYPES, apply_schema
+from src.utils.logging_utils import (
+    setup_logger,
+    log_extract_success,
+    log_memory_usage,
+    track_stage,
+)
 
-FILE_PATH = os.path.join(
+RAW_DIR = os.path.join(
     os.path.dirname(__file__),
     "..",
     "..",
     "data",
     "raw",
-    "medical_insurance.csv",
 )
+FILE_PATH = os.path.join(RAW_DIR, "medical_insurance.csv")
+
+# Monthly/regional drops, e.g. medical_insurance_2025_01_north.csv
+RAW_FILE_PATTERN = "medical_insurance*.csv"
 
 logger = setup_logger(__name__, "extract_data.log", level=logging.DEBUG)
 
-EXPECTED_PERFORMANCE = 1  # s per 100k rows
+EXPECTED_PERFORMANCE = 1 / 100_000  # s per row, i.e. 1 s per 100k rows
 TYPE = "ALL data from CSV"
+TYPE_CHUNKED = "ALL data from CSV (chunked)"
+CHUNK_SIZE = 50_000
 
+# Rows read with pandas' inferred dtypes to report the memory the
+# schema saves; reading the whole file twice would double extract time
+SCHEMA_SAMPLE_ROWS = 10_000
 
-def extract_all() -> pd.DataFrame:
+
+def discover_raw_files(pattern: str = RAW_FILE_PATTERN) -> List[str]:
     """
-    Extract ALL data from CSV file with performance logging.
+    Find the raw CSV files in data/raw matching a glob pattern.
+
+    Args:
+        pattern: Glob pattern for the file names.
 
     Returns:
-        DataFrame containing customer records from CSV file.
+        Sorted file paths. Falls back to FILE_PATH when nothing matches,
+        so a missing dataset is reported against the expected file.
+    """
+    files = sorted(glob.glob(os.path.join(RAW_DIR, pattern)))
+    return files or [FILE_PATH]
+
+
+@track_stage("extract_all")
+def extract_all(
+    pattern: str = RAW_FILE_PATTERN,
+    max_workers: Optional[int] = None,
+    files: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Extract ALL data from the raw CSV files with performance logging.
+
+    A single file is read in this process. Several files are parsed
+    concurrently in a process pool, checked for a consistent schema and
+    concatenated in file name order.
+
+    Args:
+        pattern: Glob pattern for the raw file names in data/raw.
+        max_workers: Maximum number of worker processes. Defaults to the
+            number of CPUs.
+        files: Read these files instead of the ones matching pattern.
+
+    Returns:
+        DataFrame containing customer records from the CSV files.
 
     Raises:
-        Exception:  1.If CSV file cannot be loaded.
-                    2....
+        Exception:  1.If a CSV file cannot be loaded.
+                    2.If the files do not share the same columns.
     """
+    files = files or discover_raw_files(pattern)
+    if len(files) > 1:
+        return extract_all_files(files, max_workers)
+
     start_time = timeit.default_timer()
 
     try:
-        customers = pd.read_csv(FILE_PATH)
+        customers = pd.read_csv(files[0], dtype=CUSTOMER_DTYPES)
         extract_customers_execution_time = timeit.default_timer() - start_time
         log_extract_success(
             logger,
@@ -42,8 +95,203 @@ def extract_all() -> pd.DataFrame:
             extract_customers_execution_time,
             EXPECTED_PERFORMANCE,
         )
+        log_memory_usage(logger, TYPE, customers)
+        log_schema_savings(files[0])
         return customers
 
     except Exception as e:
-        logger.error(f"Error loading {FILE_PATH}: {e}")
+        logger.error(f"Error loading {files[0]}: {e}")
+        raise Exception(f"Failed to load CSV file: {files[0]}")
+
+
+def extract_all_files(
+    files: List[str], max_workers: Optional[int] = None
+) -> pd.DataFrame:
+    start_time = timeit.default_timer()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(read_raw_file, path) for path in files]
+        partitions = []
+        for path, future in zip(files, futures):
+            try:
+                partition, execution_time = future.result()
+            except Exception as e:
+                logger.error(f"Error loading {path}: {e}")
+                raise Exception(f"Failed to load CSV file: {path}")
+
+            log_extract_success(
+                logger,
+                f"{TYPE} - {os.path.basename(path)}",
+                partition.shape,
+                execution_time,
+                EXPECTED_PERFORMANCE,
+            )
+            partitions.append(partition)
+
+    check_schema_consistency(partitions, files)
+    customers = concat_partitions(partitions)
+
+    log_extract_success(
+        logger,
+        f"{TYPE} ({len(files)} files)",
+        customers.shape,
+        timeit.default_timer() - start_time,
+        EXPECTED_PERFORMANCE,
+    )
+    log_memory_usage(logger, TYPE, customers)
+    log_schema_savings(files[0])
+    return customers
+
+
+def log_schema_savings(
+    path: str, sample_rows: int = SCHEMA_SAMPLE_ROWS
+) -> None:
+    """
+    Log memory_usage(deep=True) of the first rows of a raw file with
+    pandas' inferred dtypes and with the customer schema (see
+    config.schema_config.apply_schema), as a baseline for the memory
+    the schema saves. Only informative: a failure is logged, not raised.
+
+    Args:
+        path (str): Raw CSV file.
+        sample_rows (int): Rows to read for the comparison.
+    """
+    try:
+        logger.info(
+            f"Schema memory check on the first {sample_rows} rows of "
+            f"{os.path.basename(path)}"
+        )
+        apply_schema(pd.read_csv(path, nrows=sample_rows), logger)
+    except Exception as e:
+        logger.warning(f"Could not compare memory usage for {path}: {e}")
+
+
+def read_raw_file(path: str) -> Tuple[pd.DataFrame, float]:
+    # Runs in a worker process: parse one file and time it
+    start_time = timeit.default_timer()
+    partition = pd.read_csv(path, dtype=CUSTOMER_DTYPES)
+    return partition, timeit.default_timer() - start_time
+
+
+def check_schema_consistency(
+    partitions: List[pd.DataFrame], files: List[str]
+) -> None:
+    """
+    Check every partition has the same columns and dtypes as the first.
+    Category columns may have different categories per file.
+
+    Raises:
+        Exception: If a partition does not match.
+    """
+    expected = partitions[0].dtypes
+    for partition, path in zip(partitions[1:], files[1:]):
+        columns = list(partition.columns)
+        if columns != list(expected.index):
+            missing = set(expected.index) - set(columns)
+            extra = set(columns) - set(expected.index)
+            logger.error(
+                f"Schema mismatch in {path}: missing columns {missing}, "
+                f"unexpected columns {extra}, or different column order"
+            )
+            raise Exception(f"Inconsistent schema in CSV file: {path}")
+
+        for col, dtype in partition.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype) and isinstance(
+                expected[col], pd.CategoricalDtype
+            ):
+                continue
+            if dtype != expected[col]:
+                logger.error(
+                    f"Schema mismatch in {path}: column {col} is {dtype}, "
+                    f"expected {expected[col]}"
+                )
+                raise Exception(f"Inconsistent schema in CSV file: {path}")
+
+
+def concat_partitions(partitions: List[pd.DataFrame]) -> pd.DataFrame:
+    # Give category columns the union of all categories first, otherwise
+    # pd.concat falls back to object dtype
+    for col in partitions[0].select_dtypes(include=["category"]).columns:
+        categories = union_categoricals(
+            [partition[col] for partition in partitions]
+        ).categories
+        for partition in partitions:
+            partition[col] = partition[col].cat.set_categories(categories)
+
+    return pd.concat(partitions, ignore_index=True)
+
+
+def extract_all_chunks(
+    chunk_size: int = CHUNK_SIZE, pattern: str = RAW_FILE_PATTERN
+) -> Iterator[pd.DataFrame]:
+    """
+    Extract ALL data from the raw CSV files in chunks with performance
+    logging.
+
+    Files are streamed one after another as partitions, and only one
+    chunk is held in memory at a time, so the data can be larger than
+    the available RAM. Performance is logged once the last chunk has
+    been read, and only counts the time spent reading the files.
+
+    Args:
+        chunk_size: Number of rows per chunk.
+        pattern: Glob pattern for the raw file names in data/raw.
+
+    Yields:
+        DataFrame containing the next chunk of customer records.
+
+    Raises:
+        Exception:  1.If a CSV file cannot be loaded.
+                    2.If the CSV files contain no rows.
+                    3.If the files do not share the same columns.
+    """
+    rows = 0
+    columns = None
+    read_time = 0.0
+
+    for path in discover_raw_files(pattern):
+        try:
+            reader = pd.read_csv(
+                path, dtype=CUSTOMER_DTYPES, chunksize=chunk_size
+            )
+        except Exception as e:
+            logger.error(f"Error loading {path}: {e}")
+            raise Exception(f"Failed to load CSV file: {path}")
+
+        with reader:
+            while True:
+                start_time = timeit.default_timer()
+                try:
+                    chunk = next(reader, None)
+                except Exception as e:
+                    logger.error(f"Error loading {path}: {e}")
+                    raise Exception(f"Failed to load CSV file: {path}")
+                read_time += timeit.default_timer() - start_time
+
+                if chunk is None:
+                    break
+
+                if columns is None:
+                    columns = list(chunk.columns)
+                    log_schema_savings(path)
+                elif list(chunk.columns) != columns:
+                    logger.error(f"Schema mismatch in {path}")
+                    raise Exception(f"Inconsistent schema in CSV file: {path}")
+
+                rows += len(chunk)
+                logger.debug(
+                    f"Read chunk of {len(chunk)} rows ({rows} so far)"
+                )
+                yield chunk
+
+    if rows == 0:
+        logger.error(f"No rows found in {RAW_DIR}")
         raise Exception(f"Failed to load CSV file: {FILE_PATH}")
+
+    log_extract_success(
+        logger,
+        TYPE_CHUNKED,
+        (rows, len(columns)),
+        read_time,
+        EXPECTED_PERFORMANCE,
+    )
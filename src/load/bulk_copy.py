@@ -0,0 +1,90 @@
+import io
+import logging
+import pandas as pd
+from typing import Dict, Optional
+from sqlalchemy.engine import Connection
+from sqlalchemy.types import TypeEngine
+from src.utils.logging_utils import setup_logger
+
+# Reference: PostgreSQL COPY and psycopg2 copy_expert
+# https://www.postgresql.org/docs/current/sql-copy.html
+# https://www.psycopg.org/docs/cursor.html#cursor.copy_expert
+
+logger = setup_logger(__name__, "load_bulk_copy.log", level=logging.DEBUG)
+
+COPY_BATCH_SIZE = 50_000
+
+
+def copy_dataframe_to_table(
+    connection: Connection,
+    df: pd.DataFrame,
+    table: str,
+    schema: str,
+    dtype: Optional[Dict[str, TypeEngine]] = None,
+    if_exists: str = "append",
+    batch_size: int = COPY_BATCH_SIZE,
+) -> None:
+    """
+    Bulk load a DataFrame with COPY ... FROM STDIN.
+
+    The table is created (or replaced) exactly as DataFrame.to_sql would
+    create it, using the given dtype mapping. The rows are then written
+    as CSV into an in-memory buffer, batch_size rows at a time, and
+    streamed to the server with one COPY per batch. Everything is
+    committed in a single transaction.
+
+    Args:
+        connection: Open SQLAlchemy connection using the psycopg2 driver.
+        df (pd.DataFrame): Data to load.
+        table (str): Target table name.
+        schema (str): Target schema name.
+        dtype: Column name to SQLAlchemy type mapping, as for to_sql.
+        if_exists (str): "append" or "replace", as for to_sql.
+        batch_size (int): Number of rows sent per COPY statement.
+
+    Raises:
+        ValueError: If batch_size is not positive.
+    """
+    if batch_size <= 0:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+
+    # Create the table (or check it is there) without inserting any rows
+    df.head(0).to_sql(
+        table,
+        connection,
+        schema=schema,
+        if_exists=if_exists,
+        dtype=dtype,
+        index=False,
+    )
+
+    copy_sql = build_copy_statement(connection, df.columns, table, schema)
+    cursor = connection.connection.cursor()
+    try:
+        for start in range(0, len(df), batch_size):
+            batch = df.iloc[start:start + batch_size]
+            buffer = io.StringIO()
+            batch.to_csv(buffer, index=False, header=False)
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+            logger.debug(
+                f"Copied rows {start}-{start + len(batch)} "
+                f"into {schema}.{table}"
+            )
+    finally:
+        cursor.close()
+
+    connection.commit()
+    logger.info(f"Copied {len(df)} rows into {schema}.{table}")
+
+
+def build_copy_statement(
+    connection: Connection, columns, table: str, schema: str
+) -> str:
+    # Quote identifiers the same way SQLAlchemy does for the dialect
+    preparer = connection.dialect.identifier_preparer
+    column_list = ", ".join(preparer.quote(str(col)) for col in columns)
+    return (
+        f"COPY {preparer.quote_schema(schema)}.{preparer.quote(table)} "
+        f"({column_list}) FROM STDIN WITH (FORMAT csv)"
+    )
@@ -3,18 +3,25 @@ from typing import Optional
 from src.load.load_correlation import (
     load_correlation,
 )
+from src.load.load_customers import load_customers
 from src.utils.logging_utils import setup_logger
 
 logger = setup_logger(__name__, "load_data.log")
 
 
-def load_data(transformed_data: Optional[pd.DataFrame]) -> None:
+def load_data(
+    transformed_data: Optional[pd.DataFrame],
+    cleaned_customers: Optional[pd.DataFrame] = None,
+) -> None:
     """
     Load transformed data into the target database.
 
     Args:
-        transformed_data (pd.DataFrame): The cleaned and transformed
-        data to load.
+        transformed_data (pd.DataFrame, optional): The cleaned and
+        transformed data to load. The correlation load is skipped when
+        it is None or empty.
+        cleaned_customers (pd.DataFrame, optional): The cleaned customers,
+        loaded into the customer table by parallel partition writers.
 
     Raises:
         QueryExecutionError: If database operations fail.
@@ -28,13 +35,17 @@ def load_data(transformed_data: Optional[pd.DataFrame]) -> None:
             logger.info(
                 f"transformed data to be loaded shape:{transformed_data.shape}"
             )
+            # correlation table load
+            load_correlation(transformed_data)
 
-        # correlation table load
-        load_correlation(transformed_data)
+        # customer table load
+        if cleaned_customers is not None:
+            load_customers(cleaned_customers)
 
+        rows_loaded = 0 if transformed_data is None else len(transformed_data)
         logger.info(
             f"Data load completed successfully - "
-            f"Rows loaded: {len(transformed_data)}"
+            f"Rows loaded: {rows_loaded}"
         )
 
     except Exception as e:
@@ -1,10 +1,25 @@
 import pandas as pd
 import timeit
-from config.db_config import load_db_config
-from src.utils.db_utils import get_db_connection
-from src.utils.logging_utils import setup_logger, log_load_success
+from config.db_config import load_db_config, load_pool_config
+from src.utils.db_utils import db_connection
+from src.utils.logging_utils import (
+    setup_logger,
+    log_load_success,
+    track_stage,
+)
 from src.utils.db_table_check import log_table_action
-from sqlalchemy.types import String, Float
+from src.load.bulk_copy import copy_dataframe_to_table, COPY_BATCH_SIZE
+from src.load.versioned_load import (
+    content_run_id,
+    load_versioned,
+    KEEP_VERSIONS,
+)
+from src.transform.correlation_pairs import (
+    correlation_pairs,
+    top_neighbours,
+    TOP_K,
+)
+from sqlalchemy.types import String, Float, Integer
 
 
 # Configure the logger
@@ -15,6 +30,34 @@ TYPE = "CORRELATION table to database"
 TARGET_SCHEMA = "all_2509"
 TARGET_TABLE = "rp_capstone_load"
 
+# "merge" copies the rows into a staging table, then merges them into
+# the target as a new version (run_id, loaded_at) and points the
+# rp_capstone_load_current view at it; only KEEP_VERSIONS are kept.
+# The run_id is a hash of the table, so loading the same correlations
+# again replaces their version.
+# "copy" appends with COPY ... FROM STDIN,
+# "to_sql" appends with DataFrame.to_sql INSERT statements
+LOAD_METHOD = "merge"
+
+# Long format of the correlation table (feature_a, feature_b, r, abs_r,
+# rank) and its top TOP_K neighbours per feature, both versioned like
+# the wide table. The (feature_a, rank) index turns "what correlates
+# most with X" into an index range scan, (feature_a, feature_b) finds
+# one pair.
+PAIRS_TABLE = "rp_capstone_correlation_pairs"
+TOP_TABLE = "rp_capstone_correlation_top"
+PAIR_INDEXES = {
+    "feature_rank": ["feature_a", "rank"],
+    "feature_pair": ["feature_a", "feature_b"],
+}
+PAIR_DTYPES = {
+    "feature_a": String(50),
+    "feature_b": String(50),
+    "r": Float(),
+    "abs_r": Float(),
+    "rank": Integer(),
+}
+
 
 logger.info("Running load_correlation module")
 
@@ -38,6 +81,7 @@ def load_correlation(transformed_data: pd.DataFrame) -> None:
         # Set up performance recording for transaction load
         start_time = timeit.default_timer()
         load_correlation_exec(transformed_data)
+        load_correlation_pairs(transformed_data)
         load_transactions_execution_time = timeit.default_timer() - start_time
 
         log_load_success(
@@ -54,48 +98,136 @@ def load_correlation(transformed_data: pd.DataFrame) -> None:
 logger.info("Running load_correlation exec")
 
 
-def load_correlation_exec(transformed_data: pd.DataFrame) -> None:
+@track_stage("load_correlation_exec")
+def load_correlation_exec(
+    transformed_data: pd.DataFrame,
+    method: str = LOAD_METHOD,
+    batch_size: int = COPY_BATCH_SIZE,
+) -> None:
     """
     Execute the transaction load into the target database.
 
     Args:
         transformed_data (pd.DataFrame): DataFrame containing
         transformed transaction records.
+        method (str): "merge" for a versioned load through a staging
+        table, "copy" for a COPY bulk append or "to_sql" for
+        DataFrame.to_sql inserts.
+        batch_size (int): Rows per COPY statement when method is "copy".
 
     """
 
     connection_details = load_db_config()["target_database"]
-    connection = get_db_connection(connection_details)
-
-    # Check if table exists and log action, create utils for this
-    exists = log_table_action(connection, TARGET_TABLE, TARGET_SCHEMA)
+    with db_connection(
+        connection_details, **load_pool_config()
+    ) as connection:
+        # Check if table exists and log action, create utils for this
+        exists = log_table_action(connection, TARGET_TABLE, TARGET_SCHEMA)
+
+        # https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.to_sql.html
+        # Load data into table
+
+        # Define data types for each column
+        d = correlation_dtypes(transformed_data.columns)
+
+        try:
+            if method == "merge":
+                load_versioned(
+                    connection,
+                    transformed_data,
+                    TARGET_TABLE,
+                    TARGET_SCHEMA,
+                    dtype=d,
+                    run_id=content_run_id(transformed_data),
+                    keep_versions=KEEP_VERSIONS,
+                    batch_size=batch_size,
+                )
+            elif method == "copy":
+                copy_dataframe_to_table(
+                    connection,
+                    transformed_data,
+                    TARGET_TABLE,
+                    TARGET_SCHEMA,
+                    dtype=d,
+                    if_exists="append" if exists else "replace",
+                    batch_size=batch_size,
+                )
+            elif method == "to_sql":
+                transformed_data.to_sql(
+                    TARGET_TABLE,
+                    connection,
+                    schema=TARGET_SCHEMA,
+                    if_exists="append" if exists else "replace",
+                    dtype=d,
+                    index=False,
+                )
+            else:
+                raise ValueError(f"Unknown load method: {method}")
+        except Exception as e:
+            logger.error(
+                f"Failed to load {len(transformed_data)}"
+                f"rows into {TARGET_SCHEMA}.{TARGET_TABLE}: {e}"
+            )
+            raise Exception(f"Failed to load into database: {e}")
+
+
+@track_stage("load_correlation_pairs")
+def load_correlation_pairs(
+    transformed_data: pd.DataFrame,
+    k: int = TOP_K,
+    batch_size: int = COPY_BATCH_SIZE,
+) -> None:
+    """
+    Load the correlation table in long format, ranked per feature (see
+    src.transform.correlation_pairs), and the top k neighbours of every
+    feature, each as a new version with the (feature_a, rank) and
+    (feature_a, feature_b) indexes.
 
-    # https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.to_sql.html
-    # Load data into table
+    Args:
+        transformed_data (pd.DataFrame): Wide correlation table.
+        k (int): Neighbours per feature in the top table.
+        batch_size (int): Rows per COPY statement.
+    """
+    pairs = correlation_pairs(transformed_data)
+    tables = {PAIRS_TABLE: pairs, TOP_TABLE: top_neighbours(pairs, k)}
+    # Same version id as the wide table, reloads replace the version
+    run_id = content_run_id(transformed_data)
 
-    # Define data types for each column
-    cols = transformed_data.columns
+    connection_details = load_db_config()["target_database"]
+    with db_connection(
+        connection_details, **load_pool_config()
+    ) as connection:
+        for table, df in tables.items():
+            log_table_action(connection, table, TARGET_SCHEMA)
+            try:
+                load_versioned(
+                    connection,
+                    df,
+                    table,
+                    TARGET_SCHEMA,
+                    dtype=PAIR_DTYPES,
+                    run_id=run_id,
+                    keep_versions=KEEP_VERSIONS,
+                    batch_size=batch_size,
+                    indexes={
+                        f"{table}_{name}": columns
+                        for name, columns in PAIR_INDEXES.items()
+                    },
+                )
+            except Exception as e:
+                logger.error(
+                    f"Failed to load {len(df)} "
+                    f"rows into {TARGET_SCHEMA}.{table}: {e}"
+                )
+                raise Exception(f"Failed to load into database: {e}")
+
+
+def correlation_dtypes(cols) -> dict:
+    # First column holds the feature name, the rest are correlations
     d = {}
     for i, col in enumerate(cols):
         if i == 0:
             d[col] = String(50)  # first column as string
         else:
             d[col] = Float()  # all other columns as float
-
-    try:
-        transformed_data.to_sql(
-            TARGET_TABLE,
-            connection,
-            schema=TARGET_SCHEMA,
-            if_exists="append" if exists else "replace",
-            dtype=d,
-            index=False,
-        )
-    except Exception as e:
-        logger.error(
-            f"Failed to load {len(transformed_data)}"
-            f"rows into {TARGET_SCHEMA}.{TARGET_TABLE}: {e}"
-        )
-        raise Exception(f"Failed to load into database: {e}")
-
-    connection.close()
+    return d
@@ -0,0 +1,300 @@
+import timeit
+import numpy as np
+import pandas as pd
+import sqlalchemy as sq
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from config.db_config import load_db_config, load_pool_config
+from src.utils.db_utils import db_connection
+from src.utils.logging_utils import (
+    setup_logger,
+    log_load_success,
+    track_stage,
+)
+from src.utils.db_table_check import log_table_action
+from src.load.bulk_copy import copy_dataframe_to_table, COPY_BATCH_SIZE
+from src.load.versioned_load import (
+    SqlNames,
+    drop_staging,
+    staging_table_name,
+)
+
+
+# Configure the logger
+logger = setup_logger(__name__, "load_data_customers.log")
+
+TYPE = "CUSTOMER table to database"
+
+TARGET_SCHEMA = "all_2509"
+TARGET_TABLE = "rp_capstone_customers"
+
+# Partition the customers by this column when it is present, otherwise
+# into PARTITION_COUNT person_id ranges
+PARTITION_COLUMN = "region"
+PARTITION_KEY = "person_id"
+PARTITION_COUNT = 8
+
+
+class PartitionLoad(NamedTuple):
+    """Rows written by one partition writer and how long it took."""
+
+    partition: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_s(self) -> Optional[float]:
+        return self.rows / self.seconds if self.seconds else None
+
+
+def partition_customers(
+    customers: pd.DataFrame,
+    column: Optional[str] = PARTITION_COLUMN,
+    partitions: int = PARTITION_COUNT,
+) -> List[Tuple[str, pd.DataFrame]]:
+    """
+    Split the customers into partitions that can be loaded independently.
+
+    Args:
+        customers (pd.DataFrame): Cleaned customers.
+        column (str, optional): Partition by the values of this column,
+            e.g. region. Missing values get a partition of their own.
+            If None or not a column, person_id ranges are used instead.
+        partitions (int): Number of person_id ranges.
+
+    Returns:
+        List[Tuple[str, pd.DataFrame]]: A label and the rows of every
+        non-empty partition.
+
+    Raises:
+        ValueError: If partitions is not positive.
+    """
+    if partitions <= 0:
+        raise ValueError(f"partitions must be positive, got {partitions}")
+
+    if column is not None and column in customers.columns:
+        groups = customers.groupby(
+            customers[column], observed=True, dropna=False, sort=True
+        )
+        return [
+            (f"{column}={label}", part)
+            for label, part in groups
+            if len(part)
+        ]
+
+    # Equal-sized person_id ranges, in person_id order
+    order = np.argsort(customers[PARTITION_KEY].to_numpy(), kind="stable")
+    result = []
+    for positions in np.array_split(order, min(partitions, len(order))):
+        part = customers.iloc[positions]
+        first, last = part[PARTITION_KEY].iloc[[0, -1]]
+        label = f"{first}-{last}" if first != last else f"{first}"
+        result.append((f"{PARTITION_KEY}={label}", part))
+    return result
+
+
+def load_customers(
+    cleaned_customers: pd.DataFrame,
+    partition_column: Optional[str] = PARTITION_COLUMN,
+    max_workers: Optional[int] = None,
+) -> List[PartitionLoad]:
+    """
+    Load the cleaned customers, replacing the customer table.
+
+    Args:
+        cleaned_customers (pd.DataFrame): Cleaned customers.
+        partition_column (str, optional): Column to partition by, see
+            partition_customers().
+        max_workers (int, optional): Number of partition writers.
+
+    Returns:
+        List[PartitionLoad]: Rows and time of every partition.
+
+    Raises:
+        Exception: If loading fails.
+    """
+    if cleaned_customers is None or cleaned_customers.empty:
+        logger.warning("No customers provided. Skipping customer loading.")
+        return []
+
+    try:
+        start_time = timeit.default_timer()
+        loads = load_customers_exec(
+            cleaned_customers, partition_column, max_workers
+        )
+        load_customers_execution_time = timeit.default_timer() - start_time
+
+        log_load_success(
+            logger,
+            TYPE,
+            cleaned_customers.shape,
+            load_customers_execution_time,
+        )
+        log_partition_loads(loads, load_customers_execution_time)
+        return loads
+    except Exception as e:
+        logger.error(f"Failed to load customers: {e}")
+        raise Exception(f"Failed to load customers: {e}")
+
+
+@track_stage("load_customers_exec")
+def load_customers_exec(
+    cleaned_customers: pd.DataFrame,
+    partition_column: Optional[str] = PARTITION_COLUMN,
+    max_workers: Optional[int] = None,
+    batch_size: int = COPY_BATCH_SIZE,
+) -> List[PartitionLoad]:
+    """
+    COPY the partitions into a new staging table in parallel, then swap
+    it in as the customer table.
+
+    The staging table has a name of its own for every load (see
+    staging_table_name), so concurrent loads do not write into each
+    other's. Readers keep seeing the previous customer table until the
+    swap commits. If a writer fails, the staging table is dropped and
+    the customer table is left as it was.
+
+    Every partition writer checks out its own connection from the shared
+    pool and commits its partition in its own transaction. Writers are
+    threads: psycopg2 releases the GIL while COPY data is sent, so the
+    partitions are written concurrently by the server. The number of
+    writers is capped at the pool size, so no writer waits for a
+    connection.
+
+    Args:
+        cleaned_customers (pd.DataFrame): Cleaned customers.
+        partition_column (str, optional): Column to partition by.
+        max_workers (int, optional): Number of partition writers.
+        batch_size (int): Rows per COPY statement.
+
+    Returns:
+        List[PartitionLoad]: Rows and time of every partition.
+    """
+    connection_details = load_db_config()["target_database"]
+    pool_config = load_pool_config()
+    partitions = partition_customers(cleaned_customers, partition_column)
+    pool_capacity = pool_config["pool_size"] + pool_config["max_overflow"]
+    workers = min(max_workers or pool_config["pool_size"], pool_capacity)
+    workers = max(1, min(workers, len(partitions)))
+    # Partitions are written here, then swapped in as the target in one
+    # transaction, so readers never see an empty or partial table
+    staging = staging_table_name(TARGET_TABLE)
+
+    def write_partition(job: Tuple[str, pd.DataFrame]) -> PartitionLoad:
+        label, part = job
+        start = timeit.default_timer()
+        with db_connection(connection_details, **pool_config) as connection:
+            copy_dataframe_to_table(
+                connection,
+                part,
+                staging,
+                TARGET_SCHEMA,
+                if_exists="append",
+                batch_size=batch_size,
+            )
+        return PartitionLoad(label, len(part), timeit.default_timer() - start)
+
+    logger.info(
+        f"Loading {len(cleaned_customers)} customers in "
+        f"{len(partitions)} partitions with {workers} writers"
+    )
+    try:
+        # Start from an empty staging table with the columns of the
+        # cleaned customers
+        with db_connection(connection_details, **pool_config) as connection:
+            log_table_action(connection, TARGET_TABLE, TARGET_SCHEMA)
+            cleaned_customers.head(0).to_sql(
+                staging,
+                connection,
+                schema=TARGET_SCHEMA,
+                if_exists="replace",
+                index=False,
+            )
+            connection.commit()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            loads = list(executor.map(write_partition, partitions))
+        with db_connection(connection_details, **pool_config) as connection:
+            swap_in_staging(connection, TARGET_SCHEMA, staging)
+        return loads
+    except Exception as e:
+        logger.error(
+            f"Failed to load {len(cleaned_customers)} "
+            f"rows into {TARGET_SCHEMA}.{TARGET_TABLE}: {e}"
+        )
+        with db_connection(connection_details, **pool_config) as connection:
+            drop_staging(connection, TARGET_SCHEMA, staging)
+        raise Exception(f"Failed to load into database: {e}")
+
+
+def swap_in_staging(
+    connection,
+    schema: str,
+    staging: str,
+    table: str = TARGET_TABLE,
+) -> None:
+    """
+    Replace the table with the staging table in one transaction (DDL is
+    transactional in PostgreSQL), so readers see either the old or the
+    new customers.
+    """
+    names = SqlNames(connection, schema)
+    try:
+        connection.execute(
+            sq.text(f"DROP TABLE IF EXISTS {names.table(table)}")
+        )
+        connection.execute(
+            sq.text(
+                f"ALTER TABLE {names.table(staging)} "
+                f"RENAME TO {names.column(table)}"
+            )
+        )
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    logger.info(f"{schema}.{staging} swapped in as {schema}.{table}")
+
+
+def summarise_partition_loads(
+    loads: List[PartitionLoad], seconds: float
+) -> Dict[str, Any]:
+    """
+    Throughput of every partition writer and of the whole load.
+
+    Args:
+        loads: Result of load_customers().
+        seconds (float): Wall time of the whole load.
+
+    Returns:
+        dict: Per-partition rows, seconds and rows_per_s, and the totals.
+    """
+    rows = sum(load.rows for load in loads)
+    return {
+        "partitions": [
+            {
+                "partition": load.partition,
+                "rows": load.rows,
+                "seconds": round(load.seconds, 4),
+                "rows_per_s": (
+                    round(load.rows_per_s) if load.rows_per_s else None
+                ),
+            }
+            for load in loads
+        ],
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_s": round(rows / seconds) if seconds else None,
+    }
+
+
+def log_partition_loads(loads: List[PartitionLoad], seconds: float) -> None:
+    summary = summarise_partition_loads(loads, seconds)
+    for partition in summary["partitions"]:
+        logger.info(
+            f"Partition {partition['partition']}: {partition['rows']} rows "
+            f"in {partition['seconds']} s ({partition['rows_per_s']} rows/s)"
+        )
+    logger.info(
+        f"Customer load total: {summary['rows']} rows in "
+        f"{summary['seconds']} s ({summary['rows_per_s']} rows/s)"
+    )
@@ -0,0 +1,363 @@
+import hashlib
+import logging
+import uuid
+import pandas as pd
+import sqlalchemy as sq
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy.engine import Connection
+from sqlalchemy.types import DateTime, String, TypeEngine
+from src.load.bulk_copy import copy_dataframe_to_table, COPY_BATCH_SIZE
+from src.utils.logging_utils import setup_logger
+
+# Reference: PostgreSQL transactional DDL and views
+# https://wiki.postgresql.org/wiki/Transactional_DDL_in_PostgreSQL:_A_Competitive_Analysis
+# https://www.postgresql.org/docs/current/sql-createview.html
+
+logger = setup_logger(__name__, "load_versioned.log", level=logging.DEBUG)
+
+RUN_ID = "run_id"
+LOADED_AT = "loaded_at"
+
+# Versions kept in the target table, the newest one is "current"
+KEEP_VERSIONS = 3
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex
+
+
+def staging_table_name(table: str) -> str:
+    """
+    Name for a new staging table of table, unique to this load, so
+    concurrent loads of the same table never write into each other's
+    staging table. (The run_id is no use here: loads of the same data
+    share it.)
+    """
+    return f"{table}_staging_{uuid.uuid4().hex[:12]}"
+
+
+def content_run_id(df: pd.DataFrame) -> str:
+    """
+    Version identifier derived from the data: the same columns and rows
+    always give the same run_id, so loading them again (a retry or a
+    forced load) replaces their version instead of adding one.
+    """
+    digest = hashlib.sha256()
+    digest.update("\x1f".join(str(col) for col in df.columns).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy())
+    return digest.hexdigest()[:32]
+
+
+def load_versioned(
+    connection: Connection,
+    df: pd.DataFrame,
+    table: str,
+    schema: str,
+    dtype: Optional[Dict[str, TypeEngine]] = None,
+    run_id: Optional[str] = None,
+    loaded_at: Optional[datetime] = None,
+    keep_versions: int = KEEP_VERSIONS,
+    bulk_copy: bool = True,
+    batch_size: int = COPY_BATCH_SIZE,
+    indexes: Optional[Dict[str, List[str]]] = None,
+) -> str:
+    """
+    Load a DataFrame as a new version of a table, through a staging
+    table, and point the "current" view at it.
+
+    The rows are first bulk loaded into a staging table named
+    {table}_staging_<random suffix> (see staging_table_name). Then, in
+    one transaction:
+
+    - if the target has the same columns, the version is merged into
+      it: rows of an earlier load with the same run_id are replaced,
+      so retrying a load never duplicates it;
+    - otherwise (first load, or the columns changed) the staging table
+      is swapped in as the target;
+    - versions beyond the newest keep_versions are deleted;
+    - the indexes are created if missing (a swapped in table has none);
+    - the view {table}_current is recreated to show the newest version,
+      without the run_id and loaded_at columns.
+
+    Readers of the view see either the previous or the new version,
+    never a partial load. If the load fails, the staging table is
+    dropped.
+
+    Args:
+        connection: Open SQLAlchemy connection.
+        df (pd.DataFrame): Data to load.
+        table (str): Target table name.
+        schema (str): Target schema name.
+        dtype: Column name to SQLAlchemy type mapping, as for to_sql.
+        run_id (str, optional): Version identifier. A new one is
+            generated by default; pass content_run_id(df) to make
+            reloading the same data replace its version.
+        loaded_at (datetime, optional): Load time, defaults to now (UTC).
+        keep_versions (int): Number of versions to keep.
+        bulk_copy (bool): Fill the staging table with COPY (PostgreSQL)
+            rather than DataFrame.to_sql.
+        batch_size (int): Rows per COPY statement.
+        indexes (Dict[str, List[str]], optional): Index name to the
+            columns it covers, in order, kept on the target table.
+
+    Returns:
+        str: The run_id of the loaded version.
+
+    Raises:
+        ValueError: If keep_versions is not positive or df already has
+        a run_id or loaded_at column.
+    """
+    if keep_versions <= 0:
+        raise ValueError(
+            f"keep_versions must be positive, got {keep_versions}"
+        )
+    if RUN_ID in df.columns or LOADED_AT in df.columns:
+        raise ValueError(
+            f"Columns {RUN_ID} and {LOADED_AT} are reserved for versioning"
+        )
+    run_id = run_id or new_run_id()
+    loaded_at = loaded_at or datetime.now(timezone.utc)
+    staging = staging_table_name(table)
+    columns = [str(col) for col in df.columns]
+
+    try:
+        # Bulk load the staging table, in its own transaction
+        if bulk_copy:
+            copy_dataframe_to_table(
+                connection,
+                df,
+                staging,
+                schema,
+                dtype=dtype,
+                if_exists="replace",
+                batch_size=batch_size,
+            )
+        else:
+            df.to_sql(
+                staging,
+                connection,
+                schema=schema,
+                if_exists="replace",
+                dtype=dtype,
+                index=False,
+            )
+            connection.commit()
+
+        names = SqlNames(connection, schema)
+        inspector = sq.inspect(connection)
+        target_columns = None
+        if inspector.has_table(table, schema=schema):
+            target_columns = [
+                column["name"]
+                for column in inspector.get_columns(table, schema=schema)
+            ]
+
+        # DDL is transactional in PostgreSQL, so the swap and the view
+        # change become visible together at commit
+        # run_id and loaded_at are added after the data columns
+        if target_columns == columns + [RUN_ID, LOADED_AT]:
+            merge_version(
+                connection, names, table, staging, columns, run_id, loaded_at
+            )
+            action = "merged into"
+        else:
+            swap_version(
+                connection,
+                names,
+                table,
+                staging,
+                run_id,
+                loaded_at,
+                exists=target_columns is not None,
+            )
+            action = "swapped in as"
+        prune_versions(connection, names, table, keep_versions)
+        create_indexes(connection, table, schema, columns, indexes or {})
+        create_current_view(connection, names, table, columns)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        drop_staging(connection, schema, staging)
+        raise
+
+    logger.info(
+        f"Version {run_id} ({len(df)} rows) {action} {schema}.{table}, "
+        f"{schema}.{table}_current updated"
+    )
+    return run_id
+
+
+def drop_staging(connection: Connection, schema: str, staging: str) -> None:
+    # Best effort clean-up after a failed load; the target is untouched
+    try:
+        names = SqlNames(connection, schema)
+        connection.execute(
+            sq.text(f"DROP TABLE IF EXISTS {names.table(staging)}")
+        )
+        connection.commit()
+    except Exception as e:
+        logger.warning(f"Could not drop {schema}.{staging}: {e}")
+
+
+class SqlNames:
+    # Quote identifiers the same way SQLAlchemy does for the dialect
+    def __init__(self, connection: Connection, schema: str):
+        self.preparer = connection.dialect.identifier_preparer
+        self.dialect = connection.dialect
+        self.schema = schema
+
+    def column(self, name: str) -> str:
+        return self.preparer.quote(name)
+
+    def columns(self, names: List[str]) -> str:
+        return ", ".join(self.column(name) for name in names)
+
+    def table(self, name: str) -> str:
+        return (
+            f"{self.preparer.quote_schema(self.schema)}."
+            f"{self.preparer.quote(name)}"
+        )
+
+    def type(self, type_: TypeEngine) -> str:
+        return type_.compile(dialect=self.dialect)
+
+
+def version_params(run_id: str, loaded_at: datetime) -> dict:
+    return {RUN_ID: run_id, LOADED_AT: loaded_at}
+
+
+def version_statement(sql: str) -> sq.TextClause:
+    return sq.text(sql).bindparams(
+        sq.bindparam(RUN_ID, type_=String()),
+        sq.bindparam(LOADED_AT, type_=DateTime(timezone=True)),
+    )
+
+
+def merge_version(
+    connection: Connection,
+    names: SqlNames,
+    table: str,
+    staging: str,
+    columns: List[str],
+    run_id: str,
+    loaded_at: datetime,
+) -> None:
+    # Replace any earlier load of this run_id, then copy staging over
+    connection.execute(
+        sq.text(
+            f"DELETE FROM {names.table(table)} "
+            f"WHERE {names.column(RUN_ID)} = :{RUN_ID}"
+        ),
+        {RUN_ID: run_id},
+    )
+    connection.execute(
+        version_statement(
+            f"INSERT INTO {names.table(table)} "
+            f"({names.columns(columns + [RUN_ID, LOADED_AT])}) "
+            f"SELECT {names.columns(columns)}, :{RUN_ID}, :{LOADED_AT} "
+            f"FROM {names.table(staging)}"
+        ),
+        version_params(run_id, loaded_at),
+    )
+    connection.execute(sq.text(f"DROP TABLE {names.table(staging)}"))
+
+
+def swap_version(
+    connection: Connection,
+    names: SqlNames,
+    table: str,
+    staging: str,
+    run_id: str,
+    loaded_at: datetime,
+    exists: bool,
+) -> None:
+    # Turn the staging table into the target, replacing the old one
+    # (whose columns no longer match)
+    staging_name = names.table(staging)
+    connection.execute(
+        sq.text(
+            f"ALTER TABLE {staging_name} ADD COLUMN "
+            f"{names.column(RUN_ID)} {names.type(String(32))}"
+        )
+    )
+    connection.execute(
+        sq.text(
+            f"ALTER TABLE {staging_name} ADD COLUMN "
+            f"{names.column(LOADED_AT)} "
+            f"{names.type(DateTime(timezone=True))}"
+        )
+    )
+    connection.execute(
+        version_statement(
+            f"UPDATE {staging_name} SET {names.column(RUN_ID)} = :{RUN_ID}, "
+            f"{names.column(LOADED_AT)} = :{LOADED_AT}"
+        ),
+        version_params(run_id, loaded_at),
+    )
+    connection.execute(
+        sq.text(f"DROP VIEW IF EXISTS {names.table(f'{table}_current')}")
+    )
+    if exists:
+        connection.execute(sq.text(f"DROP TABLE {names.table(table)}"))
+        logger.warning(
+            f"Columns of {names.schema}.{table} changed, "
+            "earlier versions were dropped"
+        )
+    connection.execute(
+        sq.text(f"ALTER TABLE {staging_name} RENAME TO {names.column(table)}")
+    )
+
+
+def prune_versions(
+    connection: Connection, names: SqlNames, table: str, keep_versions: int
+) -> None:
+    # Keep the newest versions, and drop rows from before versioning
+    run_id, loaded_at = names.column(RUN_ID), names.column(LOADED_AT)
+    connection.execute(
+        sq.text(
+            f"DELETE FROM {names.table(table)} "
+            f"WHERE {run_id} IS NULL OR {run_id} NOT IN ("
+            f"SELECT {run_id} FROM {names.table(table)} "
+            f"WHERE {run_id} IS NOT NULL GROUP BY {run_id} "
+            f"ORDER BY MAX({loaded_at}) DESC LIMIT :keep)"
+        ),
+        {"keep": keep_versions},
+    )
+
+
+def create_indexes(
+    connection: Connection,
+    table: str,
+    schema: str,
+    columns: List[str],
+    indexes: Dict[str, List[str]],
+) -> None:
+    # Built with SQLAlchemy, which places the schema as each dialect
+    # expects (on the table in PostgreSQL, on the index in SQLite)
+    target = sq.Table(
+        table,
+        sq.MetaData(),
+        *[sq.Column(name) for name in columns + [RUN_ID, LOADED_AT]],
+        schema=schema,
+    )
+    for name, index_columns in indexes.items():
+        index = sq.Index(name, *[target.c[col] for col in index_columns])
+        connection.execute(sq.schema.CreateIndex(index, if_not_exists=True))
+
+
+def create_current_view(
+    connection: Connection, names: SqlNames, table: str, columns: List[str]
+) -> None:
+    # Dropped first: CREATE OR REPLACE VIEW cannot remove columns
+    view = names.table(f"{table}_current")
+    run_id, loaded_at = names.column(RUN_ID), names.column(LOADED_AT)
+    connection.execute(sq.text(f"DROP VIEW IF EXISTS {view}"))
+    connection.execute(
+        sq.text(
+            f"CREATE VIEW {view} AS "
+            f"SELECT {names.columns(columns)} FROM {names.table(table)} "
+            f"WHERE {run_id} = (SELECT {run_id} FROM {names.table(table)} "
+            f"ORDER BY {loaded_at} DESC LIMIT 1)"
+        )
+    )
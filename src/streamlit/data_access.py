@@ -0,0 +1,126 @@
+import os
+import pandas as pd
+import streamlit as st
+from typing import List, Tuple
+from src.transform.correlation_engine import correlation_matrix
+from src.transform.segment_cube import add_segments
+from src.transform.transform_all import (
+    OUTPUT_DIR,
+    FILE_NAME_CLEAN_CUSTOMERS,
+    FILE_NAME_CORRELATION_PAIRS,
+    FILE_NAME_SEGMENT_CUBE,
+    FILE_NAME_HISTOGRAMS,
+    create_numeric_cols_df,
+)
+from src.utils.file_utils import ROOT_DIR, read_dataframe_from_parquet
+
+# Shared data access for the dashboard pages.
+# Everything is cached per process and keyed on the version of the
+# processed file, so widget interactions only re-render and a new ETL
+# run is picked up on the next rerun.
+# https://docs.streamlit.io/develop/concepts/architecture/caching
+
+
+def processed_file_version(filename: str) -> Tuple[int, int]:
+    """Modification time and size of a processed file, used as cache key."""
+    stat = os.stat(os.path.join(ROOT_DIR, OUTPUT_DIR, filename))
+    return stat.st_mtime_ns, stat.st_size
+
+
+@st.cache_resource(max_entries=1, show_spinner="Loading customers...")
+def _load_customers(version: Tuple[int, int]) -> pd.DataFrame:
+    # Shared, not copied, between sessions: callers must not modify it
+    customers = read_dataframe_from_parquet(
+        OUTPUT_DIR, FILE_NAME_CLEAN_CUSTOMERS
+    )
+    return add_segments(customers)
+
+
+@st.cache_data(max_entries=1, show_spinner="Loading segments...")
+def _load_segment_cube(version: Tuple[int, int]) -> pd.DataFrame:
+    return read_dataframe_from_parquet(OUTPUT_DIR, FILE_NAME_SEGMENT_CUBE)
+
+
+@st.cache_data(max_entries=1, show_spinner="Loading histograms...")
+def _load_histograms(version: Tuple[int, int]) -> pd.DataFrame:
+    return read_dataframe_from_parquet(OUTPUT_DIR, FILE_NAME_HISTOGRAMS)
+
+
+@st.cache_data(max_entries=1, show_spinner="Loading correlations...")
+def _load_correlation_pairs(version: Tuple[int, int]) -> pd.DataFrame:
+    # Indexed by feature_a (sorted, as saved), so the neighbours of a
+    # feature are one index lookup
+    pairs = read_dataframe_from_parquet(
+        OUTPUT_DIR, FILE_NAME_CORRELATION_PAIRS
+    )
+    return pairs.set_index("feature_a")
+
+
+@st.cache_data(max_entries=1)
+def _numeric_columns(version: Tuple[int, int]) -> List[str]:
+    customers = _load_customers(version)
+    return sorted(create_numeric_cols_df(customers))
+
+
+@st.cache_data(max_entries=1, show_spinner="Computing correlations...")
+def _correlation_matrix(version: Tuple[int, int]) -> pd.DataFrame:
+    customers = _load_customers(version)
+    return correlation_matrix(customers, _numeric_columns(version))
+
+
+def load_customers() -> pd.DataFrame:
+    """
+    Cleaned customers with the derived age_group and chronic_bucket
+    columns. The frame is shared between reruns and sessions, so treat
+    it as read-only.
+    """
+    return _load_customers(processed_file_version(FILE_NAME_CLEAN_CUSTOMERS))
+
+
+def get_numeric_columns() -> List[str]:
+    """Sorted names of the numeric columns of the cleaned customers."""
+    return _numeric_columns(processed_file_version(FILE_NAME_CLEAN_CUSTOMERS))
+
+
+def get_correlation_matrix() -> pd.DataFrame:
+    """Correlation matrix of all numeric columns, computed once per file."""
+    return _correlation_matrix(
+        processed_file_version(FILE_NAME_CLEAN_CUSTOMERS)
+    )
+
+
+def load_segment_cube() -> pd.DataFrame:
+    """
+    Segment cube produced by the ETL: count, sums and means of cost and
+    premium per value of every dimension the pages group by (see
+    src.transform.segment_cube). A few dozen rows, so charts of segment
+    means do not need the customers.
+    """
+    return _load_segment_cube(processed_file_version(FILE_NAME_SEGMENT_CUBE))
+
+
+def load_histograms() -> pd.DataFrame:
+    """
+    Fine fixed-bin histograms produced by the ETL (see
+    src.transform.histograms); coarsen them with rebin for a chart.
+    """
+    return _load_histograms(processed_file_version(FILE_NAME_HISTOGRAMS))
+
+
+def get_correlation_neighbours(feature: str, k: int = 5) -> pd.DataFrame:
+    """
+    The k variables most strongly correlated with feature (by |r|), from
+    the ranked correlation pairs produced by the ETL (see
+    src.transform.correlation_pairs).
+
+    Returns:
+        pd.DataFrame: Columns feature_b, r, abs_r and rank, strongest
+        first; empty if the feature has no pairs.
+    """
+    pairs = _load_correlation_pairs(
+        processed_file_version(FILE_NAME_CORRELATION_PAIRS)
+    )
+    if feature not in pairs.index:
+        return pairs.iloc[:0].reset_index(drop=True)
+    neighbours = pairs.loc[[feature]]
+    return neighbours[neighbours["rank"] <= k].reset_index(drop=True)
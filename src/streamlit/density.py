@@ -0,0 +1,182 @@
+import numpy as np
+from typing import NamedTuple, Optional, Tuple
+from matplotlib.colors import LogNorm
+
+# Scatter plots of more points than this are drawn as a density image:
+# matplotlib draws every marker, so render time grows with the data,
+# while an image of the binned points costs the same for any size.
+SCATTER_POINT_LIMIT = 20_000
+
+# Cells of the density grid along x and y
+DENSITY_BINS = (200, 150)
+
+# Points in cells with at most this many points are drawn on top of the
+# density image, so isolated outliers stay visible
+OUTLIER_MAX_COUNT = 2
+
+
+class DensityGrid(NamedTuple):
+    # counts[i, j]: points with x in x cell i and y in y cell j
+    counts: np.ndarray
+    x_edges: np.ndarray
+    y_edges: np.ndarray
+    # Cell of every point, as a flat index into counts
+    cells: np.ndarray
+
+
+def _edges(
+    values: np.ndarray, bins: int, value_range: Optional[Tuple[float, float]]
+) -> np.ndarray:
+    low, high = (
+        value_range
+        if value_range is not None
+        else (values.min(), values.max())
+    )
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return np.linspace(low, high, bins + 1)
+
+
+def _cell_index(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    # Equal-width cells: computed directly instead of searched, the last
+    # edge is included in the last cell as in np.histogram2d
+    bins = len(edges) - 1
+    index = (values - edges[0]) / (edges[-1] - edges[0]) * bins
+    index = np.clip(index.astype(np.int64), 0, bins - 1)
+    # Round-off can put values next to an edge in the neighbouring
+    # cell; move them so the cells match the edges exactly
+    index[values < edges[index]] -= 1
+    index[(values >= edges[index + 1]) & (index != bins - 1)] += 1
+    return index
+
+
+def density_grid(
+    x: np.ndarray,
+    y: np.ndarray,
+    bins: Tuple[int, int] = DENSITY_BINS,
+    x_range: Optional[Tuple[float, float]] = None,
+    y_range: Optional[Tuple[float, float]] = None,
+) -> DensityGrid:
+    """
+    Count points in a grid of equal-width cells with one bincount, the
+    same counts as np.histogram2d without its per-point search.
+
+    Points with a missing coordinate or outside the ranges are not
+    counted.
+
+    Args:
+        x, y: Coordinates of the points.
+        bins (Tuple[int, int]): Cells along x and y.
+        x_range, y_range: Grid extent, the range of the data by default.
+
+    Returns:
+        DensityGrid: Counts, cell edges and the cell of every counted
+        point.
+
+    Raises:
+        ValueError: If x and y differ in length or no point is left.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) != len(y):
+        raise ValueError(f"x has {len(x)} points, y has {len(y)}")
+    keep = ~(np.isnan(x) | np.isnan(y))
+    if x_range is not None:
+        keep &= (x >= x_range[0]) & (x <= x_range[1])
+    if y_range is not None:
+        keep &= (y >= y_range[0]) & (y <= y_range[1])
+    x, y = x[keep], y[keep]
+    if len(x) == 0:
+        raise ValueError("No points to bin")
+
+    x_edges = _edges(x, bins[0], x_range)
+    y_edges = _edges(y, bins[1], y_range)
+    cells = _cell_index(x, x_edges) * bins[1] + _cell_index(y, y_edges)
+    counts = np.bincount(cells, minlength=bins[0] * bins[1])
+    return DensityGrid(counts.reshape(bins), x_edges, y_edges, cells)
+
+
+def sparse_points(
+    x: np.ndarray,
+    y: np.ndarray,
+    grid: DensityGrid,
+    max_count: int = OUTLIER_MAX_COUNT,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Points in cells of the grid with at most max_count points, i.e. the
+    outliers a density image would show as faint single pixels.
+
+    Args:
+        x, y: The points the grid was built from.
+        grid (DensityGrid): Result of density_grid for these points.
+        max_count (int): Largest cell count considered sparse.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: x and y of the sparse points.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    keep &= (x >= grid.x_edges[0]) & (x <= grid.x_edges[-1])
+    keep &= (y >= grid.y_edges[0]) & (y <= grid.y_edges[-1])
+    sparse = grid.counts.ravel()[grid.cells] <= max_count
+    return x[keep][sparse], y[keep][sparse]
+
+
+def scatter_or_density(
+    ax,
+    x: np.ndarray,
+    y: np.ndarray,
+    color: str = "royalblue",
+    cmap: str = "Blues",
+    point_limit: int = SCATTER_POINT_LIMIT,
+    bins: Tuple[int, int] = DENSITY_BINS,
+    show_outliers: bool = True,
+    outlier_max_count: int = OUTLIER_MAX_COUNT,
+) -> str:
+    """
+    Draw a scatter plot, or, above point_limit points, a density image
+    of the points binned in a grid (log colour scale), optionally with
+    the points of sparse cells drawn on top.
+
+    Args:
+        ax: Matplotlib axes.
+        x, y: Coordinates of the points.
+        color (str): Colour of the points.
+        cmap (str): Colour map of the density image.
+        point_limit (int): Largest number of points drawn one by one.
+        bins (Tuple[int, int]): Cells of the density grid along x and y.
+        show_outliers (bool): Draw the points of sparse cells.
+        outlier_max_count (int): Largest cell count considered sparse.
+
+    Returns:
+        str: "scatter" or "density", the mode used.
+    """
+    if len(x) <= point_limit:
+        ax.scatter(x, y, s=12, color=color, alpha=0.6, edgecolors="none")
+        return "scatter"
+
+    grid = density_grid(x, y, bins)
+    # Empty cells are left blank
+    counts = np.ma.masked_equal(grid.counts, 0)
+    image = ax.imshow(
+        counts.T,
+        origin="lower",
+        extent=(
+            grid.x_edges[0],
+            grid.x_edges[-1],
+            grid.y_edges[0],
+            grid.y_edges[-1],
+        ),
+        aspect="auto",
+        interpolation="nearest",
+        cmap=cmap,
+        norm=LogNorm(vmin=1, vmax=max(int(grid.counts.max()), 2)),
+    )
+    ax.figure.colorbar(image, ax=ax, label="points")
+    if show_outliers:
+        outlier_x, outlier_y = sparse_points(x, y, grid, outlier_max_count)
+        ax.scatter(
+            outlier_x, outlier_y, s=6, color=color, edgecolors="none"
+        )
+    return "density"
@@ -1,7 +1,12 @@
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from src.streamlit.data_access import (
+    get_correlation_matrix,
+    get_correlation_neighbours,
+    get_numeric_columns,
+    load_customers,
+)
 
 
 def main():
@@ -11,8 +16,9 @@ def main():
     st.title("Capstone Insurance ETL Dashboard")
     st.divider()
 
-    # Load cleaned dataset
-    customers_df = pd.read_csv("data/processed/cleaned_customers.csv")
+    # Load cleaned dataset and its correlations (cached per process)
+    customers_df = load_customers()
+    correlation_matrix = get_correlation_matrix()
 
     # Define column groups
     demographics_cols = [
@@ -127,10 +133,7 @@ def main():
             selected_cols.extend(groups[g])
 
         # Create search box to find correlations
-        numeric_cols = customers_df.select_dtypes(
-            include=["int64", "float64"]
-        ).columns.tolist()
-        numeric_cols = sorted(numeric_cols)
+        numeric_cols = get_numeric_columns()
 
         st.markdown(
             "<h3><b>Select variable to explore correlations:</b></h3>",
@@ -145,11 +148,7 @@ def main():
 
         # Show correlation with annual_premium
         if "annual_premium" in customers_df.columns:
-            corr_value = (
-                customers_df[numeric_cols]
-                .corr()
-                .loc[target_col, "annual_premium"]
-            )
+            corr_value = correlation_matrix.loc[target_col, "annual_premium"]
             r_squared = corr_value**2
 
             st.metric(
@@ -165,13 +164,21 @@ def main():
         else:
             st.warning("annual_premium column not found in dataset.")
 
+        # Strongest correlations, looked up in the ranked pairs
+        st.markdown(f"**Strongest correlations with {target_col}**")
+        neighbours = get_correlation_neighbours(target_col)
+        st.dataframe(
+            neighbours[["feature_b", "r"]].rename(
+                columns={"feature_b": "variable"}
+            ),
+            hide_index=True,
+        )
+
     with col2:
         if selected_cols:
             # Compute correlations with the selected variable,
             # Only for the values in the SELECT DATA GROUPS.
-            corr_all = (
-                customers_df[numeric_cols].corr()[target_col].drop(target_col)
-            )
+            corr_all = correlation_matrix[target_col].drop(target_col)
             corr_with_target = corr_all.loc[
                 corr_all.index.intersection(selected_cols)
             ]
@@ -1,7 +1,14 @@
 import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
-import pandas as pd
+from src.streamlit.data_access import (
+    load_customers,
+    load_histograms,
+    load_segment_cube,
+)
+from src.streamlit.density import SCATTER_POINT_LIMIT, scatter_or_density
+from src.transform.histograms import rebin
+from src.transform.segment_cube import segment_means
 
 # Configure page
 st.set_page_config(page_title="App 2 - Data Distributions", layout="wide")
@@ -13,8 +20,13 @@ st.write(
     "distributions in the customers dataset."
 )
 
-# Load dataset
-df = pd.read_csv("data/processed/cleaned_customers.csv")
+# Load dataset (cached per process, includes age_group and chronic_bucket)
+df = load_customers()
+# Counts and means per segment, precomputed by the ETL: the bar charts
+# and pies are drawn from these few dozen rows instead of the customers
+cube = load_segment_cube()
+# Fine fixed-bin histograms, merged into the bins each chart shows
+histograms = load_histograms()
 
 # Column groups
 demographic_cols = ["region", "urban_rural", "age", "sex"]
@@ -29,44 +41,103 @@ health_cols = [
 lifestyle_cols = ["bmi", "smoker", "alcohol_freq", "visits_last_year"]
 
 
+YES_NO = {"0": "No", "1": "Yes"}
+
+
 # FUNCTIONS
-def plot_demographics(df):
+def segment_counts(cube, dimension):
+    rows = cube[cube["dimension"] == dimension]
+    return rows.set_index("value")["count"]
+
+
+def plot_segment_means(
+    ax, cube, dimension, palette, measure="annual_medical_cost", labels=None
+):
+    # Bar per segment with its 95% confidence interval, as sns.barplot
+    # draws, computed from the cube sums instead of bootstrapping rows
+    means = segment_means(cube, dimension, measure)
+    names = means["value"].map(labels or {}).fillna(means["value"])
+    ax.bar(
+        names,
+        means["mean"],
+        yerr=means["ci"],
+        color=sns.color_palette(palette, len(means)),
+        capsize=4,
+    )
+    ax.set_xlabel(dimension)
+    ax.set_ylabel(measure)
+    return ax
+
+
+def plot_histogram(ax, histograms, column, max_bins, color):
+    bins = rebin(histograms, column, max_bins=max_bins)
+    ax.bar(
+        bins["bin_start"],
+        bins["count"],
+        width=bins["bin_end"] - bins["bin_start"],
+        align="edge",
+        color=color,
+        edgecolor="white",
+        alpha=0.75,
+    )
+    ax.set_xlabel(column)
+    ax.set_ylabel("count")
+    return ax
+
+
+def plot_condition_pie(ax, cube, condition, title):
+    counts = segment_counts(cube, condition)
+    pct = counts.get("1", 0) / counts.sum() * 100
+    ax.pie(
+        counts,
+        labels=[YES_NO[value] for value in counts.index],
+        autopct="%1.1f%%",
+        colors=["royalblue", "darksalmon"],
+        startangle=90,
+    )
+    ax.set_title(
+        f"{title}\n({pct:.1f}% affected)", fontsize=15, fontweight="bold"
+    )
+
+
+def condition_pct(cube, condition):
+    counts = segment_counts(cube, condition)
+    return counts.get("1", 0) / counts.sum() * 100
+
+
+def plot_demographics(cube, histograms):
     st.subheader("Demographic and Socioeconomic Distributions")
     fig, axes = plt.subplots(2, 2, figsize=(16, 10))
 
     # Sex distribution
-    sns.countplot(
-        data=df,
-        x="sex",
-        palette=["royalblue", "darksalmon", "peachpuff"],
-        ax=axes[0, 0],
-    ).set_title("Sex Distribution", fontsize=15, fontweight="bold")
+    counts = segment_counts(cube, "sex")
+    axes[0, 0].bar(
+        counts.index,
+        counts.values,
+        color=["royalblue", "darksalmon", "peachpuff"],
+    )
+    axes[0, 0].set_title("Sex Distribution", fontsize=15, fontweight="bold")
+    axes[0, 0].set_xlabel("sex")
+    axes[0, 0].set_ylabel("count")
 
     # Age distribution
-    sns.histplot(
-        data=df,
-        x="age",
-        bins=20,
-        color="royalblue",
-        ax=axes[0, 1],
+    plot_histogram(
+        axes[0, 1], histograms, "age", max_bins=20, color="royalblue"
     ).set_title("Age Distribution", fontsize=15, fontweight="bold")
 
     # Income distribution
-    sns.histplot(
-        data=df,
-        x="income",
-        bins=50,
-        color="royalblue",
-        ax=axes[1, 0],
+    plot_histogram(
+        axes[1, 0], histograms, "income", max_bins=50, color="royalblue"
     ).set_title("Income Distribution", fontsize=15, fontweight="bold")
 
     # Employment status bar chart
-    counts = df["employment_status"].value_counts()
-    sns.barplot(
-        x=counts.index,
-        y=counts.values,
-        palette="muted",
-        ax=axes[1, 1],
+    counts = segment_counts(cube, "employment_status").sort_values(
+        ascending=False
+    )
+    axes[1, 1].bar(
+        counts.index,
+        counts.values,
+        color=sns.color_palette("muted", len(counts)),
     )
     axes[1, 1].set_title("Employment Status", fontsize=15, fontweight="bold")
     axes[1, 1].set_xlabel("Employment Status", fontsize=12)
@@ -90,97 +161,20 @@ def plot_demographics(df):
     st.pyplot(fig)
 
 
-def plot_health_conditions(df):
+def plot_health_conditions(cube):
     st.subheader("Health Condition Distribution")
     fig, axes = plt.subplots(2, 3, figsize=(20, 12))
 
-    # Hypertension
-    counts = df["hypertension"].value_counts()
-    pct = counts.get(1, 0) / counts.sum() * 100
-    axes[0, 0].pie(
-        counts,
-        labels=["No", "Yes"],
-        autopct="%1.1f%%",
-        colors=["royalblue", "darksalmon"],
-        startangle=90,
-    )
-    axes[0, 0].set_title(
-        f"Hypertension\n({pct:.1f}% affected)", fontsize=15, fontweight="bold"
-    )
-
-    # Diabetes
-    counts = df["diabetes"].value_counts()
-    pct = counts.get(1, 0) / counts.sum() * 100
-    axes[0, 1].pie(
-        counts,
-        labels=["No", "Yes"],
-        autopct="%1.1f%%",
-        colors=["royalblue", "darksalmon"],
-        startangle=90,
-    )
-    axes[0, 1].set_title(
-        f"Diabetes\n({pct:.1f}% affected)", fontsize=15, fontweight="bold"
-    )
-
-    # Asthma
-    counts = df["asthma"].value_counts()
-    pct = counts.get(1, 0) / counts.sum() * 100
-    axes[0, 2].pie(
-        counts,
-        labels=["No", "Yes"],
-        autopct="%1.1f%%",
-        colors=["royalblue", "darksalmon"],
-        startangle=90,
-    )
-    axes[0, 2].set_title(
-        f"Asthma\n({pct:.1f}% affected)", fontsize=15, fontweight="bold"
-    )
-
-    # COPD
-    counts = df["copd"].value_counts()
-    pct = counts.get(1, 0) / counts.sum() * 100
-    axes[1, 0].pie(
-        counts,
-        labels=["No", "Yes"],
-        autopct="%1.1f%%",
-        colors=["royalblue", "darksalmon"],
-        startangle=90,
-    )
-    axes[1, 0].set_title(
-        f"COPD\n({pct:.1f}% affected)", fontsize=15, fontweight="bold"
-    )
-
-    # Cardiovascular disease
-    counts = df["cardiovascular_disease"].value_counts()
-    pct = counts.get(1, 0) / counts.sum() * 100
-    axes[1, 1].pie(
-        counts,
-        labels=["No", "Yes"],
-        autopct="%1.1f%%",
-        colors=["royalblue", "darksalmon"],
-        startangle=90,
-    )
-    axes[1, 1].set_title(
-        f"Cardiovascular Disease\n({pct:.1f}% affected)",
-        fontsize=15,
-        fontweight="bold",
-    )
-
-    # Cancer history
-    counts = df["cancer_history"].value_counts()
-    pct = counts.get(1, 0) / counts.sum() * 100
-    axes[1, 2].pie(
-        counts,
-        labels=["No", "Yes"],
-        autopct="%1.1f%%",
-        colors=["royalblue", "darksalmon"],
-        startangle=90,
-    )
-    axes[1, 2].set_title(
-        f"Cancer History\n({pct:.1f}% affected)",
-        fontsize=15,
-        fontweight="bold",
-    )
+    titles = {
+        "hypertension": "Hypertension",
+        "diabetes": "Diabetes",
+        "asthma": "Asthma",
+        "copd": "COPD",
+        "cardiovascular_disease": "Cardiovascular Disease",
+        "cancer_history": "Cancer History",
+    }
+    for ax, (condition, title) in zip(axes.flat, titles.items()):
+        plot_condition_pie(ax, cube, condition, title)
 
     fig.suptitle(
         "Health Condition Distribution", fontsize=18, fontweight="bold"
@@ -189,74 +183,32 @@ def plot_health_conditions(df):
     st.pyplot(fig)
 
 
-def plot_health_conditions_varied(df):
+def plot_health_conditions_varied(cube):
     st.subheader("Health Condition Distribution (Varied Graphs)")
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
 
-    # Hypertension: Bar plot vs cost
-    counts = df["hypertension"].value_counts()
-    pct = counts.get(1, 0) / counts.sum() * 100
-    sns.barplot(
-        x=df["hypertension"].map({0: "No", 1: "Yes"}),
-        y=df["annual_medical_cost"],
-        palette=["royalblue", "darksalmon"],
-        ax=axes[0, 0],
-    )
-    axes[0, 0].set_title(
-        f"Hypertension vs Cost\n({pct:.1f}% affected)",
-        fontsize=15,
-        fontweight="bold",
-    )
-
-    # COPD: Bar plot vs cost
-    counts = df["copd"].value_counts()
-    pct = counts.get(1, 0) / counts.sum() * 100
-    sns.barplot(
-        x=df["copd"].map({0: "No", 1: "Yes"}),
-        y=df["annual_medical_cost"],
-        palette=["royalblue", "darksalmon"],
-        ax=axes[0, 1],
-    )
-    axes[0, 1].set_title(
-        f"COPD vs Cost\n({pct:.1f}% affected)",
-        fontsize=15,
-        fontweight="bold",
-    )
-
-    # Cardiovascular Disease: Bar plot vs cost
-    counts = df["cardiovascular_disease"].value_counts()
-    pct = counts.get(1, 0) / counts.sum() * 100
-    sns.barplot(
-        x=df["cardiovascular_disease"].map({0: "No", 1: "Yes"}),
-        y=df["annual_medical_cost"],
-        palette=["royalblue", "darksalmon"],
-        ax=axes[1, 0],
-    )
-    axes[1, 0].set_title(
-        f"Cardiovascular Disease vs Cost\n({pct:.1f}% affected)",
-        fontsize=15,
-        fontweight="bold",
-    )
-
-    # Cancer History: Histogram split by cancer history
-    counts = df["cancer_history"].value_counts()
-    pct = counts.get(1, 0) / counts.sum() * 100
-
-    sns.barplot(
-        x=df["cancer_history"].map({0: "No", 1: "Yes"}),
-        y=df["annual_medical_cost"],
-        palette=["royalblue", "darksalmon"],
-        ax=axes[1, 1],
-    )
-
-    axes[1, 1].set_title(
-        f"Cancer History vs Cost\n({pct:.1f}% affected)",
-        fontsize=15,
-        fontweight="bold",
-    )
-    axes[1, 1].set_xlabel("Cancer History", fontsize=12)
+    titles = {
+        "hypertension": "Hypertension",
+        "copd": "COPD",
+        "cardiovascular_disease": "Cardiovascular Disease",
+        "cancer_history": "Cancer History",
+    }
+    for ax, (condition, title) in zip(axes.flat, titles.items()):
+        plot_segment_means(
+            ax,
+            cube,
+            condition,
+            ["royalblue", "darksalmon"],
+            labels=YES_NO,
+        )
+        ax.set_title(
+            f"{title} vs Cost\n"
+            f"({condition_pct(cube, condition):.1f}% affected)",
+            fontsize=15,
+            fontweight="bold",
+        )
+        ax.set_xlabel(title, fontsize=12)
     axes[1, 1].set_ylabel("Average Annual Medical Cost", fontsize=12)
-    axes[1, 1].grid(True, linestyle="--", alpha=0.6)
 
     # Title
     axes[1, 1].set_title(
@@ -277,7 +229,7 @@ def plot_health_conditions_varied(df):
     st.pyplot(fig)
 
 
-def plot_cost_factors(df):
+def plot_cost_factors(df, cube, histograms):
     st.subheader("Various Factors Affecting Annual Medical Cost")
     fig, axes = plt.subplots(2, 3, figsize=(20, 13))
     fig.suptitle(
@@ -286,78 +238,72 @@ def plot_cost_factors(df):
         fontweight="bold",
     )
 
-    sns.scatterplot(
-        x=df["bmi"],
-        y=df["annual_medical_cost"],
-        ax=axes[0, 0],
+    # Above SCATTER_POINT_LIMIT customers the points are binned into a
+    # density image, which renders in the same time for any data size
+    show_outliers = st.checkbox(
+        "Show sparse points (outliers) on density plots",
+        value=True,
+        help=f"Plots of more than {SCATTER_POINT_LIMIT:,} customers are "
+        "drawn as density images.",
+    )
+    scatter_or_density(
+        axes[0, 0],
+        df["bmi"].to_numpy(),
+        df["annual_medical_cost"].to_numpy(),
         color="royalblue",
-    ).set_title("BMI vs Annual Medical Cost", fontsize=15, fontweight="bold")
+        cmap="Blues",
+        show_outliers=show_outliers,
+    )
+    axes[0, 0].set_title(
+        "BMI vs Annual Medical Cost", fontsize=15, fontweight="bold"
+    )
+    axes[0, 0].set_xlabel("bmi")
+    axes[0, 0].set_ylabel("annual_medical_cost")
 
-    sns.scatterplot(
-        x=df["age"],
-        y=df["annual_medical_cost"],
-        ax=axes[0, 1],
+    scatter_or_density(
+        axes[0, 1],
+        df["age"].to_numpy(),
+        df["annual_medical_cost"].to_numpy(),
         color="darksalmon",
-    ).set_title("Age vs Annual Medical Cost", fontsize=15, fontweight="bold")
+        cmap="Oranges",
+        show_outliers=show_outliers,
+    )
+    axes[0, 1].set_title(
+        "Age vs Annual Medical Cost", fontsize=15, fontweight="bold"
+    )
+    axes[0, 1].set_xlabel("age")
+    axes[0, 1].set_ylabel("annual_medical_cost")
 
-    sns.histplot(
-        data=df,
-        x="annual_medical_cost",
-        bins=50,
+    plot_histogram(
+        axes[0, 2],
+        histograms,
+        "annual_medical_cost",
+        max_bins=50,
         color="royalblue",
-        ax=axes[0, 2],
     ).set_title(
         "Annual Medical Cost Distribution", fontsize=15, fontweight="bold"
     )
 
-    sns.barplot(
-        x=df["smoker"],
-        y=df["annual_medical_cost"],
-        ax=axes[1, 0],
-        palette=["royalblue", "darksalmon", "gold"],
+    plot_segment_means(
+        axes[1, 0], cube, "smoker", ["royalblue", "darksalmon", "gold"]
     ).set_title(
         "Smoker vs Annual Medical Cost", fontsize=15, fontweight="bold"
     )
 
     # Average cost vs age group bar plot
-    bins = [0, 30, 40, 50, 60, 70, 120]
-    labels = ["<30", "30-40", "40-50", "50-60", "60-70", "70+"]
-
-    df["age_group"] = pd.cut(df["age"], bins=bins, labels=labels, right=False)
-
-    sns.barplot(
-        data=df,
-        x="age_group",
-        y="annual_medical_cost",
-        palette="Blues",
-        ax=axes[1, 1],
-    )
+    plot_segment_means(axes[1, 1], cube, "age_group", "Blues")
 
-    axes[1, 2].set_title(
+    axes[1, 1].set_title(
         "Average Annual Medical Cost by Age Group",
         fontsize=15,
         fontweight="bold",
     )
-    axes[1, 2].set_xlabel("Age Group", fontsize=12)
-    axes[1, 2].set_ylabel("Average Annual Medical Cost", fontsize=12)
-    axes[1, 2].grid(True, linestyle="--", alpha=0.6)
+    axes[1, 1].set_xlabel("Age Group", fontsize=12)
+    axes[1, 1].set_ylabel("Average Annual Medical Cost", fontsize=12)
+    axes[1, 1].grid(True, linestyle="--", alpha=0.6)
 
     # Chronic count: Bar plot vs cost
-    df["chronic_bucket"] = pd.cut(
-        df["chronic_count"],
-        bins=[0, 1, 2, 3, 4, float("inf")],
-        labels=["1", "2", "3", "4", "5+"],
-        right=True,
-    )
-
-    #
-    sns.barplot(
-        data=df,
-        x="chronic_bucket",
-        y="annual_medical_cost",
-        palette="coolwarm",
-        ax=axes[1, 2],
-    )
+    plot_segment_means(axes[1, 2], cube, "chronic_bucket", "coolwarm")
 
     axes[1, 2].set_title(
         "Average Annual Medical Cost by Chronic Condition Count",
@@ -378,8 +324,8 @@ def plot_cost_factors(df):
     st.pyplot(fig)
 
 
-plot_demographics(df)
-plot_health_conditions(df)
-plot_health_conditions_varied(df)
-plot_cost_factors(df)
+plot_demographics(cube, histograms)
+plot_health_conditions(cube)
+plot_health_conditions_varied(cube)
+plot_cost_factors(df, cube, histograms)
 # plot_sex_vs_cost(df)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+# Long format of the correlation table: one row per ordered pair of
+# different features. rank orders the neighbours of feature_a by
+# strength (abs_r, strongest first), so "what correlates most with X"
+# is a lookup of feature_a = X, rank <= k.
+PAIR_COLUMNS = ["feature_a", "feature_b", "r", "abs_r", "rank"]
+
+# Neighbours kept per feature in the top-k list
+TOP_K = 10
+
+
+def correlation_pairs(correlation_table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turn a wide correlation table into ranked feature pairs.
+
+    Every pair appears in both directions, so the neighbours of a
+    feature are the rows with that feature_a. Self-correlations are
+    left out. Undefined correlations (e.g. of a constant column) are
+    ranked after all the others, and ties by feature_b name.
+
+    Args:
+        correlation_table (pd.DataFrame): Correlation table with a
+            "feature" column and one column per feature, as saved by
+            the transform, or a square matrix indexed by feature.
+
+    Returns:
+        pd.DataFrame: Columns feature_a, feature_b, r, abs_r and rank
+        (from 1), sorted by feature_a and rank.
+    """
+    matrix = (
+        correlation_table.set_index("feature")
+        if "feature" in correlation_table.columns
+        else correlation_table
+    )
+    features = np.asarray(matrix.index, dtype=object)
+    values = matrix.loc[:, features].to_numpy(dtype=np.float64)
+    a, b = np.nonzero(~np.eye(len(features), dtype=bool))
+    pairs = pd.DataFrame(
+        {
+            "feature_a": features[a],
+            "feature_b": features[b],
+            "r": values[a, b],
+        }
+    )
+    pairs["abs_r"] = pairs["r"].abs()
+    pairs = pairs.sort_values(
+        ["feature_a", "abs_r", "feature_b"],
+        ascending=[True, False, True],
+        na_position="last",
+        ignore_index=True,
+    )
+    pairs["rank"] = pairs.groupby("feature_a", sort=False).cumcount() + 1
+    return pairs[PAIR_COLUMNS]
+
+
+def top_neighbours(pairs: pd.DataFrame, k: int = TOP_K) -> pd.DataFrame:
+    """
+    The k strongest correlations of every feature.
+
+    Args:
+        pairs (pd.DataFrame): Result of correlation_pairs.
+        k (int): Neighbours per feature.
+
+    Returns:
+        pd.DataFrame: The pairs with rank <= k.
+
+    Raises:
+        ValueError: If k is not positive.
+    """
+    if k <= 0:
+        raise ValueError(f"k must be positive, got {k}")
+    return pairs[pairs["rank"] <= k].reset_index(drop=True)
@@ -0,0 +1,205 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+
+class CorrelationAccumulator:
+    """
+    Accumulate the sufficient statistics of a Pearson correlation table
+    one batch at a time, so the full dataset never has to be in memory.
+
+    For every pair of columns (i, j) the accumulator keeps, over the rows
+    where both values are present:
+        counts[i, j]          number of rows
+        sums[i, j]            sum of column i
+        sums_of_squares[i, j] sum of column i squared
+        cross_products[i, j]  sum of column i times column j
+    This gives the same pairwise-complete result as DataFrame.corr() when
+    values are missing.
+
+    Values are shifted by a reference point (the means of the first
+    batch) before they are summed, which keeps the sums small and avoids
+    losing precision on large columns such as income.
+
+    Accumulators built over different chunks, files or processes can be
+    merged exactly, and saved to / loaded from an .npz file.
+    """
+
+    def __init__(self, columns: List[str]):
+        k = len(columns)
+        self.columns = list(columns)
+        self.rows = 0
+        self.shift: Optional[np.ndarray] = None
+        self.counts = np.zeros((k, k))
+        self.sums = np.zeros((k, k))
+        self.sums_of_squares = np.zeros((k, k))
+        self.cross_products = np.zeros((k, k))
+
+    def update(
+        self, df: pd.DataFrame, dtype: np.dtype = np.float64
+    ) -> "CorrelationAccumulator":
+        """
+        Add the rows of a DataFrame to the running statistics.
+
+        Args:
+            df (pd.DataFrame): Batch containing all the tracked columns.
+            dtype: Precision of the matrix products. float32 halves the
+                memory traffic of the products, at about 1e-6 accuracy;
+                the statistics are always added up in float64. Counts
+                are only exact in float32 for batches under 2**24 rows.
+
+        Returns:
+            CorrelationAccumulator: The updated accumulator.
+        """
+        values = df[self.columns].to_numpy(dtype=np.float64)
+        if len(values) == 0:
+            return self
+
+        present = ~np.isnan(values)
+        if self.shift is None:
+            with np.errstate(invalid="ignore"):
+                column_means = values.sum(axis=0, where=present) / (
+                    present.sum(axis=0)
+                )
+            self.shift = np.nan_to_num(column_means)
+
+        shifted = np.where(present, values - self.shift, 0.0)
+        self.rows += len(values)
+
+        if present.all():
+            # Fast path: every pair sees every row
+            column_sums = shifted.sum(axis=0)
+            column_squares = (shifted**2).sum(axis=0)
+            self.counts += len(values)
+            self.sums += column_sums[:, None]
+            self.sums_of_squares += column_squares[:, None]
+        else:
+            # Counts, sums and sums of squares over the rows where both
+            # columns are present, in one product with the mask
+            k = len(self.columns)
+            mask = present.astype(dtype)
+            stacked = np.hstack([mask, shifted, shifted**2]).astype(
+                dtype, copy=False
+            )
+            pair_stats = (stacked.T @ mask).astype(np.float64)
+            self.counts += pair_stats[:k]
+            self.sums += pair_stats[k:2 * k]
+            self.sums_of_squares += pair_stats[2 * k:]
+        shifted = shifted.astype(dtype, copy=False)
+        self.cross_products += (shifted.T @ shifted).astype(np.float64)
+        return self
+
+    def merge(
+        self, other: "CorrelationAccumulator"
+    ) -> "CorrelationAccumulator":
+        """
+        Add the statistics of another accumulator to this one.
+
+        The result is the same as if every row seen by the other
+        accumulator had been passed to update() on this one.
+
+        Args:
+            other (CorrelationAccumulator): Accumulator over the same
+            columns.
+
+        Returns:
+            CorrelationAccumulator: This accumulator, updated.
+
+        Raises:
+            ValueError: If the accumulators track different columns.
+        """
+        if other.columns != self.columns:
+            raise ValueError(
+                "Cannot merge correlation statistics over different columns"
+            )
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift.copy()
+
+        # Move the other statistics onto this reference point:
+        # x - self.shift = (x - other.shift) + d
+        d = other.shift - self.shift
+        n, s = other.counts, other.sums
+        self.counts += n
+        self.sums += s + n * d[:, None]
+        self.sums_of_squares += (
+            other.sums_of_squares + 2 * d[:, None] * s + n * d[:, None] ** 2
+        )
+        self.cross_products += (
+            other.cross_products
+            + s * d[None, :]
+            + d[:, None] * s.T
+            + n * np.outer(d, d)
+        )
+        self.rows += other.rows
+        return self
+
+    def correlation(self) -> pd.DataFrame:
+        """
+        Build the correlation matrix from the accumulated statistics.
+
+        Returns:
+            pd.DataFrame: Square correlation matrix indexed by column name,
+            in the same layout as DataFrame.corr().
+        """
+        n = self.counts
+        with np.errstate(divide="ignore", invalid="ignore"):
+            centred_squares = self.sums_of_squares - self.sums**2 / n
+            covariance = self.cross_products - self.sums * self.sums.T / n
+            matrix = covariance / np.sqrt(
+                np.clip(centred_squares * centred_squares.T, 0, None)
+            )
+
+        # Fewer than two rows or no variation gives no correlation
+        undefined = (n < 2) | (centred_squares <= 0) | (centred_squares.T <= 0)
+        matrix[undefined] = np.nan
+        matrix = np.clip(matrix, -1.0, 1.0)
+        diagonal = np.diag(undefined)
+        np.fill_diagonal(matrix, np.where(diagonal, np.nan, 1.0))
+
+        return pd.DataFrame(matrix, index=self.columns, columns=self.columns)
+
+    def save(self, path: str) -> None:
+        """
+        Save the statistics to an .npz file.
+
+        Args:
+            path (str): Destination file path.
+        """
+        np.savez(
+            path,
+            columns=np.array(self.columns, dtype=str),
+            rows=self.rows,
+            shift=(
+                self.shift
+                if self.shift is not None
+                else np.full(len(self.columns), np.nan)
+            ),
+            counts=self.counts,
+            sums=self.sums,
+            sums_of_squares=self.sums_of_squares,
+            cross_products=self.cross_products,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CorrelationAccumulator":
+        """
+        Load statistics saved with save().
+
+        Args:
+            path (str): Path of the .npz file.
+
+        Returns:
+            CorrelationAccumulator: The restored accumulator.
+        """
+        with np.load(path) as data:
+            accumulator = cls(data["columns"].tolist())
+            accumulator.rows = int(data["rows"])
+            shift = data["shift"]
+            accumulator.shift = None if np.isnan(shift).all() else shift
+            accumulator.counts = data["counts"]
+            accumulator.sums = data["sums"]
+            accumulator.sums_of_squares = data["sums_of_squares"]
+            accumulator.cross_products = data["cross_products"]
+        return accumulator
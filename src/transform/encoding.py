@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional
+from config.encoding_config import ENCODINGS
+from src.utils.logging_utils import track_stage
+
+
+@track_stage("encode_categoricals")
+def encode_categoricals(
+    customers: pd.DataFrame,
+    encodings: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> pd.DataFrame:
+    """
+    Encode categorical columns as numbers using a declarative table.
+
+    Each column is encoded from its categorical codes: the (few)
+    categories are looked up once, and the codes are then mapped to the
+    encoded values with a single array lookup. No per-row string
+    comparisons or object-dtype intermediates are needed.
+
+    Args:
+        customers (pd.DataFrame): Customers to encode. Columns in the
+        table that are missing from the frame are skipped.
+        encodings (dict): Column to encoding mapping, see
+        config/encoding_config.py. Defaults to ENCODINGS.
+
+    Returns:
+        pd.DataFrame: The customers with the columns encoded.
+
+    Raises:
+        ValueError: If a column has labels that are not in its encoding,
+        or missing values and no default.
+    """
+    if encodings is None:
+        encodings = ENCODINGS
+
+    for col, encoding in encodings.items():
+        if col in customers:
+            customers[col] = encode_column(customers[col], encoding)
+
+    return customers
+
+
+def encode_column(series: pd.Series, encoding: Dict[str, Any]) -> np.ndarray:
+    # Work on categorical codes; object columns are converted once
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype("category")
+
+    code_for_label = dict(zip(encoding["categories"], encoding["codes"]))
+    labels = series.cat.categories
+    unknown = [label for label in labels if label not in code_for_label]
+    if unknown:
+        raise ValueError(
+            f"Unexpected values in column '{series.name}': {unknown}"
+        )
+
+    codes = series.cat.codes.to_numpy()
+    missing = codes < 0
+    default = encoding["default"]
+    if missing.any() and default is None:
+        raise ValueError(
+            f"Missing values in column '{series.name}' and no default set"
+        )
+
+    lookup = np.array(
+        [code_for_label[label] for label in labels] + [default or 0],
+        dtype=encoding["dtype"],
+    )
+    # Code -1 (missing) picks the default at the end of the lookup
+    return lookup[codes]
@@ -0,0 +1,315 @@
+import logging
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+from typing import Iterable, Tuple
+from src.utils.logging_utils import setup_logger
+
+logger = setup_logger(__name__, "fingerprint_index.log", level=logging.DEBUG)
+
+# Status of a customer row looked up in the index
+UNCHANGED = 0
+NEW = 1
+CHANGED = 2
+
+BLOOM_CAPACITY = 1_000_000
+BLOOM_ERROR_RATE = 0.01
+SQLITE_BATCH_SIZE = 50_000
+
+
+class BloomFilter:
+    """
+    Set membership with no false negatives and a small, fixed rate of
+    false positives, in about 10 bits per key at a 1% error rate.
+
+    Keys are uint64 hashes. The k bit positions of a key come from its
+    two 32-bit halves (double hashing), so no extra hashing is needed.
+
+    Reference: Kirsch and Mitzenmacher, "Less hashing, same performance:
+    building a better Bloom filter" (2006).
+    """
+
+    def __init__(
+        self,
+        capacity: int = BLOOM_CAPACITY,
+        error_rate: float = BLOOM_ERROR_RATE,
+    ):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        bits = -self.capacity * np.log(error_rate) / np.log(2) ** 2
+        self.size = int(np.ceil(bits / 8) * 8)
+        self.hash_count = max(1, round(self.size / self.capacity * np.log(2)))
+        self.bits = np.zeros(self.size // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, keys: np.ndarray) -> np.ndarray:
+        keys = np.asarray(keys, dtype=np.uint64)
+        low = keys & np.uint64(0xFFFFFFFF)
+        high = keys >> np.uint64(32)
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        return (low[:, None] + steps * high[:, None]) % np.uint64(self.size)
+
+    def add(self, keys: np.ndarray) -> None:
+        """Add uint64 keys."""
+        positions = self._positions(keys).ravel()
+        np.bitwise_or.at(
+            self.bits,
+            (positions >> np.uint64(3)).astype(np.int64),
+            (1 << (positions & np.uint64(7))).astype(np.uint8),
+        )
+        self.count += len(keys)
+
+    def might_contain(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Check uint64 keys.
+
+        Returns:
+            np.ndarray: False where a key was certainly never added, True
+            where it probably was.
+        """
+        positions = self._positions(keys)
+        bytes_ = self.bits[(positions >> np.uint64(3)).astype(np.int64)]
+        hits = bytes_ & (1 << (positions & np.uint64(7))).astype(np.uint8)
+        return (hits != 0).all(axis=1)
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            capacity=self.capacity,
+            error_rate=self.error_rate,
+            count=self.count,
+            bits=self.bits,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        with np.load(path) as data:
+            bloom = cls(int(data["capacity"]), float(data["error_rate"]))
+            bloom.count = int(data["count"])
+            bloom.bits = data["bits"]
+        return bloom
+
+
+def hash_keys(person_ids: Iterable[int]) -> np.ndarray:
+    # uint64 hash of each person_id, used as the Bloom filter key
+    ids = np.asarray(person_ids, dtype=np.int64)
+    return pd.util.hash_array(ids)
+
+
+def hash_rows(customers: pd.DataFrame) -> np.ndarray:
+    """
+    64-bit content hash of every row, over all columns in order.
+
+    Depends on the column dtypes, which are fixed by the customer schema,
+    so the same row gets the same hash in every run.
+    """
+    return pd.util.hash_pandas_object(customers, index=False).to_numpy()
+
+
+class FingerprintIndex:
+    """
+    Persistent record of the customers already processed, as person_id
+    plus a hash of the row content.
+
+    The fingerprints are stored in SQLite. A Bloom filter over the
+    person_ids, saved next to it, answers the common "never seen" case
+    without touching the database; only ids the filter may have seen
+    are looked up.
+
+    Lookups do not change the index. New fingerprints are staged with
+    stage() and written by commit(), so an index is only updated once
+    the outputs built from the rows have been saved.
+
+    Args:
+        path: Path of the SQLite file. The Bloom filter is saved to the
+            same path with a .bloom.npz suffix.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.bloom_path = f"{path}.bloom.npz"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            "person_id INTEGER PRIMARY KEY, row_hash INTEGER NOT NULL)"
+        )
+        self.bloom = self._load_bloom()
+        self._staged: list = []
+
+    def __enter__(self) -> "FingerprintIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM fingerprints"
+        ).fetchone()[0]
+
+    def _load_bloom(self) -> BloomFilter:
+        if os.path.exists(self.bloom_path):
+            return BloomFilter.load(self.bloom_path)
+        # No saved filter (first run, or it was deleted): rebuild it
+        return self._build_bloom(len(self))
+
+    def _build_bloom(self, rows: int) -> BloomFilter:
+        bloom = BloomFilter(capacity=max(BLOOM_CAPACITY, 2 * rows))
+        cursor = self.connection.execute("SELECT person_id FROM fingerprints")
+        while True:
+            batch = cursor.fetchmany(SQLITE_BATCH_SIZE)
+            if not batch:
+                break
+            bloom.add(hash_keys([row[0] for row in batch]))
+        return bloom
+
+    def lookup(
+        self, person_ids: np.ndarray, row_hashes: np.ndarray
+    ) -> np.ndarray:
+        """
+        Compare rows with the stored fingerprints.
+
+        Args:
+            person_ids: person_id of each row.
+            row_hashes: Content hash of each row, see hash_rows().
+
+        Returns:
+            np.ndarray: NEW, CHANGED or UNCHANGED for every row.
+        """
+        person_ids = np.asarray(person_ids, dtype=np.int64)
+        status = np.full(len(person_ids), NEW, dtype=np.int8)
+        maybe_seen = np.flatnonzero(
+            self.bloom.might_contain(hash_keys(person_ids))
+        )
+        if len(maybe_seen) == 0:
+            return status
+
+        previous = self._stored_hashes(person_ids[maybe_seen])
+        current = np.asarray(row_hashes, dtype=np.uint64).view(np.int64)
+        # Missing means the Bloom filter gave a false positive: still new
+        found = previous.notna().to_numpy()
+        same = previous.fillna(0).to_numpy(dtype=np.int64) == (
+            current[maybe_seen]
+        )
+        status[maybe_seen[found]] = np.where(same[found], UNCHANGED, CHANGED)
+
+        logger.debug(
+            f"Looked up {len(person_ids)} rows, "
+            f"{len(maybe_seen)} past the Bloom filter"
+        )
+        return status
+
+    def _stored_hashes(self, person_ids: np.ndarray) -> pd.Series:
+        # Join against a temporary table instead of a huge IN (...) list
+        self.connection.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS lookup_ids "
+            "(person_id INTEGER PRIMARY KEY)"
+        )
+        self.connection.execute("DELETE FROM lookup_ids")
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO lookup_ids VALUES (?)",
+            ((int(i),) for i in person_ids),
+        )
+        rows = self.connection.execute(
+            "SELECT f.person_id, f.row_hash FROM fingerprints f "
+            "JOIN lookup_ids USING (person_id)"
+        ).fetchall()
+        stored = pd.Series(
+            [row_hash for _, row_hash in rows],
+            index=[person_id for person_id, _ in rows],
+            dtype="Int64",
+        )
+        # Stored hash per requested id, <NA> where there is none
+        return stored.reindex(person_ids)
+
+    def stage(self, person_ids: np.ndarray, row_hashes: np.ndarray) -> None:
+        """Remember fingerprints to write on the next commit()."""
+        self._staged.append(
+            (
+                np.asarray(person_ids, dtype=np.int64),
+                np.asarray(row_hashes, dtype=np.uint64).view(np.int64),
+            )
+        )
+
+    def commit(self) -> int:
+        """
+        Write the staged fingerprints, replacing older ones for the same
+        person_id, and save the Bloom filter.
+
+        Returns:
+            int: Number of fingerprints written.
+        """
+        written = 0
+        with self.connection:
+            for person_ids, row_hashes in self._staged:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO fingerprints VALUES (?, ?)",
+                    zip(person_ids.tolist(), row_hashes.tolist()),
+                )
+                written += len(person_ids)
+
+        staged_ids = [person_ids for person_ids, _ in self._staged]
+        self._staged = []
+        if written:
+            total = len(self)
+            if total > self.bloom.capacity:
+                # Too full for the target error rate: rebuild larger
+                self.bloom = self._build_bloom(total)
+            else:
+                for person_ids in staged_ids:
+                    self.bloom.add(hash_keys(person_ids))
+            self.bloom.save(self.bloom_path)
+
+        logger.info(f"Committed {written} fingerprints to {self.path}")
+        return written
+
+
+def select_new_or_changed(
+    customers: pd.DataFrame,
+    index: FingerprintIndex,
+    key: str = "person_id",
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Keep only the customers that are new or changed since they were last
+    committed to the index, and stage their fingerprints.
+
+    The index holds one fingerprint per person_id, so a batch with
+    several different rows for the same person_id keeps only the last
+    one (and logs how many were dropped). Otherwise every run would
+    replace the stored fingerprint with another version and treat the
+    customer as changed again.
+
+    Args:
+        customers (pd.DataFrame): Trimmed, de-duplicated customers.
+        index (FingerprintIndex): Index of the customers seen before.
+        key (str): Column identifying a customer.
+
+    Returns:
+        Tuple: The new or changed customers, and the person_ids of the
+        changed ones (which replace an earlier version).
+    """
+    repeated = customers[key].duplicated(keep="last")
+    if repeated.any():
+        logger.warning(
+            f"{int(repeated.sum())} rows share a {key} with a later row "
+            "of the batch and were dropped, keeping the last version"
+        )
+        customers = customers[~repeated]
+
+    row_hashes = hash_rows(customers)
+    person_ids = customers[key].to_numpy(dtype=np.int64)
+    status = index.lookup(person_ids, row_hashes)
+
+    keep = status != UNCHANGED
+    index.stage(person_ids[keep], row_hashes[keep])
+    logger.info(
+        f"{int((status == NEW).sum())} new, "
+        f"{int((status == CHANGED).sum())} changed and "
+        f"{int((~keep).sum())} unchanged customers"
+    )
+    return customers[keep].copy(), person_ids[status == CHANGED]
@@ -0,0 +1,180 @@
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+# Width of the finest bins of every histogram. Bins start at multiples
+# of the width, so histograms of different batches line up and can be
+# added, and coarser histograms are made by merging adjacent bins.
+HISTOGRAM_BIN_WIDTHS = {
+    "age": 1,
+    "income": 1000,
+    "annual_medical_cost": 100,
+}
+
+HISTOGRAM_COLUMNS = ["column", "bin", "bin_start", "bin_end", "count"]
+
+
+class HistogramAccumulator:
+    """
+    Fixed-bin histograms of numeric columns, accumulated one batch at a
+    time. Bin i of a column covers [i * width, (i + 1) * width); the
+    range grows with the data, so no minimum or maximum has to be known
+    up front. Missing values are not counted.
+
+    Histograms of chunks, files or processes can be merged exactly.
+
+    Args:
+        bin_widths (Dict[str, float]): Bin width of every column.
+    """
+
+    def __init__(self, bin_widths: Optional[Dict[str, float]] = None):
+        self.bin_widths = dict(
+            HISTOGRAM_BIN_WIDTHS if bin_widths is None else bin_widths
+        )
+        # Per column: counts of the bins first_bin, first_bin + 1, ...
+        self.first_bins: Dict[str, int] = {}
+        self.counts: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def for_columns(cls, columns: Iterable[str]) -> "HistogramAccumulator":
+        """Histograms of the default columns found in columns."""
+        columns = set(columns)
+        return cls(
+            {
+                column: width
+                for column, width in HISTOGRAM_BIN_WIDTHS.items()
+                if column in columns
+            }
+        )
+
+    def update(self, df: pd.DataFrame) -> "HistogramAccumulator":
+        """
+        Count the values of a batch, one bincount per column.
+
+        Args:
+            df (pd.DataFrame): Batch containing all the tracked columns.
+
+        Returns:
+            HistogramAccumulator: The updated accumulator.
+        """
+        for column, width in self.bin_widths.items():
+            values = df[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                continue
+            bins = np.floor(values / width).astype(np.int64)
+            first_bin = int(bins.min())
+            self._add(column, first_bin, np.bincount(bins - first_bin))
+        return self
+
+    def _add(self, column: str, first_bin: int, counts: np.ndarray) -> None:
+        if column not in self.counts:
+            self.first_bins[column] = first_bin
+            self.counts[column] = counts.astype(np.int64)
+            return
+        # Widen the stored range to cover both, then add
+        old_first, old_counts = self.first_bins[column], self.counts[column]
+        start = min(old_first, first_bin)
+        end = max(old_first + len(old_counts), first_bin + len(counts))
+        merged = np.zeros(end - start, dtype=np.int64)
+        merged[old_first - start:old_first - start + len(old_counts)] += (
+            old_counts
+        )
+        merged[first_bin - start:first_bin - start + len(counts)] += counts
+        self.first_bins[column] = start
+        self.counts[column] = merged
+
+    def merge(self, other: "HistogramAccumulator") -> "HistogramAccumulator":
+        """
+        Add the counts of another accumulator with the same bin widths.
+
+        Raises:
+            ValueError: If the bin widths differ.
+        """
+        if other.bin_widths != self.bin_widths:
+            raise ValueError("Cannot merge histograms with other bin widths")
+        for column, counts in other.counts.items():
+            self._add(column, other.first_bins[column], counts)
+        return self
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        The histograms as a table: one row per column and bin, with the
+        bin index, its edges and the count. Empty bins inside the range
+        are included, so the table can be drawn as is.
+        """
+        frames = []
+        for column, width in self.bin_widths.items():
+            if column not in self.counts:
+                continue
+            counts = self.counts[column]
+            bins = np.arange(len(counts)) + self.first_bins[column]
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "column": column,
+                        "bin": bins,
+                        "bin_start": bins * width,
+                        "bin_end": (bins + 1) * width,
+                        "count": counts,
+                    }
+                )
+            )
+        if not frames:
+            return pd.DataFrame(columns=HISTOGRAM_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+
+def rebin(
+    histograms: pd.DataFrame,
+    column: str,
+    factor: Optional[int] = None,
+    max_bins: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Histogram of a column at a coarser resolution, by merging every
+    factor adjacent bins of the saved table. Coarse bins stay aligned on
+    multiples of factor times the bin width.
+
+    Args:
+        histograms (pd.DataFrame): Table produced by
+            HistogramAccumulator.to_frame.
+        column (str): Column whose histogram to return, e.g. "age".
+        factor (int, optional): Number of bins merged into one.
+        max_bins (int, optional): Instead of factor, merge the fewest
+            bins that give at most this many bins.
+
+    Returns:
+        pd.DataFrame: Columns bin, bin_start, bin_end and count.
+
+    Raises:
+        KeyError: If the table has no histogram of the column.
+        ValueError: If factor or max_bins is not positive.
+    """
+    rows = histograms[histograms["column"] == column]
+    if rows.empty:
+        raise KeyError(f"No histogram of {column}")
+    if max_bins is not None:
+        if max_bins <= 0:
+            raise ValueError(f"max_bins must be positive, got {max_bins}")
+        bins = rows["bin"].max() - rows["bin"].min() + 1
+        factor = max(1, math.ceil(bins / max_bins))
+        # The aligned coarse bins may straddle one more bin
+        while (rows["bin"].max() // factor) - (
+            rows["bin"].min() // factor
+        ) + 1 > max_bins:
+            factor += 1
+    factor = 1 if factor is None else factor
+    if factor <= 0:
+        raise ValueError(f"factor must be positive, got {factor}")
+
+    width = (rows["bin_end"] - rows["bin_start"]).iloc[0]
+    coarse = (
+        rows.groupby(rows["bin"] // factor, sort=True)["count"]
+        .sum()
+        .reset_index()
+    )
+    coarse["bin_start"] = coarse["bin"] * factor * width
+    coarse["bin_end"] = (coarse["bin"] + 1) * factor * width
+    return coarse[["bin", "bin_start", "bin_end", "count"]]
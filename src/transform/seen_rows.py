@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from typing import List, Optional
+
+# Row hashes kept in memory (8 bytes each, 32 MB) before they are
+# written to disk as a sorted run
+SEEN_ROWS_IN_MEMORY = 4_000_000
+
+
+class SeenRows:
+    """
+    The 64-bit hashes of the rows seen so far in a stream, to drop rows
+    repeated across chunks, in memory bounded however many rows the
+    stream has.
+
+    New hashes go into a sorted array in memory. When it holds
+    memory_rows hashes it is written to a temporary file as a sorted
+    run, and read back through a memory map, whose pages the OS can
+    drop again. Each lookup is one binary search (np.searchsorted) per
+    run, for a whole chunk at once. Disk use is 8 bytes per unique row.
+
+    Use as a context manager, or call close(), to delete the runs.
+
+    Args:
+        memory_rows (int): Hashes kept in memory before spilling a run.
+        spill_dir (str, optional): Directory for the temporary runs, the
+            system temporary directory by default.
+    """
+
+    def __init__(
+        self,
+        memory_rows: int = SEEN_ROWS_IN_MEMORY,
+        spill_dir: Optional[str] = None,
+    ):
+        if memory_rows <= 0:
+            raise ValueError(
+                f"memory_rows must be positive, got {memory_rows}"
+            )
+        self.memory_rows = memory_rows
+        self.spill_dir = spill_dir
+        self._memory = np.empty(0, dtype=np.uint64)
+        self._runs: List[np.ndarray] = []
+        self._run_dir: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._memory) + sum(len(run) for run in self._runs)
+
+    def __enter__(self) -> "SeenRows":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add_new(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Record the hashes of a chunk and tell which rows are new.
+
+        Args:
+            hashes (np.ndarray): 64-bit hash of every row of the chunk.
+
+        Returns:
+            np.ndarray: Boolean mask, True for the first occurrence of
+            every hash not seen in an earlier chunk.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        unique, first = np.unique(hashes, return_index=True)
+        new = ~self._contains(unique)
+        keep = np.zeros(len(hashes), dtype=bool)
+        keep[first[new]] = True
+        self._add(unique[new])
+        return keep
+
+    def _contains(self, values: np.ndarray) -> np.ndarray:
+        # values are sorted and unique
+        found = np.zeros(len(values), dtype=bool)
+        for run in [self._memory, *self._runs]:
+            if len(run) == 0 or len(values) == 0:
+                continue
+            positions = np.searchsorted(run, values)
+            np.minimum(positions, len(run) - 1, out=positions)
+            found |= run[positions] == values
+        return found
+
+    def _add(self, values: np.ndarray) -> None:
+        # Insert into the sorted in-memory array, spilling when full
+        positions = np.searchsorted(self._memory, values)
+        self._memory = np.insert(self._memory, positions, values)
+        if len(self._memory) >= self.memory_rows:
+            self._spill()
+
+    def _spill(self) -> None:
+        if self._run_dir is None:
+            self._run_dir = tempfile.mkdtemp(
+                prefix="seen_rows_", dir=self.spill_dir
+            )
+        path = os.path.join(self._run_dir, f"run_{len(self._runs)}.npy")
+        np.save(path, self._memory)
+        self._runs.append(np.load(path, mmap_mode="r"))
+        self._memory = np.empty(0, dtype=np.uint64)
+
+    def close(self) -> None:
+        """Forget the hashes and delete the runs on disk."""
+        self._runs = []
+        self._memory = np.empty(0, dtype=np.uint64)
+        if self._run_dir is not None:
+            shutil.rmtree(self._run_dir, ignore_errors=True)
+            self._run_dir = None
@@ -0,0 +1,267 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+# Segments used by the dashboard pages
+AGE_GROUP_BINS = [0, 30, 40, 50, 60, 70, 120]
+AGE_GROUP_LABELS = ["<30", "30-40", "40-50", "50-60", "60-70", "70+"]
+CHRONIC_BUCKET_BINS = [0, 1, 2, 3, 4, float("inf")]
+CHRONIC_BUCKET_LABELS = ["1", "2", "3", "4", "5+"]
+
+CONDITION_COLUMNS = [
+    "hypertension",
+    "diabetes",
+    "asthma",
+    "copd",
+    "cardiovascular_disease",
+    "cancer_history",
+]
+CUBE_DIMENSIONS = [
+    "age_group",
+    "chronic_bucket",
+    "smoker",
+    "region",
+    "sex",
+    "employment_status",
+] + CONDITION_COLUMNS
+CUBE_MEASURES = ["annual_medical_cost", "annual_premium"]
+
+# Derived dimensions and the column they are derived from
+SEGMENT_SOURCES = {"age_group": "age", "chronic_bucket": "chronic_count"}
+
+# Dimension and value of the row over all customers
+TOTAL = "all"
+
+# z value of a two-sided 95% confidence interval
+Z_95 = 1.959964
+
+
+def add_segments(customers: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the age_group and chronic_bucket columns, for the columns they
+    are derived from (age and chronic_count) that are present.
+
+    Customers without chronic conditions have no chronic_bucket.
+
+    Args:
+        customers (pd.DataFrame): Cleaned customers, modified in place.
+
+    Returns:
+        pd.DataFrame: The customers.
+    """
+    if "age" in customers.columns:
+        customers["age_group"] = pd.cut(
+            customers["age"],
+            bins=AGE_GROUP_BINS,
+            labels=AGE_GROUP_LABELS,
+            right=False,
+        )
+    if "chronic_count" in customers.columns:
+        customers["chronic_bucket"] = pd.cut(
+            customers["chronic_count"],
+            bins=CHRONIC_BUCKET_BINS,
+            labels=CHRONIC_BUCKET_LABELS,
+            right=True,
+        )
+    return customers
+
+
+class SegmentCube:
+    """
+    Count, sum and sum of squares of the measures (cost and premium) for
+    every value of every dimension the dashboard groups by, accumulated
+    one batch at a time.
+
+    The cube holds one grouping set per dimension rather than the full
+    cross product: bar charts and pies show one dimension at a time, and
+    the cross product of all dimensions has about as many cells as there
+    are customers. The table has a few dozen rows, from which means and
+    confidence intervals are computed without the customers.
+
+    Sums are exact under merging, so cubes of chunks, files or processes
+    can be combined.
+
+    Args:
+        dimensions (List[str]): Columns to group by. age_group and
+            chronic_bucket are derived from age and chronic_count.
+        measures (List[str]): Numeric columns to summarise.
+    """
+
+    def __init__(
+        self,
+        dimensions: Optional[List[str]] = None,
+        measures: Optional[List[str]] = None,
+    ):
+        self.dimensions = list(
+            CUBE_DIMENSIONS if dimensions is None else dimensions
+        )
+        self.measures = list(CUBE_MEASURES if measures is None else measures)
+        # Per dimension: a frame indexed by value with the sums
+        self.groups: Dict[str, pd.DataFrame] = {}
+
+    @classmethod
+    def for_columns(cls, columns: Iterable[str]) -> "SegmentCube":
+        """
+        Cube over the default dimensions and measures found in columns,
+        e.g. the columns of the cleaned customers.
+        """
+        columns = set(columns)
+        return cls(
+            [
+                dimension
+                for dimension in CUBE_DIMENSIONS
+                if SEGMENT_SOURCES.get(dimension, dimension) in columns
+            ],
+            [measure for measure in CUBE_MEASURES if measure in columns],
+        )
+
+    def _stat_columns(self) -> List[str]:
+        columns = ["count"]
+        for measure in self.measures:
+            columns += [
+                f"{measure}_count",
+                f"{measure}_sum",
+                f"{measure}_sum_sq",
+            ]
+        return columns
+
+    def update(self, customers: pd.DataFrame) -> "SegmentCube":
+        """
+        Add the rows of a batch of cleaned customers to the cube.
+
+        Args:
+            customers (pd.DataFrame): Batch with the dimension (or age
+                and chronic_count) and measure columns.
+
+        Returns:
+            SegmentCube: The updated cube.
+        """
+        if len(customers) == 0:
+            return self
+        # Derived segments are computed on the side, customers is not
+        # modified
+        sources = [
+            SEGMENT_SOURCES[dimension]
+            for dimension in self.dimensions
+            if dimension in SEGMENT_SOURCES
+            and dimension not in customers.columns
+        ]
+        segments = customers
+        if sources:
+            segments = add_segments(customers[sources].copy())
+
+        # One frame of per-row statistics, summed per value below
+        values = customers[self.measures].astype(np.float64)
+        stats = {"count": np.ones(len(customers))}
+        for measure in self.measures:
+            column = values[measure]
+            stats[f"{measure}_count"] = column.notna().to_numpy(np.float64)
+            stats[f"{measure}_sum"] = column.fillna(0).to_numpy()
+            stats[f"{measure}_sum_sq"] = (column**2).fillna(0).to_numpy()
+        stats = pd.DataFrame(stats, index=customers.index)
+
+        for dimension in [TOTAL] + self.dimensions:
+            if dimension == TOTAL:
+                keys = pd.Series(TOTAL, index=customers.index)
+            elif dimension in segments.columns:
+                keys = segments[dimension]
+            else:
+                keys = customers[dimension]
+            # Missing values (e.g. no chronic condition) are left out
+            sums = stats.groupby(keys, observed=True, sort=False).sum()
+            self._add(dimension, sums)
+        return self
+
+    def _add(self, dimension: str, sums: pd.DataFrame) -> None:
+        if dimension in self.groups:
+            sums = self.groups[dimension].add(sums, fill_value=0)
+        self.groups[dimension] = sums
+
+    def merge(self, other: "SegmentCube") -> "SegmentCube":
+        """
+        Add the statistics of another cube over the same dimensions and
+        measures.
+
+        Raises:
+            ValueError: If the dimensions or measures differ.
+        """
+        if (other.dimensions, other.measures) != (
+            self.dimensions,
+            self.measures,
+        ):
+            raise ValueError(
+                "Cannot merge cubes over different dimensions or measures"
+            )
+        for dimension, sums in other.groups.items():
+            self._add(dimension, sums)
+        return self
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        The cube as a table: one row per dimension and value, with the
+        count of customers and, per measure, the count of values present,
+        sum, sum of squares and mean. Values are sorted within a
+        dimension and stored as text; the total row comes first.
+        """
+        frames = []
+        for dimension in [TOTAL] + self.dimensions:
+            if dimension not in self.groups:
+                continue
+            sums = self.groups[dimension].sort_index()
+            frame = sums.reset_index(drop=True)
+            frame.insert(0, "dimension", dimension)
+            frame.insert(1, "value", [str(value) for value in sums.index])
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(
+                columns=["dimension", "value"] + self._stat_columns()
+            )
+
+        cube = pd.concat(frames, ignore_index=True)
+        cube["count"] = cube["count"].astype(np.int64)
+        for measure in self.measures:
+            count = cube[f"{measure}_count"].astype(np.int64)
+            cube[f"{measure}_count"] = count
+            cube[f"{measure}_mean"] = cube[f"{measure}_sum"] / count.where(
+                count > 0
+            )
+        return cube
+
+
+def segment_means(
+    cube: pd.DataFrame, dimension: str, measure: str
+) -> pd.DataFrame:
+    """
+    Mean of a measure for every value of a dimension, with the half
+    width of its normal 95% confidence interval.
+
+    Args:
+        cube (pd.DataFrame): Table produced by SegmentCube.to_frame.
+        dimension (str): Dimension to break down by, e.g. "smoker".
+        measure (str): Measure, e.g. "annual_medical_cost".
+
+    Returns:
+        pd.DataFrame: Columns value, count, mean and ci, in cube order.
+
+    Raises:
+        KeyError: If the cube has no such dimension.
+    """
+    rows = cube[cube["dimension"] == dimension]
+    if rows.empty:
+        raise KeyError(f"Segment cube has no dimension {dimension}")
+
+    n = rows[f"{measure}_count"].astype(np.float64)
+    total = rows[f"{measure}_sum"]
+    mean = total / n
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Sample variance from the sums, clipped at 0 against round-off
+        variance = (rows[f"{measure}_sum_sq"] - total * mean) / (n - 1)
+        ci = Z_95 * np.sqrt(variance.clip(lower=0) / n)
+    return pd.DataFrame(
+        {
+            "value": rows["value"].to_numpy(),
+            "count": rows["count"].to_numpy(),
+            "mean": mean.to_numpy(),
+            "ci": ci.where(n > 1).to_numpy(),
+        }
+    )
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+
+class HyperLogLog:
+    """
+    Approximate count of distinct values in constant memory.
+
+    Values are hashed to 64 bits. The first `precision` bits pick one of
+    2**precision registers, and each register keeps the longest run of
+    leading zeros seen in the remaining bits. With the default precision
+    of 14 (16384 one-byte registers) the standard error is about 0.8%.
+
+    Sketches with the same precision can be merged, so chunks, files or
+    processes can be counted separately and combined exactly.
+
+    Reference: Flajolet et al., "HyperLogLog: the analysis of a
+    near-optimal cardinality estimation algorithm" (2007), with the small
+    range correction from Heule et al. (2013).
+    """
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision must be 4-18, got {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values: pd.Series) -> "HyperLogLog":
+        """
+        Add the non-missing values of a Series.
+
+        Numbers are hashed as float64, so 1 and 1.0 count as one value.
+
+        Args:
+            values (pd.Series): Values to add.
+
+        Returns:
+            HyperLogLog: The updated sketch.
+        """
+        values = values.dropna()
+        if values.empty:
+            return self
+        if pd.api.types.is_numeric_dtype(values) and not (
+            pd.api.types.is_bool_dtype(values)
+        ):
+            values = values.astype(np.float64)
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        return self.update_hashes(hashes)
+
+    def update_hashes(self, hashes: np.ndarray) -> "HyperLogLog":
+        """Add values that are already hashed to uint64."""
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        remaining = hashes & np.uint64((1 << (64 - p)) - 1)
+        rank = (64 - p) - _bit_length(remaining) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """
+        Add the values counted by another sketch to this one.
+
+        Raises:
+            ValueError: If the sketches use a different precision.
+        """
+        if other.precision != self.precision:
+            raise ValueError(
+                "Cannot merge HyperLogLog sketches of different precision"
+            )
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        """Estimated number of distinct values added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(2.0 ** -self.registers.astype(float))
+        empty = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and empty:
+            # Linear counting is more accurate for small counts
+            estimate = m * np.log(m / empty)
+        return int(round(estimate))
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    # Number of bits needed for each uint64, exact via two 32-bit halves
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+class TDigest:
+    """
+    Approximate quantiles of a numeric column in constant memory.
+
+    The data is summarised by weighted centroids that are small near the
+    tails and larger around the median (the k1 scale function), so
+    extreme quantiles stay accurate. About compression / 2 centroids are
+    kept. The exact minimum and maximum are tracked as well.
+
+    Digests can be merged, so chunks, files or processes can be
+    summarised separately and combined.
+
+    Reference: Dunning and Ertl, "Computing extremely accurate quantiles
+    using t-digests" (2019).
+    """
+
+    def __init__(self, compression: float = 200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> int:
+        return int(self.weights.sum())
+
+    def update(self, values) -> "TDigest":
+        """
+        Add numeric values, ignoring missing ones.
+
+        Args:
+            values: Array-like of numbers.
+
+        Returns:
+            TDigest: The updated digest.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._compress(
+            np.concatenate([self.means, values]),
+            np.concatenate([self.weights, np.ones(len(values))]),
+        )
+        return self
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Add the values summarised by another digest to this one."""
+        if len(other.weights) == 0:
+            return self
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(
+            np.concatenate([self.means, other.means]),
+            np.concatenate([self.weights, other.weights]),
+        )
+        return self
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        # Sort the centroids and merge neighbours that fall into the same
+        # unit interval of the k1 scale k(q) = d / 2pi * asin(2q - 1)
+        order = np.argsort(means)
+        means, weights = means[order], weights[order]
+        q_left = (np.cumsum(weights) - weights) / weights.sum()
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q_left - 1)
+        bins = np.floor(k - k[0])
+        starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimated value at quantile q (0-1), or NaN if the digest is
+        empty.
+        """
+        if len(self.weights) == 0:
+            return float("nan")
+        total = self.weights.sum()
+        centres = np.cumsum(self.weights) - self.weights / 2
+        return float(
+            np.interp(
+                q * total,
+                np.r_[0.0, centres, total],
+                np.r_[self.min, self.means, self.max],
+            )
+        )
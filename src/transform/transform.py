@@ -1,24 +1,97 @@
 import pandas as pd
+from typing import Iterable
 from src.transform.transform_all import clean_customers
 from src.utils.logging_utils import setup_logger
-from src.transform.transform_all import produce_correlation_table
+from src.utils.pipeline import BackgroundWorker
+from src.transform.transform_all import (
+    clean_customers_incremental,
+    clean_customers_stream,
+    produce_correlation_table,
+    produce_correlation_table_from_stats,
+    produce_histograms,
+    produce_segment_cube,
+    update_correlation_table,
+)
 
 logger = setup_logger("transform_data", "transform_data.log")
 
 
-def transform_data(data) -> pd.DataFrame:
+def transform_data(
+    data, export_csv: bool = False, incremental: bool = False
+) -> pd.DataFrame:
     try:
         logger.info("Starting data transformation process...")
-        # Enrich and clean customer data
-        logger.info("Clean and enrich customer data...")
-        cleaned_customers = clean_customers(data)
-        logger.info("Customer data cleaned and enriched successfully.")
+        if incremental:
+            return transform_data_incremental(data, export_csv)
 
-        # Produce a correlation table
+        # The cleaned customers are written in the background while the
+        # correlation table is computed; leaving the block waits for them
+        with BackgroundWorker(name="clean_customers_writer") as writer:
+            # Enrich and clean customer data
+            logger.info("Clean and enrich customer data...")
+            cleaned_customers = clean_customers(
+                data, export_csv=export_csv, writer=writer
+            )
+            logger.info("Customer data cleaned and enriched successfully.")
+
+            # Aggregate the customers for the dashboard
+            logger.info("Producing segment cube and histograms...")
+            produce_segment_cube(cleaned_customers, writer=writer)
+            produce_histograms(cleaned_customers, writer=writer)
+
+            # Produce a correlation table
+            logger.info("Producing correlation table...")
+            correlation_table = produce_correlation_table(cleaned_customers)
+
+        return cleaned_customers, correlation_table
+
+    except Exception as e:
+        logger.error(f"Data transformation failed: {str(e)}")
+        raise
+
+
+def transform_data_incremental(
+    data, export_csv: bool = False
+) -> pd.DataFrame:
+    # Only new or changed customers are cleaned; unchanged ones are
+    # skipped using the fingerprint index
+    logger.info("Clean new or changed customer data...")
+    new_customers, cleaned_customers, appendable = (
+        clean_customers_incremental(data, export_csv=export_csv)
+    )
+
+    if appendable:
+        logger.info("Adding new customers to the correlation table...")
+        correlation_table = update_correlation_table(new_customers)
+    else:
         logger.info("Producing correlation table...")
         correlation_table = produce_correlation_table(cleaned_customers)
 
-        return cleaned_customers, correlation_table
+    logger.info("Producing segment cube and histograms...")
+    produce_segment_cube(cleaned_customers)
+    produce_histograms(cleaned_customers)
+    return cleaned_customers, correlation_table
+
+
+def transform_data_stream(
+    chunks: Iterable[pd.DataFrame], export_csv: bool = False
+) -> pd.DataFrame:
+    try:
+        logger.info("Starting streaming data transformation process...")
+        # Clean each chunk and accumulate correlation statistics
+        logger.info("Clean and enrich customer data chunk by chunk...")
+        rows, accumulator = clean_customers_stream(
+            chunks, export_csv=export_csv
+        )
+        logger.info(
+            f"Customer data cleaned and enriched successfully - rows: {rows}"
+        )
+
+        # Produce a correlation table from the accumulated statistics
+        logger.info("Producing correlation table...")
+        correlation_table = produce_correlation_table_from_stats(accumulator)
+
+        return correlation_table
 
     except Exception as e:
         logger.error(f"Data transformation failed: {str(e)}")
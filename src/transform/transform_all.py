@@ -1,19 +1,70 @@
+import os
 import pandas as pd
-
-from src.utils.file_utils import save_dataframe_to_csv
-from src.utils.logging_utils import setup_logger
-
-pd.set_option("future.no_silent_downcasting", True)
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from config.encoding_config import ENCODINGS
+from src.transform.correlation_engine import (
+    BLOCK_ROWS,
+    accumulate_correlation,
+    iter_blocks,
+)
+from src.transform.correlation_pairs import correlation_pairs
+from src.transform.correlation_stats import CorrelationAccumulator
+from src.transform.encoding import encode_categoricals
+from src.transform.fingerprint_index import (
+    FingerprintIndex,
+    select_new_or_changed,
+)
+from src.transform.histograms import HistogramAccumulator
+from src.transform.seen_rows import SeenRows
+from src.transform.segment_cube import SegmentCube
+from src.utils.file_utils import (
+    append_dataframe_to_csv,
+    get_output_path,
+    open_parquet_writer,
+    read_dataframe_from_parquet,
+    save_dataframe_to_csv,
+    save_dataframe_to_parquet,
+)
+from src.utils.logging_utils import setup_logger, track_stage
+from src.utils.pipeline import BackgroundWorker
 
 
 OUTPUT_DIR = "data/processed"
-FILE_NAME_CLEAN_CUSTOMERS = "cleaned_customers.csv"
+FILE_NAME_CLEAN_CUSTOMERS = "cleaned_customers.parquet"
+FILE_NAME_CLEAN_CUSTOMERS_CSV = "cleaned_customers.csv"
 FILE_NAME_CORRELATION_TABLE = "correlation_table.csv"
+FILE_NAME_CORRELATION_STATS = "correlation_stats.npz"
+FILE_NAME_CORRELATION_PAIRS = "correlation_pairs.parquet"
+FILE_NAME_FINGERPRINTS = "customer_fingerprints.sqlite"
+FILE_NAME_RUN_MANIFEST = "run_manifest.json"
+FILE_NAME_SEGMENT_CUBE = "segment_cube.parquet"
+FILE_NAME_HISTOGRAMS = "histograms.parquet"
 
 logger = setup_logger("transform_data_all", "transform_data_all.log")
 
 
-def clean_customers(customers: pd.DataFrame) -> pd.DataFrame:
+@track_stage("clean_customers")
+def clean_customers(
+    customers: pd.DataFrame,
+    export_csv: bool = False,
+    writer: Optional[BackgroundWorker] = None,
+) -> pd.DataFrame:
+    """
+    Trim, de-duplicate and encode the customers, and save the result.
+
+    Args:
+        customers (pd.DataFrame): Raw customers.
+        export_csv (bool): Also write the cleaned customers to CSV.
+        writer (BackgroundWorker, optional): Save the outputs on this
+            worker instead of waiting for them, so the caller can go on
+            (e.g. with the correlation table) while they are written.
+            The caller must close the worker before using the files.
+
+    Returns:
+        pd.DataFrame: The cleaned customers.
+    """
+    save = writer.submit if writer is not None else _run_now
     # Trim values
     logger.info("Running trim_values(customers)...")
     customers = trim_values(customers)
@@ -22,32 +73,190 @@ def clean_customers(customers: pd.DataFrame) -> pd.DataFrame:
     customers = drop_duplicates(customers)
 
     # Map categorical features to numeric codes
-    logger.info("Running map_alcohol_freq(customers)..")
-    customers = map_alcohol_freq(customers)
-    logger.info("Running map_smoker_freq(customers)..")
-    customers = map_smoker_freq(customers)
-    logger.info("Running map_education_freq(customers)..")
-    customers = map_education(customers)
-
-    # Save the dataframe as a CSV for logging purposes
+    logger.info(
+        f"Running encode_categoricals(customers) for {list(ENCODINGS)}.."
+    )
+    customers = encode_categoricals(customers)
+
+    # Save the dataframe as Parquet for the dashboards and later stages
     # Ensure the directory exists
     logger.info(
-        "Running save_dataframe_to_csv(customers, "
+        "Running save_dataframe_to_parquet(customers, "
         "OUTPUT_DIR, FILE_NAME_CLEAN_CUSTOMERS).."
     )
-    save_dataframe_to_csv(customers, OUTPUT_DIR, FILE_NAME_CLEAN_CUSTOMERS)
-    logger.info(
-        f"Cleaned customers with shape {customers.shape} saved to CSV."
+    # Logged once written: with a writer, the save only runs later
+    save(
+        _logged(
+            save_dataframe_to_parquet,
+            f"Cleaned customers with shape {customers.shape} "
+            "saved to Parquet.",
+        ),
+        customers,
+        OUTPUT_DIR,
+        FILE_NAME_CLEAN_CUSTOMERS,
     )
 
+    # CSV is only written on request, e.g. for sharing with other tools
+    if export_csv:
+        save(
+            _logged(
+                save_dataframe_to_csv, "Cleaned customers exported to CSV."
+            ),
+            customers,
+            OUTPUT_DIR,
+            FILE_NAME_CLEAN_CUSTOMERS_CSV,
+        )
+
     return customers
 
 
+def _run_now(func, *args, **kwargs) -> None:
+    func(*args, **kwargs)
+
+
+def _logged(func: Callable[..., None], message: str) -> Callable[..., None]:
+    # Log message after func has run, so a save queued on a background
+    # writer is only reported once the file is written
+    def run(*args, **kwargs) -> None:
+        func(*args, **kwargs)
+        logger.info(message)
+
+    return run
+
+
+@track_stage("clean_customers_incremental")
+def clean_customers_incremental(
+    customers: pd.DataFrame, export_csv: bool = False
+) -> Tuple[pd.DataFrame, pd.DataFrame, bool]:
+    """
+    Clean only the customers that are new or changed since the last
+    incremental run, and merge them into the saved cleaned customers.
+
+    Rows are compared with a persistent fingerprint index (person_id
+    plus a hash of the row), so unchanged customers are dropped right
+    after trimming and are not encoded again. A changed customer replaces
+    its earlier version in the output. The index is only updated once
+    the output has been saved.
+
+    Args:
+        customers (pd.DataFrame): Raw customers.
+        export_csv (bool): Also write the merged customers to CSV.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, bool]: The new or changed
+        cleaned customers, all cleaned customers, and whether the saved
+        correlation statistics can be updated with just the new rows
+        (False when rows were replaced or there is nothing to update).
+    """
+    customers = trim_values(customers)
+    customers = drop_duplicates(customers)
+
+    index_path = get_output_path(OUTPUT_DIR, FILE_NAME_FINGERPRINTS)
+    with FingerprintIndex(index_path) as index:
+        first_run = len(index) == 0
+        customers, changed_ids = select_new_or_changed(customers, index)
+        customers = encode_categoricals(customers)
+
+        output_saved = os.path.exists(
+            get_output_path(OUTPUT_DIR, FILE_NAME_CLEAN_CUSTOMERS)
+        )
+        all_customers = merge_cleaned_customers(customers)
+        if len(customers) or not output_saved:
+            save_dataframe_to_parquet(
+                all_customers, OUTPUT_DIR, FILE_NAME_CLEAN_CUSTOMERS
+            )
+        if export_csv:
+            save_dataframe_to_csv(
+                all_customers, OUTPUT_DIR, FILE_NAME_CLEAN_CUSTOMERS_CSV
+            )
+        index.commit()
+
+    stats_saved = os.path.exists(
+        get_output_path(OUTPUT_DIR, FILE_NAME_CORRELATION_STATS)
+    )
+    appendable = not first_run and len(changed_ids) == 0 and stats_saved
+    logger.info(
+        f"{len(customers)} new or changed customers merged into "
+        f"{len(all_customers)} cleaned customers."
+    )
+    return customers, all_customers, appendable
+
+
+def transform_output_paths(export_csv: bool = False) -> List[str]:
+    """
+    Paths of the files every transform run writes (batch or streaming),
+    with the cleaned customers CSV when export_csv is set.
+    """
+    filenames = [
+        FILE_NAME_CLEAN_CUSTOMERS,
+        FILE_NAME_CORRELATION_TABLE,
+        FILE_NAME_CORRELATION_STATS,
+        FILE_NAME_CORRELATION_PAIRS,
+        FILE_NAME_SEGMENT_CUBE,
+        FILE_NAME_HISTOGRAMS,
+    ]
+    if export_csv:
+        filenames.append(FILE_NAME_CLEAN_CUSTOMERS_CSV)
+    return [get_output_path(OUTPUT_DIR, name) for name in filenames]
+
+
+def incremental_output_paths() -> List[str]:
+    """Paths of the files an incremental run produces and relies on."""
+    filenames = [
+        FILE_NAME_FINGERPRINTS,
+        f"{FILE_NAME_FINGERPRINTS}.bloom.npz",
+    ]
+    return transform_output_paths(export_csv=True) + [
+        get_output_path(OUTPUT_DIR, name) for name in filenames
+    ]
+
+
+def reset_incremental_outputs() -> None:
+    """
+    Delete the state incremental runs build on, so the next incremental
+    run starts from scratch. Needed when raw files were changed or
+    removed, as their customers cannot be taken out of the outputs.
+    """
+    for path in incremental_output_paths():
+        if os.path.exists(path):
+            os.remove(path)
+            logger.info(f"Removed {path}")
+
+
+def read_cleaned_customers() -> pd.DataFrame:
+    """Read back the cleaned customers saved by the last transform."""
+    return read_dataframe_from_parquet(OUTPUT_DIR, FILE_NAME_CLEAN_CUSTOMERS)
+
+
+def merge_cleaned_customers(customers: pd.DataFrame) -> pd.DataFrame:
+    # Replace earlier versions of these customers in the saved output
+    path = get_output_path(OUTPUT_DIR, FILE_NAME_CLEAN_CUSTOMERS)
+    if not os.path.exists(path):
+        return customers.reset_index(drop=True)
+
+    existing = read_dataframe_from_parquet(
+        OUTPUT_DIR, FILE_NAME_CLEAN_CUSTOMERS
+    )
+    existing = existing[~existing["person_id"].isin(customers["person_id"])]
+    merged = pd.concat([existing, customers], ignore_index=True)
+
+    # Categories may differ between the two parts
+    for col in customers.select_dtypes(include=["category"]).columns:
+        if merged[col].dtype != customers[col].dtype:
+            merged[col] = merged[col].astype("category")
+    return merged
+
+
+@track_stage("produce_correlation_table")
 def produce_correlation_table(df: pd.DataFrame) -> pd.DataFrame:
     """
     Produce and save a correlation table for numeric
     columns in the given DataFrame.
 
+    The sufficient statistics behind the table are saved as well, so a
+    later batch of customers can be added with update_correlation_table
+    without re-reading this one.
+
     Args:
         df (pd.DataFrame): Input DataFrame containing mixed data types.
 
@@ -60,10 +269,165 @@ def produce_correlation_table(df: pd.DataFrame) -> pd.DataFrame:
     logger.info("Running create_numeric_cols_df(df)...")
     numeric_cols = create_numeric_cols_df(df)
 
-    # Create a correlation table for numeric columns
-    logger.info("Creating correlation table...")
-    correlation_table = df[numeric_cols].corr()
+    # Accumulate the statistics for the numeric columns, one block of
+    # rows per matrix product
+    logger.info("Accumulating correlation statistics...")
+    accumulator = accumulate_correlation(
+        iter_blocks(df, BLOCK_ROWS), list(numeric_cols)
+    )
+
+    return produce_correlation_table_from_stats(accumulator)
+
+
+@track_stage("update_correlation_table")
+def update_correlation_table(new_customers: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add a batch of new cleaned customers to the saved correlation
+    statistics and produce the updated correlation table.
+
+    Only the new rows are read, so the cost does not depend on how many
+    customers were processed before. Falls back to a fresh table when no
+    statistics have been saved yet.
+
+    Args:
+        new_customers (pd.DataFrame): Cleaned customers not yet included
+        in the saved statistics.
+
+    Returns:
+        pd.DataFrame: Correlation table with explicit headers,
+        suitable for saving or loading into database!
+    """
+    accumulator = load_correlation_stats()
+    if accumulator is None:
+        logger.info("No saved correlation statistics found.")
+        return produce_correlation_table(new_customers)
+
+    logger.info(
+        f"Adding {len(new_customers)} rows to correlation statistics "
+        f"over {accumulator.rows} rows..."
+    )
+    accumulator.update(new_customers)
+
+    return produce_correlation_table_from_stats(accumulator)
+
+
+@track_stage("correlation_from_stats")
+def produce_correlation_table_from_stats(
+    accumulator: CorrelationAccumulator,
+) -> pd.DataFrame:
+    """
+    Produce and save a correlation table from accumulated statistics,
+    and save the statistics next to it.
+
+    Args:
+        accumulator (CorrelationAccumulator): Statistics of the numeric
+        columns of the cleaned customers.
+
+    Returns:
+        pd.DataFrame: Correlation table with explicit headers,
+        suitable for saving or loading into database!
+    """
+    logger.info("Creating correlation table from accumulated statistics...")
+    correlation_table = accumulator.correlation()
+
+    accumulator.save(
+        get_output_path(OUTPUT_DIR, FILE_NAME_CORRELATION_STATS)
+    )
+    logger.info(
+        f"Correlation statistics over {accumulator.rows} rows saved."
+    )
+
+    return save_correlation_table(correlation_table)
+
+
+@track_stage("produce_segment_cube")
+def produce_segment_cube(
+    customers: pd.DataFrame, writer: Optional[BackgroundWorker] = None
+) -> pd.DataFrame:
+    """
+    Produce and save the segment cube of the cleaned customers: count,
+    sum, sum of squares and mean of cost and premium per age group,
+    chronic bucket, smoker, region, sex, employment status and condition
+    flag. The dashboard renders its bar charts from it.
+
+    Args:
+        customers (pd.DataFrame): Cleaned customers.
+        writer (BackgroundWorker, optional): Save the cube on this
+            worker instead of waiting for it.
+
+    Returns:
+        pd.DataFrame: The segment cube.
+    """
+    cube = SegmentCube.for_columns(customers.columns).update(customers)
+    return save_segment_cube(cube, writer)
+
+
+def save_segment_cube(
+    cube: SegmentCube, writer: Optional[BackgroundWorker] = None
+) -> pd.DataFrame:
+    save = writer.submit if writer is not None else _run_now
+    segment_cube = cube.to_frame()
+    save(
+        _logged(
+            save_dataframe_to_parquet,
+            f"Segment cube with {len(segment_cube)} rows saved.",
+        ),
+        segment_cube,
+        OUTPUT_DIR,
+        FILE_NAME_SEGMENT_CUBE,
+    )
+    return segment_cube
+
 
+@track_stage("produce_histograms")
+def produce_histograms(
+    customers: pd.DataFrame, writer: Optional[BackgroundWorker] = None
+) -> pd.DataFrame:
+    """
+    Produce and save fixed-bin histograms of the numeric columns the
+    dashboard plots (age, income and annual medical cost). The bins are
+    fine enough to be merged into the coarser bins a chart needs, see
+    src.transform.histograms.rebin.
+
+    Args:
+        customers (pd.DataFrame): Cleaned customers.
+        writer (BackgroundWorker, optional): Save the histograms on this
+            worker instead of waiting for them.
+
+    Returns:
+        pd.DataFrame: The histograms, one row per column and bin.
+    """
+    histograms = HistogramAccumulator.for_columns(customers.columns)
+    return save_histograms(histograms.update(customers), writer)
+
+
+def save_histograms(
+    histograms: HistogramAccumulator,
+    writer: Optional[BackgroundWorker] = None,
+) -> pd.DataFrame:
+    save = writer.submit if writer is not None else _run_now
+    histogram_table = histograms.to_frame()
+    save(
+        _logged(
+            save_dataframe_to_parquet,
+            f"Histograms with {len(histogram_table)} bins saved.",
+        ),
+        histogram_table,
+        OUTPUT_DIR,
+        FILE_NAME_HISTOGRAMS,
+    )
+    return histogram_table
+
+
+def load_correlation_stats() -> Optional[CorrelationAccumulator]:
+    # Load the statistics saved by the last correlation run, if any
+    path = get_output_path(OUTPUT_DIR, FILE_NAME_CORRELATION_STATS)
+    if not os.path.exists(path):
+        return None
+    return CorrelationAccumulator.load(path)
+
+
+def save_correlation_table(correlation_table: pd.DataFrame) -> pd.DataFrame:
     # Reset index and rename columns
     correlation_table = correlation_table.reset_index().rename(
         columns={"index": "feature"}
@@ -76,66 +440,154 @@ def produce_correlation_table(df: pd.DataFrame) -> pd.DataFrame:
     logger.info(
         f"Correlation table with shape {correlation_table.shape} saved to CSV."
     )
+
+    # Ranked pairs, for per-feature lookups of the strongest correlations
+    pairs = correlation_pairs(correlation_table)
+    save_dataframe_to_parquet(pairs, OUTPUT_DIR, FILE_NAME_CORRELATION_PAIRS)
+    logger.info(f"Correlation pairs ({len(pairs)} rows) saved.")
     return correlation_table
 
 
+def clean_customers_stream(
+    chunks: Iterable[pd.DataFrame], export_csv: bool = False
+) -> Tuple[int, CorrelationAccumulator]:
+    """
+    Clean customers one chunk at a time.
+
+    Each chunk is cleaned and added to the correlation statistics, the
+    segment cube and the histograms (saved at the end), then
+    handed to a background writer that appends it to the cleaned
+    customers Parquet file (and CSV) while the next chunk is cleaned.
+    The writer accepts only a couple of chunks ahead, so memory use does
+    not grow with the size of the input even when writing is slower
+    than cleaning. Rows repeated across chunks are found by their hash
+    (see SeenRows, which keeps at most a fixed number of hashes in
+    memory and the rest in sorted runs on disk).
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Raw customer chunks.
+        export_csv (bool): Also append each chunk to a CSV copy.
+
+    Returns:
+        Tuple[int, CorrelationAccumulator]: Number of cleaned rows written
+        and the correlation statistics of the numeric columns.
+    """
+    accumulator = None
+    cube = None
+    histograms = None
+    rows = 0
+
+    # The writer is closed (drained) before the Parquet file is closed
+    with SeenRows() as seen_rows, open_parquet_writer(
+        OUTPUT_DIR, FILE_NAME_CLEAN_CUSTOMERS
+    ) as write, BackgroundWorker(name="clean_customers_writer") as writer:
+        for i, chunk in enumerate(chunks):
+            customers = clean_customers_chunk(chunk, seen_rows)
+
+            if accumulator is None:
+                accumulator = CorrelationAccumulator(
+                    create_numeric_cols_df(customers)
+                )
+                cube = SegmentCube.for_columns(customers.columns)
+                histograms = HistogramAccumulator.for_columns(
+                    customers.columns
+                )
+            accumulator.update(customers)
+            cube.update(customers)
+            histograms.update(customers)
+
+            writer.submit(write, customers)
+            if export_csv:
+                writer.submit(
+                    append_dataframe_to_csv,
+                    customers,
+                    OUTPUT_DIR,
+                    FILE_NAME_CLEAN_CUSTOMERS_CSV,
+                    overwrite=(i == 0),
+                )
+            rows += len(customers)
+            logger.info(f"Chunk {i} cleaned: {len(customers)} rows appended.")
+
+    if accumulator is None:
+        raise ValueError("No customer chunks provided to clean.")
+    save_segment_cube(cube)
+    save_histograms(histograms)
+
+    logger.info(f"Cleaned customers with {rows} rows saved to Parquet.")
+    return rows, accumulator
+
+
+def clean_customers_chunk(
+    customers: pd.DataFrame, seen_rows: SeenRows
+) -> pd.DataFrame:
+    # Same steps as clean_customers, without saving the result
+    customers = trim_values(customers)
+    customers = drop_duplicates_across_chunks(customers, seen_rows)
+    customers = encode_categoricals(customers)
+    return customers
+
+
+@track_stage("trim_values")
 def trim_values(customers: pd.DataFrame) -> pd.DataFrame:
-    # Apply strip() to all object/string columns
+    # Apply strip() to all object/string columns, keeping missing values
     for col in customers.select_dtypes(include=["object", "string"]).columns:
-        customers[col] = customers[col].astype(str).str.strip()
+        customers[col] = customers[col].str.strip()
+
+    # Category columns only need their (few) categories stripped
+    for col in customers.select_dtypes(include=["category"]).columns:
+        categories = customers[col].cat.categories
+        if categories.dtype != object:
+            continue
+        stripped = categories.str.strip()
+        if stripped.is_unique:
+            customers[col] = customers[col].cat.rename_categories(stripped)
+        else:
+            # e.g. "HS" and " HS" become the same category
+            customers[col] = (
+                customers[col].astype(object).str.strip().astype("category")
+            )
 
     return customers
 
 
+@track_stage("drop_duplicates")
 def drop_duplicates(customers: pd.DataFrame) -> pd.DataFrame:
     # Remove duplicate rows from the DataFrame
     customers = customers.drop_duplicates()
     return customers
 
 
+@track_stage("drop_duplicates_across_chunks")
+def drop_duplicates_across_chunks(
+    customers: pd.DataFrame, seen_rows: SeenRows
+) -> pd.DataFrame:
+    # Remove rows already seen in this chunk or in an earlier chunk.
+    # Only a 64-bit hash of each row is remembered between chunks.
+    hashes = pd.util.hash_pandas_object(customers, index=False).to_numpy()
+    return customers[seen_rows.add_new(hashes)].copy()
+
+
 def map_alcohol_freq(customers: pd.DataFrame) -> pd.DataFrame:
     # Map alcohol frequency categories to numerics
-    customers["alcohol_freq"] = (
-        customers["alcohol_freq"]
-        .replace({"nan": 0, "Weekly": 7, "Daily": 30, "Occasional": 2})
-        .fillna(0)
-        .infer_objects(copy=False)
+    return encode_categoricals(
+        customers, {"alcohol_freq": ENCODINGS["alcohol_freq"]}
     )
-    return customers
 
 
 def map_smoker_freq(customers: pd.DataFrame) -> pd.DataFrame:
     # Map smoker categories to numerics
-    customers["smoker"] = (
-        customers["smoker"]
-        .replace({"Never": 0, "Current": 30, "Former": 7})
-        .astype("int64")
-        .infer_objects(copy=False)
-    )
-    return customers
+    return encode_categoricals(customers, {"smoker": ENCODINGS["smoker"]})
 
 
 def map_education(customers: pd.DataFrame) -> pd.DataFrame:
     # Map education categories to numerics
-    education_map = {
-        "No HS": 0,
-        "HS": 1,
-        "Some College": 2,
-        "Bachelors": 3,
-        "Masters": 4,
-        "Doctorate": 5,
-    }
-    customers["education"] = (
-        customers["education"]
-        .replace(education_map)
-        .astype("int64")
-        .infer_objects(copy=False)
+    return encode_categoricals(
+        customers, {"education": ENCODINGS["education"]}
     )
 
-    return customers
-
 
 def create_numeric_cols_df(df: pd.DataFrame) -> pd.DataFrame:
     # Isolate numeric columns from dataframe
-    numeric_cols = (df.select_dtypes(include=["float64", "int64"])).columns
+    # Covers the compact int8/int16/int32/float32 dtypes as well
+    numeric_cols = (df.select_dtypes(include="number")).columns
     return numeric_cols
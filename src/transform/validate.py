@@ -1,45 +1,252 @@
 import os
+import json
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from src.transform.seen_rows import SeenRows
+from src.transform.sketches import HyperLogLog, TDigest
+from src.utils.file_utils import ROOT_DIR
 
 
-FOLDER_PATH = "./data/raw"
-LOG_FILE = "data_quality_log.txt"
+FOLDER_PATH = os.path.join(ROOT_DIR, "data", "raw")
+LOG_FILE = os.path.join(ROOT_DIR, "data_quality_log.txt")
+JSON_LOG_FILE = os.path.join(ROOT_DIR, "data_quality_log.json")
+CHUNK_SIZE = 100_000
+QUANTILES = [0.01, 0.25, 0.5, 0.75, 0.99]
 
 
-def analyze_csv(file_path: str) -> str:
-    """Run basic data quality checks on a single CSV."""
-    report_lines = [f"File: {file_path}"]
+class ColumnProfile:
+    """
+    Null count, approximate distinct count and min/max of one column,
+    plus approximate quantiles when the column is numeric.
+    """
+
+    def __init__(self):
+        self.nulls = 0
+        self.distinct = HyperLogLog()
+        self.digest = TDigest()
+        self.text_min: Optional[str] = None
+        self.text_max: Optional[str] = None
+
+    def update(self, series: pd.Series) -> None:
+        self.nulls += int(series.isna().sum())
+        self.distinct.update(series)
+
+        if pd.api.types.is_numeric_dtype(series):
+            self.digest.update(series.to_numpy(dtype=np.float64))
+            return
+
+        values = series.dropna().astype(str)
+        if not values.empty:
+            self._update_text_bounds(values.min(), values.max())
+
+    def merge(self, other: "ColumnProfile") -> None:
+        self.nulls += other.nulls
+        self.distinct.merge(other.distinct)
+        self.digest.merge(other.digest)
+        if other.text_min is not None:
+            self._update_text_bounds(other.text_min, other.text_max)
+
+    def _update_text_bounds(self, low: str, high: str) -> None:
+        if self.text_min is None:
+            self.text_min, self.text_max = low, high
+        else:
+            self.text_min = min(self.text_min, low)
+            self.text_max = max(self.text_max, high)
+
+    def to_dict(self) -> Dict[str, Any]:
+        profile = {
+            "nulls": self.nulls,
+            "distinct_estimate": self.distinct.count(),
+        }
+        if self.digest.count:
+            profile["min"] = float(self.digest.min)
+            profile["max"] = float(self.digest.max)
+            profile["quantiles"] = {
+                f"p{round(q * 100):02d}": self.digest.quantile(q)
+                for q in QUANTILES
+            }
+        elif self.text_min is not None:
+            profile["min"] = self.text_min
+            profile["max"] = self.text_max
+        return profile
+
+
+class CsvProfile:
+    """
+    Data quality profile of one or more CSV files, built one chunk at a
+    time in a single pass.
+
+    Duplicate rows are found exactly from a 64-bit hash of every row,
+    kept in a SeenRows, which spills to disk beyond a fixed number of
+    rows; call close() (profile_csv does) to free it before the profile
+    is sent elsewhere. Profiles of different files can be merged; rows
+    repeated across the merged files count as duplicates too, but those
+    are estimated from a HyperLogLog of the row hashes (16 KB per
+    profile), so the merged duplicate count is approximate.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.duplicates = 0
+        self.duplicates_approximate = False
+        self.columns: List[str] = []
+        self.column_profiles: Dict[str, ColumnProfile] = {}
+        self.date_checks: Dict[str, List[int]] = {}
+        self.distinct_rows = HyperLogLog()
+        self._seen_rows = SeenRows()
+
+    def update(self, chunk: pd.DataFrame) -> "CsvProfile":
+        """
+        Add one chunk of rows to the profile.
+
+        Args:
+            chunk (pd.DataFrame): Rows read from the CSV.
+
+        Returns:
+            CsvProfile: The updated profile.
+        """
+        self.rows += len(chunk)
+        for col in chunk.columns:
+            if col not in self.column_profiles:
+                self.columns.append(col)
+                self.column_profiles[col] = ColumnProfile()
+            self.column_profiles[col].update(chunk[col])
+
+            if "date" in str(col).lower():
+                parsed = pd.to_datetime(
+                    chunk[col], errors="coerce", format="mixed"
+                )
+                invalid = int(parsed.isna().sum())
+                checks = self.date_checks.setdefault(col, [0, 0])
+                checks[0] += len(parsed) - invalid
+                checks[1] += invalid
+
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        new = self._seen_rows.add_new(hashes)
+        self.duplicates += len(chunk) - int(new.sum())
+        self.distinct_rows.update_hashes(hashes)
+        return self
+
+    def close(self) -> None:
+        """Free the row hashes; later rows are not checked against them."""
+        self._seen_rows.close()
+
+    def merge(self, other: "CsvProfile") -> "CsvProfile":
+        """Add the rows profiled by another profile to this one."""
+        if self.rows and other.rows:
+            # Rows of other already seen here, estimated from the
+            # distinct rows of both and of their union
+            distinct = self.rows - self.duplicates
+            other_distinct = other.rows - other.duplicates
+            self.distinct_rows.merge(other.distinct_rows)
+            overlap = distinct + other_distinct - self.distinct_rows.count()
+            overlap = min(max(overlap, 0), distinct, other_distinct)
+            self.duplicates += other.duplicates + overlap
+            self.duplicates_approximate = True
+        else:
+            self.distinct_rows.merge(other.distinct_rows)
+            self.duplicates += other.duplicates
+            self.duplicates_approximate |= other.duplicates_approximate
+        self.rows += other.rows
+        for col in other.columns:
+            if col not in self.column_profiles:
+                self.columns.append(col)
+                self.column_profiles[col] = ColumnProfile()
+            self.column_profiles[col].merge(other.column_profiles[col])
+        for col, (valid, invalid) in other.date_checks.items():
+            checks = self.date_checks.setdefault(col, [0, 0])
+            checks[0] += valid
+            checks[1] += invalid
+        return self
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "columns": len(self.columns),
+            "duplicate_rows": self.duplicates,
+            "duplicate_rows_approximate": self.duplicates_approximate,
+            "column_profiles": {
+                col: self.column_profiles[col].to_dict()
+                for col in self.columns
+            },
+            "date_checks": {
+                col: {"valid": valid, "invalid": invalid}
+                for col, (valid, invalid) in self.date_checks.items()
+            },
+        }
+
+
+def profile_csv(file_path: str, chunk_size: int = CHUNK_SIZE) -> CsvProfile:
+    """
+    Profile a CSV file in one pass, chunk_size rows at a time.
+
+    Args:
+        file_path (str): Path of the CSV file.
+        chunk_size (int): Number of rows read per chunk.
+
+    Returns:
+        CsvProfile: The profile of the file.
+    """
+    profile = CsvProfile()
+    try:
+        with pd.read_csv(file_path, chunksize=chunk_size) as reader:
+            for chunk in reader:
+                profile.update(chunk)
+    finally:
+        profile.close()
+    return profile
+
+
+def _profile_file(
+    args: Tuple[str, int]
+) -> Tuple[str, Optional[CsvProfile], Optional[str]]:
+    # Runs in a worker process; errors are reported, not raised
+    file_path, chunk_size = args
     try:
-        df = pd.read_csv(file_path)
+        return file_path, profile_csv(file_path, chunk_size), None
     except Exception as e:
-        report_lines.append(f"  ERROR: Could not read file: {e}\n")
-        return "\n".join(report_lines)
+        return file_path, None, str(e)
 
-    report_lines.append(f"  Rows: {len(df)}")
-    report_lines.append(f"  Columns: {len(df.columns)}")
 
-    # Check duplicates
-    num_duplicates = df.duplicated().sum()
-    report_lines.append(f"  Duplicate rows: {num_duplicates}")
+def format_profile(file_path: str, profile: Dict[str, Any]) -> str:
+    """Render a profile (as returned by CsvProfile.to_dict) as text."""
+    report_lines = [f"File: {file_path}"]
+    report_lines.append(f"  Rows: {profile['rows']}")
+    report_lines.append(f"  Columns: {profile['columns']}")
+    duplicates = f"{profile['duplicate_rows']}"
+    if profile.get("duplicate_rows_approximate"):
+        duplicates += " (approximate)"
+    report_lines.append(f"  Duplicate rows: {duplicates}")
 
-    # Check missing values
     report_lines.append("  Missing values per column:")
-    for col, cnt in df.isna().sum().items():
-        report_lines.append(f"    - {col}: {cnt}")
+    for col, column in profile["column_profiles"].items():
+        report_lines.append(f"    - {col}: {column['nulls']}")
 
-    # Check date columns
-    date_cols = [col for col in df.columns if "date" in col.lower()]
-    if date_cols:
+    report_lines.append("  Column profiles (distinct counts approximate):")
+    for col, column in profile["column_profiles"].items():
+        line = f"    - {col}: distinct~{column['distinct_estimate']}"
+        if "quantiles" in column:
+            quantiles = ", ".join(
+                f"{name}={value:.6g}"
+                for name, value in column["quantiles"].items()
+            )
+            line += (
+                f", min={column['min']:.6g}, {quantiles}, "
+                f"max={column['max']:.6g}"
+            )
+        elif "min" in column:
+            line += f", min={column['min']!r}, max={column['max']!r}"
+        report_lines.append(line)
+
+    if profile["date_checks"]:
         report_lines.append("  Date column checks:")
-        for col in date_cols:
-            parsed = pd.to_datetime(df[col], errors="coerce")
-            invalid_count = parsed.isna().sum()
-            valid_count = len(parsed) - invalid_count
+        for col, checks in profile["date_checks"].items():
             report_lines.append(
-                f"    - Column '{col}': valid={valid_count}"
-                f", invalid={invalid_count}"
+                f"    - Column '{col}': valid={checks['valid']}"
+                f", invalid={checks['invalid']}"
             )
     else:
         report_lines.append("  (No date columns detected)")
@@ -48,20 +255,66 @@ def analyze_csv(file_path: str) -> str:
     return "\n".join(report_lines)
 
 
-def main():
-    all_reports = [f"Data quality check started at: {datetime.now()}\n"]
+def analyze_csv(file_path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """Run basic data quality checks on a single CSV."""
+    _, profile, error = _profile_file((file_path, chunk_size))
+    if error is not None:
+        return f"File: {file_path}\n  ERROR: Could not read file: {error}\n"
+    return format_profile(file_path, profile.to_dict())
+
+
+def main(
+    folder_path: str = FOLDER_PATH,
+    chunk_size: int = CHUNK_SIZE,
+    max_workers: Optional[int] = None,
+):
+    started = datetime.now()
+    all_reports = [f"Data quality check started at: {started}\n"]
+    json_report = {"started": started.isoformat(), "files": {}}
+
+    files = [
+        os.path.join(folder_path, file_name)
+        for file_name in sorted(os.listdir(folder_path))
+        if file_name.lower().endswith(".csv")
+    ]
+
+    # Files are profiled in parallel, each in a single chunked pass
+    jobs = [(file_path, chunk_size) for file_path in files]
+    if len(files) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_profile_file, jobs))
+    else:
+        results = [_profile_file(job) for job in jobs]
+
+    combined = CsvProfile()
+    for file_path, profile, error in results:
+        if error is not None:
+            all_reports.append(
+                f"File: {file_path}\n  ERROR: Could not read file: {error}\n"
+            )
+            json_report["files"][file_path] = {"error": error}
+            continue
+        profile_dict = profile.to_dict()
+        all_reports.append(format_profile(file_path, profile_dict))
+        json_report["files"][file_path] = profile_dict
+        combined.merge(profile)
 
-    for file_name in os.listdir(FOLDER_PATH):
-        if file_name.lower().endswith(".csv"):
-            file_path = os.path.join(FOLDER_PATH, file_name)
-            all_reports.append(analyze_csv(file_path))
+    if len(json_report["files"]) > 1:
+        # Duplicates here include rows repeated across files
+        combined_dict = combined.to_dict()
+        all_reports.append(format_profile("ALL FILES", combined_dict))
+        json_report["all_files"] = combined_dict
 
-    all_reports.append(f"Data quality check finished at: {datetime.now()}")
+    finished = datetime.now()
+    all_reports.append(f"Data quality check finished at: {finished}")
+    json_report["finished"] = finished.isoformat()
 
     with open(LOG_FILE, "w", encoding="utf-8") as f:
         f.write("\n".join(all_reports))
+    with open(JSON_LOG_FILE, "w", encoding="utf-8") as f:
+        json.dump(json_report, f, indent=2)
 
-    print(f"Done. Log written to: {LOG_FILE}")
+    print(f"Done. Log written to: {LOG_FILE} and {JSON_LOG_FILE}")
 
 
 if __name__ == "__main__":
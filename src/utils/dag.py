@@ -0,0 +1,357 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+from src.utils.file_utils import ROOT_DIR
+from src.utils.logging_utils import setup_logger
+from src.utils.manifest import file_fingerprint, file_stat, files_intact
+
+logger = setup_logger(__name__, "dag.log")
+
+# Bump to invalidate every cached stage output, e.g. when the key or
+# what a stage stores changes
+CACHE_FORMAT = 2
+INPUT_FINGERPRINTS = "input_fingerprints.json"
+STAGE_OUTPUTS = "stage_outputs.json"
+
+
+class Stage(NamedTuple):
+    """
+    One step of a pipeline DAG.
+
+    The stage is called with the outputs of its dependencies, in the
+    order of deps, and returns its own output.
+
+    Args:
+        name: Unique stage name.
+        func: Function computing the output.
+        deps: Names of the stages whose outputs func takes.
+        code: Files or directories (relative to the project root) whose
+            source determines the result, e.g. ["src/transform"].
+        config: Settings that change the result, e.g. {"export_csv": True}.
+        inputs: Returns the data files the stage reads, e.g. raw CSVs.
+        outputs: Returns the files the stage writes. A cached output is
+            only up to date while all of them are there, unchanged.
+        cache: Store the output on disk. Stages whose output is cheap to
+            recompute (such as re-reading a CSV) are not stored, and only
+            run when a stage that needs their output runs.
+        to_cache: Returns the part of the output to store, e.g. to leave
+            out a large DataFrame the stage also wrote to one of its
+            outputs. The whole output by default.
+        from_cache: Rebuilds the output from the stored part, e.g. by
+            reading that DataFrame back.
+    """
+
+    name: str
+    func: Callable[..., Any]
+    deps: Sequence[str] = ()
+    code: Sequence[str] = ()
+    config: Optional[Dict[str, Any]] = None
+    inputs: Optional[Callable[[], Iterable[str]]] = None
+    outputs: Optional[Callable[[], Iterable[str]]] = None
+    cache: bool = True
+    to_cache: Optional[Callable[[Any], Any]] = None
+    from_cache: Optional[Callable[[Any], Any]] = None
+
+
+def topological_order(stages: Sequence[Stage]) -> List[Stage]:
+    """
+    Order stages so every stage comes after its dependencies.
+
+    Raises:
+        ValueError: If a name is repeated, a dependency is unknown or
+        the dependencies form a cycle.
+    """
+    by_name: Dict[str, Stage] = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        by_name[stage.name] = stage
+
+    ordered: List[Stage] = []
+    state: Dict[str, str] = {}
+
+    def visit(name: str, path: List[str]) -> None:
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(
+                f"Stage dependencies form a cycle: {' -> '.join(path)}"
+            )
+        state[name] = "visiting"
+        for dep in by_name[name].deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage {name} depends on unknown {dep}")
+            visit(dep, path + [dep])
+        state[name] = "done"
+        ordered.append(by_name[name])
+
+    for stage in stages:
+        visit(stage.name, [stage.name])
+    return ordered
+
+
+def hash_code(paths: Iterable[str]) -> str:
+    """SHA-256 over the content of the Python files at these paths."""
+    files = []
+    for path in paths:
+        full_path = os.path.join(ROOT_DIR, path)
+        if os.path.isdir(full_path):
+            pattern = os.path.join(full_path, "**", "*.py")
+            files.extend(glob.glob(pattern, recursive=True))
+        else:
+            files.append(full_path)
+
+    digest = hashlib.sha256()
+    for file_path in sorted(files):
+        digest.update(os.path.relpath(file_path, ROOT_DIR).encode())
+        with open(file_path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    Stage outputs pickled on disk under a key that hashes everything the
+    output depends on: stage name, code, config, input files and the
+    keys of the dependencies. Only the newest output of every stage is
+    kept.
+
+    Input files are fingerprinted by size, modification time and SHA-256;
+    the checksum is only recomputed when size or modification time
+    changed (see src.utils.manifest.file_fingerprint). The size and
+    modification time of the files a stage wrote are recorded with its
+    output, so a stage whose files were deleted or rewritten since is
+    not up to date.
+
+    Args:
+        cache_dir (str): Directory for the cached outputs.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._fingerprints_path = os.path.join(cache_dir, INPUT_FINGERPRINTS)
+        self._fingerprints: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self._fingerprints_path):
+            with open(self._fingerprints_path, encoding="utf-8") as f:
+                self._fingerprints = json.load(f)
+        # Per stage: key of the cached output and the files it wrote
+        self._outputs_path = os.path.join(cache_dir, STAGE_OUTPUTS)
+        self._outputs: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self._outputs_path):
+            with open(self._outputs_path, encoding="utf-8") as f:
+                self._outputs = json.load(f)
+
+    def fingerprint_inputs(self, paths: Iterable[str]) -> Dict[str, str]:
+        """SHA-256 of every input file, keyed by its relative path."""
+        checksums = {}
+        for path in sorted(paths):
+            key = os.path.relpath(os.path.abspath(path), ROOT_DIR)
+            fingerprint = file_fingerprint(path, self._fingerprints.get(key))
+            self._fingerprints[key] = fingerprint
+            checksums[key] = fingerprint["sha256"]
+        with open(self._fingerprints_path, "w", encoding="utf-8") as f:
+            json.dump(self._fingerprints, f, indent=2)
+        return checksums
+
+    def key(self, stage: Stage, dep_keys: List[str]) -> str:
+        inputs = stage.inputs() if stage.inputs is not None else []
+        description = {
+            "format": CACHE_FORMAT,
+            "stage": stage.name,
+            "code": hash_code(stage.code),
+            "config": stage.config or {},
+            "inputs": self.fingerprint_inputs(inputs),
+            "deps": dep_keys,
+        }
+        return hashlib.sha256(
+            json.dumps(description, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    def _path(self, name: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}.{key[:16]}.pkl")
+
+    def contains(
+        self, name: str, key: str, outputs: Iterable[str] = ()
+    ) -> bool:
+        """
+        True when the output of the stage is cached under key and the
+        files it wrote are all still there, unchanged.
+        """
+        if not os.path.exists(self._path(name, key)):
+            return False
+        recorded = self._outputs.get(name, {})
+        expected = {self._relative(path) for path in outputs}
+        return (
+            recorded.get("key") == key
+            and expected <= set(recorded.get("files", {}))
+            and files_intact(recorded.get("files", {}), ROOT_DIR)
+        )
+
+    def load(self, name: str, key: str) -> Any:
+        with open(self._path(name, key), "rb") as f:
+            return pickle.load(f)
+
+    def store(
+        self, name: str, key: str, output: Any, outputs: Iterable[str] = ()
+    ) -> None:
+        path = self._path(name, key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.invalidate(name, keep=path)
+        # Files the stage did not write are not recorded, so the stage
+        # is not up to date until a run writes them
+        self._outputs[name] = {
+            "key": key,
+            "files": {
+                self._relative(file): file_stat(file)
+                for file in outputs
+                if os.path.exists(file)
+            },
+        }
+        self._save_outputs()
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), ROOT_DIR)
+
+    def _save_outputs(self) -> None:
+        tmp_path = f"{self._outputs_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._outputs, f, indent=2)
+        os.replace(tmp_path, self._outputs_path)
+
+    def invalidate(self, name: str, keep: Optional[str] = None) -> None:
+        """Delete the cached outputs of a stage (except keep)."""
+        pattern = os.path.join(glob.escape(self.cache_dir), f"{name}.*.pkl")
+        for path in glob.glob(pattern):
+            if path != keep:
+                os.remove(path)
+
+
+def output_files(stage: Stage) -> List[str]:
+    return list(stage.outputs()) if stage.outputs is not None else []
+
+
+def run_dag(
+    stages: Sequence[Stage],
+    cache: Optional[StageCache] = None,
+    force: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """
+    Run the stages of a DAG, skipping the ones that are up to date.
+
+    A stage is up to date when its output is cached under its current
+    key and the files it writes (Stage.outputs) are unchanged. Stages
+    are skipped when up to date, or when nothing that has to run needs
+    their output (so an expensive extract is not repeated just to feed
+    a transform whose result is cached). After a failure, a re-run
+    resumes from the failed stage.
+
+    Args:
+        stages: The stages, in any order.
+        cache (StageCache, optional): Where outputs are cached. Without
+            one every stage runs.
+        force: Names of stages to run even if they are up to date. Every
+            stage that depends on them runs as well.
+
+    Returns:
+        Dict[str, Any]: Output of every stage that was run or whose
+        output was loaded from the cache.
+
+    Raises:
+        ValueError: If the DAG is invalid or a forced stage is unknown.
+    """
+    ordered = topological_order(stages)
+    names = [stage.name for stage in ordered]
+    unknown = set(force) - set(names)
+    if unknown:
+        raise ValueError(
+            f"Unknown stage(s) to force: {', '.join(sorted(unknown))}. "
+            f"Stages: {', '.join(names)}"
+        )
+
+    # Forced stages and everything downstream of them are dirty
+    dirty = set(force)
+    keys: Dict[str, str] = {}
+    for stage in ordered:
+        if any(dep in dirty for dep in stage.deps):
+            dirty.add(stage.name)
+        if cache is not None:
+            keys[stage.name] = cache.key(
+                stage, [keys[dep] for dep in stage.deps]
+            )
+
+    def up_to_date(stage: Stage) -> bool:
+        return (
+            cache is not None
+            and stage.cache
+            and stage.name not in dirty
+            and cache.contains(
+                stage.name, keys[stage.name], output_files(stage)
+            )
+        )
+
+    # Walk back from the last stages: a stage runs when its output is
+    # needed by a stage that runs (or it is a final stage) and it is not
+    # up to date
+    dependents: Dict[str, List[str]] = {name: [] for name in names}
+    for stage in ordered:
+        for dep in stage.deps:
+            dependents[dep].append(stage.name)
+    to_run = set()
+    for stage in reversed(ordered):
+        needed = not dependents[stage.name] or any(
+            name in to_run for name in dependents[stage.name]
+        )
+        if needed and not up_to_date(stage):
+            to_run.add(stage.name)
+
+    by_name = {stage.name: stage for stage in ordered}
+    outputs: Dict[str, Any] = {}
+
+    def output_of(name: str) -> Any:
+        if name not in outputs:
+            logger.info(f"Stage {name} is up to date, loading its output")
+            output = cache.load(name, keys[name])
+            if by_name[name].from_cache is not None:
+                output = by_name[name].from_cache(output)
+            outputs[name] = output
+        return outputs[name]
+
+    for stage in ordered:
+        if stage.name not in to_run:
+            if not dependents[stage.name]:
+                output_of(stage.name)
+            else:
+                logger.info(f"Stage {stage.name} skipped")
+            continue
+
+        logger.info(f"Running stage {stage.name}")
+        if cache is not None:
+            # A forced or failing stage must not leave a stale output
+            cache.invalidate(stage.name)
+        output = stage.func(*(output_of(dep) for dep in stage.deps))
+        outputs[stage.name] = output
+        if cache is not None and stage.cache:
+            stored = output
+            if stage.to_cache is not None:
+                stored = stage.to_cache(output)
+            cache.store(
+                stage.name, keys[stage.name], stored, output_files(stage)
+            )
+
+    return outputs
@@ -16,10 +16,12 @@ def log_table_action(connection, table_name: str, schema: str) -> bool:
     # Create an inspector object to examine the database schema
     inspector = sq.inspect(connection)
 
-    # Check if the table exists in the given schema
-    if inspector.has_table(table_name, schema=schema):
+    # Check if the table exists in the given schema (one catalog query)
+    exists = inspector.has_table(table_name, schema=schema)
+    if exists:
         logger.info(
-            f"Table {schema}.{table_name} exists. Data will be appended."
+            f"Table {schema}.{table_name} exists. Data will be loaded "
+            "into a staging table and swapped or merged in."
         )
     else:
         logger.info(
@@ -28,4 +30,4 @@ def log_table_action(connection, table_name: str, schema: str) -> bool:
         )
 
     # Return True if table exists, otherwise False
-    return inspector.has_table(table_name, schema=schema)
+    return exists
@@ -1,8 +1,11 @@
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine, Connection
 from sqlalchemy.exc import ArgumentError, OperationalError, SQLAlchemyError
+import atexit
 import logging
-from typing import Dict, Literal
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Literal, Tuple
 from src.utils.logging_utils import setup_logger
 
 
@@ -19,6 +22,11 @@ class QueryExecutionError(Exception):
 # Configure the logger
 logger = setup_logger(__name__, "database.log", level=logging.DEBUG)
 
+# One Engine (and so one connection pool) per set of connection parameters,
+# shared by every load and query in the process
+_ENGINES: Dict[Tuple[Tuple[str, str], ...], Engine] = {}
+_ENGINES_LOCK = threading.Lock()
+
 
 # Need to create database engine
 # Tells python what flavour of database it is connecting to
@@ -27,6 +35,7 @@ def create_db_engine(
     connection_params: Dict[
         Literal["dbname", "user", "password", "host", "port", "schema"], str
     ],
+    **pool_options: Any,
 ) -> Engine:
     """
     Create a SQLAlchemy database engine for PostgreSQL connection.
@@ -34,6 +43,9 @@ def create_db_engine(
     Args:
         connection_params: Must include 'dbname', 'user', 'password',
                           'host', 'port'.
+        pool_options: Optional pool settings passed to create_engine,
+                      e.g. pool_size, max_overflow, pool_pre_ping,
+                      pool_recycle.
 
     Raises:
         DatabaseConnectionError: If connection parameters are invalid or
@@ -58,6 +70,7 @@ def create_db_engine(
                 "options": f"-csearch_path="
                 f"{connection_params.get('schema', 'public')}"
             },
+            **pool_options,
         )
         logger.info("Successfully created the database engine.")
         return engine
@@ -72,21 +85,58 @@ def create_db_engine(
         raise DatabaseConnectionError(f"Invalid Connection Parameters: {e}")
 
 
+# Reuse the engine for these connection parameters if we already have one
+def get_db_engine(
+    connection_params: Dict[
+        Literal["dbname", "user", "password", "host", "port", "schema"], str
+    ],
+    **pool_options: Any,
+) -> Engine:
+    """
+    Return the shared engine for these connection parameters, creating
+    it on first use.
+
+    Pool options only take effect when the engine is first created.
+
+    Raises:
+        DatabaseConnectionError: If connection parameters are invalid or
+                               missing.
+    """
+    key = tuple(sorted(connection_params.items()))
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            engine = create_db_engine(connection_params, **pool_options)
+            _ENGINES[key] = engine
+    return engine
+
+
+@atexit.register
+def dispose_db_engines() -> None:
+    """Close every pooled connection and forget all cached engines."""
+    with _ENGINES_LOCK:
+        for engine in _ENGINES.values():
+            engine.dispose()
+        _ENGINES.clear()
+
+
 # Once we have the engine
 # We can create a connection
 def get_db_connection(
     connection_params: Dict[
         Literal["dbname", "user", "password", "host", "port", "schema"], str
     ],
+    **pool_options: Any,
 ) -> Connection:
     """
-    Create and return a database connection.
+    Check out a connection from the shared pool for these parameters.
+    Closing the connection returns it to the pool.
 
     Raises:
         DatabaseConnectionError: If connection fails.
     """
     try:
-        engine = create_db_engine(connection_params)
+        engine = get_db_engine(connection_params, **pool_options)
         connection = engine.connect()
         logger.info("Successfully connected to the database.")
         return connection
@@ -107,3 +157,24 @@ def get_db_connection(
         # This catches any unhandled exceptions in get_db_connection
         # and create_db_engine
         raise Exception(f"An error occurred: {e}")
+
+
+@contextmanager
+def db_connection(
+    connection_params: Dict[
+        Literal["dbname", "user", "password", "host", "port", "schema"], str
+    ],
+    **pool_options: Any,
+) -> Iterator[Connection]:
+    """
+    Context manager that checks out a pooled connection and always
+    returns it to the pool, even if the block raises.
+
+    Raises:
+        DatabaseConnectionError: If connection fails.
+    """
+    connection = get_db_connection(connection_params, **pool_options)
+    try:
+        yield connection
+    finally:
+        connection.close()
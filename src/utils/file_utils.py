@@ -1,5 +1,12 @@
 import os
-import pandas as pd
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional
+from src.utils.logging_utils import track_stage
+
+# pandas and pyarrow are imported where they are used, so importing
+# this module (e.g. for ROOT_DIR) does not load them
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def find_project_root(marker_file: str = "README.md") -> str:
@@ -14,7 +21,7 @@ def find_project_root(marker_file: str = "README.md") -> str:
     """
     current_dir = os.path.abspath(os.path.dirname(__file__))
     while current_dir != os.path.dirname(current_dir):
-        if marker_file in os.listdir(current_dir):
+        if os.path.isfile(os.path.join(current_dir, marker_file)):
             return current_dir
         current_dir = os.path.dirname(current_dir)
     raise FileNotFoundError(
@@ -22,13 +29,57 @@ def find_project_root(marker_file: str = "README.md") -> str:
     )
 
 
-ROOT_DIR = find_project_root()
-INDEXES_PATH = os.path.join(ROOT_DIR, "etl", "sql", "indexes")
-QUERY_PATH = os.path.join(ROOT_DIR, "etl", "sql")
+PARQUET_COMPRESSION = "zstd"
+# Paths under the project root, resolved on first use (see __getattr__)
+ROOT_PATHS = {
+    "INDEXES_PATH": ("etl", "sql", "indexes"),
+    "QUERY_PATH": ("etl", "sql"),
+}
+
+
+def project_root() -> str:
+    """
+    The project root, looked up on first use and kept as ROOT_DIR.
+
+    Returns:
+        str: The absolute path to the root directory of the project.
+    """
+    root = globals().get("ROOT_DIR")
+    if root is None:
+        root = globals()["ROOT_DIR"] = find_project_root()
+    return root
+
+
+def __getattr__(name: str) -> str:
+    # ROOT_DIR, INDEXES_PATH and QUERY_PATH are only looked up when a
+    # caller asks for them
+    if name == "ROOT_DIR":
+        return project_root()
+    if name in ROOT_PATHS:
+        return os.path.join(project_root(), *ROOT_PATHS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_output_path(relative_output_dir: str, filename: str) -> str:
+    """
+    Build the absolute path of a file under the project root, creating
+    its directory if needed.
+
+    Args:
+        relative_output_dir (str): The directory of the file.
+        filename (str): The name of the file.
+
+    Returns:
+        str: The absolute path of the file.
+    """
+    output_dir = os.path.join(project_root(), relative_output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    return os.path.join(output_dir, filename)
 
 
+@track_stage("save_dataframe_to_csv")
 def save_dataframe_to_csv(
-    df: pd.DataFrame, relative_output_dir: str, filename: str
+    df: "pd.DataFrame", relative_output_dir: str, filename: str
 ) -> None:
     """
     Save a pandas DataFrame to a CSV file.
@@ -38,7 +89,132 @@ def save_dataframe_to_csv(
         output_dir (str): The directory to save the file to.
         filename (str): The name of the file to save.
     """
-    output_dir = os.path.join(ROOT_DIR, relative_output_dir)
+    output_dir = os.path.join(project_root(), relative_output_dir)
     os.makedirs(output_dir, exist_ok=True)
     df.to_csv(os.path.join(output_dir, filename), index=False)
     print(f"Data saved to {os.path.join(output_dir, filename)}")
+
+
+def append_dataframe_to_csv(
+    df: "pd.DataFrame",
+    relative_output_dir: str,
+    filename: str,
+    overwrite: bool = False,
+) -> None:
+    """
+    Append a pandas DataFrame to a CSV file, one chunk at a time.
+
+    Args:
+        df (pd.DataFrame): The chunk to append.
+        relative_output_dir (str): The directory to save the file to.
+        filename (str): The name of the file to append to.
+        overwrite (bool): Start a new file with a header row instead of
+            appending to an existing one. Use this for the first chunk.
+    """
+    output_dir = os.path.join(project_root(), relative_output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    df.to_csv(
+        os.path.join(output_dir, filename),
+        mode="w" if overwrite else "a",
+        header=overwrite,
+        index=False,
+    )
+
+
+@track_stage("save_dataframe_to_parquet")
+def save_dataframe_to_parquet(
+    df: "pd.DataFrame", relative_output_dir: str, filename: str
+) -> None:
+    """
+    Save a pandas DataFrame to a compressed Parquet file.
+
+    Column types are stored in the file, so readers do not have to
+    parse text or infer dtypes again.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to save.
+        relative_output_dir (str): The directory to save the file to.
+        filename (str): The name of the file to save.
+    """
+    output_dir = os.path.join(project_root(), relative_output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    df.to_parquet(
+        os.path.join(output_dir, filename),
+        engine="pyarrow",
+        compression=PARQUET_COMPRESSION,
+        index=False,
+    )
+    print(f"Data saved to {os.path.join(output_dir, filename)}")
+
+
+@contextmanager
+def open_parquet_writer(
+    relative_output_dir: str, filename: str
+) -> Iterator[Callable[["pd.DataFrame"], None]]:
+    """
+    Open a Parquet file and write DataFrames to it one chunk at a time.
+
+    The schema is taken from the first chunk and later chunks are cast
+    to it, so a column that is all-integer in one chunk and float in
+    another is still stored with a single type.
+
+    Args:
+        relative_output_dir (str): The directory to save the file to.
+        filename (str): The name of the file to write.
+
+    Yields:
+        Callable[[pd.DataFrame], None]: Function that appends a chunk.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    output_dir = os.path.join(project_root(), relative_output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, filename)
+    writer = None
+
+    def write(df: "pd.DataFrame") -> None:
+        nonlocal writer
+        table = pa.Table.from_pandas(
+            df,
+            schema=writer.schema if writer is not None else None,
+            preserve_index=False,
+        )
+        if writer is None:
+            writer = pq.ParquetWriter(
+                path, table.schema, compression=PARQUET_COMPRESSION
+            )
+        writer.write_table(table)
+
+    try:
+        yield write
+    finally:
+        if writer is not None:
+            writer.close()
+            print(f"Data saved to {path}")
+
+
+@track_stage("read_dataframe_from_parquet")
+def read_dataframe_from_parquet(
+    relative_dir: str, filename: str, columns: Optional[List[str]] = None
+) -> "pd.DataFrame":
+    """
+    Read a Parquet file into a pandas DataFrame.
+
+    The file is memory-mapped rather than read into a buffer first, and
+    only the requested columns are decoded.
+
+    Args:
+        relative_dir (str): The directory containing the file.
+        filename (str): The name of the file to read.
+        columns (List[str], optional): Columns to read. Reads all
+            columns by default.
+
+    Returns:
+        pd.DataFrame: The stored DataFrame with its original dtypes.
+    """
+    path = os.path.join(project_root(), relative_dir, filename)
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas()
@@ -1,12 +1,54 @@
 from pathlib import Path
+import atexit
+import functools
+import json
 import logging
-from typing import Tuple
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+PERFORMANCE_LOGGER = "etl_performance"
+PERFORMANCE_LOG_FILE = "performance.jsonl"
+JSON_LOG_FILE = "etl.jsonl"
+
+# Log files are rotated at this size, keeping LOG_BACKUP_COUNT old files.
+# Override with the LOG_MAX_BYTES, LOG_BACKUP_COUNT and LOG_ROTATE_WHEN
+# (e.g. "midnight", for time-based rotation) environment variables.
+LOG_MAX_BYTES = 10_000_000
+LOG_BACKUP_COUNT = 5
+# Records waiting to be written, at most (LOG_QUEUE_SIZE to override);
+# see _LogBackend for what happens when the writer falls behind
+LOG_QUEUE_SIZE = 10_000
+RSS_SAMPLE_INTERVAL = 0.005  # seconds
+
+# Records of the stages tracked in this process, in completion order
+_STAGE_RECORDS: List[Dict[str, Any]] = []
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+# Queue and writer thread shared by every logger of this process
+_BACKEND: Optional["_LogBackend"] = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def _log_directory(base_path=None):
+    """The logs directory, without creating it."""
+    project_root = Path(base_path or __file__).resolve().parent.parent
+    return project_root / "logs"
 
 
 def _ensure_log_directory(base_path=None):
     """Ensure the logs directory exists."""
-    project_root = Path(base_path or __file__).resolve().parent.parent
-    log_directory = project_root / "logs"
+    log_directory = _log_directory(base_path)
     log_directory.mkdir(parents=True, exist_ok=True)
     return log_directory
 
@@ -18,34 +60,263 @@ def _create_formatter():
     )
 
 
-def _create_handlers(log_directory, log_file, level):
-    """Create file and console handlers."""
-    file_handler = logging.FileHandler(log_directory / log_file)
-    file_handler.setLevel(level)
+def _create_file_handler(path, max_bytes, backup_count, when=None):
+    """Create a size-rotating (or, with when, time-rotating) file handler."""
+    # Log directories are created when the first record is written, not
+    # when a module sets up its logger at import
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if multiprocessing.parent_process() is not None:
+        # Worker processes append without rotating: rotation is left to
+        # the main process, so two processes never rotate the same file
+        return logging.FileHandler(path, delay=True)
+    if when:
+        return logging.handlers.TimedRotatingFileHandler(
+            path, when=when, backupCount=backup_count, delay=True
+        )
+    return logging.handlers.RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backup_count, delay=True
+    )
+
+
+def _log_settings() -> Dict[str, Any]:
+    """Logging backend settings from environment variables."""
+    return {
+        "max_bytes": int(os.getenv("LOG_MAX_BYTES", LOG_MAX_BYTES)),
+        "backup_count": int(os.getenv("LOG_BACKUP_COUNT", LOG_BACKUP_COUNT)),
+        "queue_size": int(os.getenv("LOG_QUEUE_SIZE", LOG_QUEUE_SIZE)),
+        "when": os.getenv("LOG_ROTATE_WHEN") or None,
+        "json": os.getenv("LOG_JSON", "false").lower()
+        in ("1", "true", "yes"),
+    }
+
+
+class _JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record):
+        return json.dumps(
+            {
+                "timestamp": datetime.fromtimestamp(
+                    record.created, timezone.utc
+                ).isoformat(),
+                "logger": record.name,
+                "level": record.levelname,
+                "message": record.getMessage(),
+                "log_file": os.path.basename(record.log_path),
+                "process": record.process,
+                "thread": record.threadName,
+            }
+        )
+
+
+def _is_text_record(record) -> bool:
+    # Raw records (JSON performance lines) only go to their own file
+    return not getattr(record, "raw", False)
+
+
+class _FileRouter(logging.Handler):
+    """
+    Write each record to the log file its logger was set up with,
+    creating the (rotating) file handlers on first use.
+    """
+
+    def __init__(self, settings: Dict[str, Any]):
+        super().__init__()
+        self.settings = settings
+        self.file_handlers: Dict[str, logging.Handler] = {}
+
+    def _handler_for(self, record) -> logging.Handler:
+        handler = self.file_handlers.get(record.log_path)
+        if handler is None:
+            handler = _create_file_handler(
+                record.log_path,
+                self.settings["max_bytes"],
+                self.settings["backup_count"],
+                self.settings["when"],
+            )
+            handler.setFormatter(
+                logging.Formatter("%(message)s")
+                if record.raw
+                else _create_formatter()
+            )
+            self.file_handlers[record.log_path] = handler
+        return handler
+
+    def emit(self, record):
+        try:
+            self._handler_for(record).handle(record)
+        except Exception:
+            # e.g. the log directory was removed; keep the writer alive
+            self.handleError(record)
+
+    def close(self):
+        for handler in self.file_handlers.values():
+            handler.close()
+        super().close()
+
+
+class _Listener(QueueListener):
+    # Wait for room for the stop sentinel; the queue is bounded
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
 
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
+class _LogBackend:
+    """
+    The process's log writer: records are put on a queue by the
+    loggers and written to files and the console by one QueueListener
+    thread.
+
+    The queue holds at most LOG_QUEUE_SIZE records, so a writer stuck
+    on a slow disk cannot make it grow without limit. When it is full,
+    DEBUG and INFO records are dropped and counted (see
+    dropped_log_records; the count is printed to stderr at shutdown),
+    so the pipeline never waits on them, while WARNING and above block
+    the logging thread until there is room, so they are never lost.
+    """
+
+    def __init__(self):
+        settings = _log_settings()
+        self.pid = os.getpid()
+        self.queue: queue.Queue = queue.Queue(maxsize=settings["queue_size"])
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(_create_formatter())
+        console_handler.addFilter(_is_text_record)
+        handlers = [_FileRouter(settings), console_handler]
+
+        if settings["json"]:
+            json_handler = _create_file_handler(
+                _log_directory() / JSON_LOG_FILE,
+                settings["max_bytes"],
+                settings["backup_count"],
+                settings["when"],
+            )
+            json_handler.setFormatter(_JsonFormatter())
+            json_handler.addFilter(_is_text_record)
+            handlers.append(json_handler)
+
+        self.handlers = handlers
+        self.listener = _Listener(self.queue, *handlers)
+        self.listener.start()
+
+    def put(self, record) -> None:
+        if record.levelno >= logging.WARNING:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def flush(self) -> None:
+        self.queue.join()
+
+    def stop(self) -> None:
+        self.listener.stop()
+        for handler in self.handlers:
+            handler.close()
+        if self.dropped:
+            sys.stderr.write(
+                f"{self.dropped} DEBUG/INFO log records were dropped "
+                f"because the log queue was full (LOG_QUEUE_SIZE="
+                f"{self.queue.maxsize})\n"
+            )
+
+
+def _get_backend() -> _LogBackend:
+    global _BACKEND
+    with _BACKEND_LOCK:
+        # A worker process gets its own queue and writer thread
+        if _BACKEND is None or _BACKEND.pid != os.getpid():
+            _BACKEND = _LogBackend()
+        return _BACKEND
+
+
+def _reset_after_fork() -> None:
+    # The lock may have been held by another thread at fork time
+    global _BACKEND, _BACKEND_LOCK
+    _BACKEND = None
+    _BACKEND_LOCK = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
 
-    formatter = _create_formatter()
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
 
-    return file_handler, console_handler
+def dropped_log_records() -> int:
+    """DEBUG and INFO records this process dropped on a full log queue."""
+    if _BACKEND is not None and _BACKEND.pid == os.getpid():
+        return _BACKEND.dropped
+    return 0
+
+
+def flush_logs() -> None:
+    """Wait until every record logged so far has been written."""
+    if _BACKEND is not None and _BACKEND.pid == os.getpid():
+        _BACKEND.flush()
+
+
+@atexit.register
+def shutdown_logging() -> None:
+    """Write the remaining records and stop the writer thread."""
+    global _BACKEND
+    with _BACKEND_LOCK:
+        if _BACKEND is not None and _BACKEND.pid == os.getpid():
+            _BACKEND.stop()
+        _BACKEND = None
+
+
+class _QueueHandler(QueueHandler):
+    """
+    Put records on the process's log queue, tagged with the log file
+    they belong to. Formatting of the message happens here, writing in
+    the background.
+    """
+
+    def __init__(self, log_path, raw=False):
+        super().__init__(None)
+        self.log_path = str(log_path)
+        self.raw = raw
+
+    def prepare(self, record):
+        # Like QueueHandler.prepare, but without copying the record or
+        # formatting it twice: the message and traceback are resolved to
+        # strings here, so the record can cross threads safely
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        record.log_path = self.log_path
+        record.raw = self.raw
+        return record
+
+    def enqueue(self, record):
+        _get_backend().put(record)
 
 
 def setup_logger(name, log_file, level=logging.DEBUG, base_path=None):
-    """Function to setup a logger; can be used in multiple modules."""
-    log_directory = _ensure_log_directory(base_path)
+    """
+    Function to setup a logger; can be used in multiple modules.
+
+    Logging does not block on disk or console writes: records go to a
+    queue and one background thread per process writes them to
+    src/logs/<log_file> (rotated by size, or by time when
+    LOG_ROTATE_WHEN is set) and to the console, and, with LOG_JSON=true,
+    as JSON lines to src/logs/etl.jsonl.
+    """
+    log_directory = _log_directory(base_path)
 
     logger = logging.getLogger(name)
     logger.setLevel(level)
 
     if not logger.handlers:
-        file_handler, console_handler = _create_handlers(
-            log_directory, log_file, level
-        )
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        logger.addHandler(_QueueHandler(log_directory / log_file))
 
     return logger
 
@@ -106,3 +377,263 @@ def log_load_success(
         )
     else:
         logger.warning("No rows loaded!.")
+
+
+def log_memory_usage(logger: logging.Logger, type: str, df) -> None:
+    """
+    Log how much memory a DataFrame uses, including the contents of
+    string and category columns.
+
+    Args:
+        logger: Logger instance to use for output.
+        type: Description of the data.
+        df: The pandas DataFrame to measure.
+    """
+    usage = df.memory_usage(deep=True).sum()
+    logger.info(f"Memory usage for {type}: {usage / 1e6:.1f} MB")
+
+
+def _get_performance_logger(base_path=None) -> logging.Logger:
+    """Logger writing one JSON record per line to performance.jsonl."""
+    logger = logging.getLogger(PERFORMANCE_LOGGER)
+    if not logger.handlers:
+        log_directory = _log_directory(base_path)
+        logger.addHandler(
+            _QueueHandler(log_directory / PERFORMANCE_LOG_FILE, raw=True)
+        )
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+class PeakRSS:
+    """
+    Track the peak resident set size of this process while a block runs.
+
+    psutil only reports the current RSS on Linux, so it is sampled from a
+    background thread every interval seconds.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self) -> None:
+        while True:
+            self.peak = max(self.peak, self.process.memory_info().rss)
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self) -> "PeakRSS":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+
+
+def _count_rows(data: Any) -> Optional[int]:
+    # Rows of a DataFrame/Series, or the number itself for a row count
+    if isinstance(data, bool):
+        return None
+    if isinstance(data, int):
+        return data
+    if hasattr(data, "shape") and hasattr(data, "memory_usage"):
+        return len(data)
+    return None
+
+
+def _memory_mb(data: Any) -> Optional[float]:
+    if hasattr(data, "shape") and hasattr(data, "memory_usage"):
+        usage = data.memory_usage(deep=True)
+        if hasattr(usage, "sum"):
+            usage = usage.sum()
+        return round(usage / 1e6, 3)
+    return None
+
+
+class track_stage:
+    """
+    Time a pipeline stage and emit a structured performance record.
+
+    Works as a context manager:
+
+        with track_stage("extract", logger) as stage:
+            customers = extract_all()
+            stage.set_output(customers)
+
+    and as a decorator for functions taking and returning a DataFrame,
+    where the rows in and out are taken from the first argument and the
+    result:
+
+        @track_stage("trim_values")
+        def trim_values(customers): ...
+
+    Each record holds the stage name, status, rows in/out, duration and
+    rows/s. With memory measurement, it also holds the peak RSS of the
+    process while the stage ran (sampled by a background thread) and
+    the deep memory of the output DataFrame. That is the default for the
+    top-level stages run as `with` blocks; decorated functions, which
+    run once per chunk in the streaming loop, skip it unless asked, so
+    they cost no thread and no scan of object columns (peak_rss_mb and
+    df_memory_mb are None). The record is written as one JSON line to
+    src/logs/performance.jsonl, logged to the given logger and kept for
+    format_stage_summary().
+
+    Args:
+        stage: Name of the stage.
+        logger: Optional logger that also gets a one-line summary.
+        rows_in: Rows going into the stage, or a DataFrame to count.
+        memory: Measure peak RSS and output memory. None (default)
+            measures for `with` blocks but not for decorated functions.
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        logger: Optional[logging.Logger] = None,
+        rows_in: Any = None,
+        memory: Optional[bool] = None,
+    ):
+        self.stage = stage
+        self.logger = logger
+        self.memory = memory
+        self.rows_in = _count_rows(rows_in)
+        self.rows_out: Optional[int] = None
+        self.memory_mb: Optional[float] = None
+        self.record: Optional[Dict[str, Any]] = None
+
+    def set_output(self, data: Any = None, rows: Optional[int] = None):
+        """Record the output of the stage: a DataFrame or a row count."""
+        self.rows_out = rows if rows is not None else _count_rows(data)
+        if self.memory is not False:
+            self.memory_mb = _memory_mb(data)
+
+    def __enter__(self) -> "track_stage":
+        self._rss = (
+            PeakRSS().__enter__() if self.memory is not False else None
+        )
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration = time.perf_counter() - self._start
+        peak_rss_mb = None
+        if self._rss is not None:
+            self._rss.__exit__(exc_type, exc, tb)
+            peak_rss_mb = round(self._rss.peak / 1e6, 1)
+
+        # Throughput is measured on the rows the stage had to process
+        rows = self.rows_in if self.rows_in is not None else self.rows_out
+        self.record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "stage": self.stage,
+            "status": "failed" if exc_type else "ok",
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "duration_s": round(duration, 6),
+            "rows_per_s": (
+                round(rows / duration)
+                if rows and duration > 0 and not exc_type
+                else None
+            ),
+            "peak_rss_mb": peak_rss_mb,
+            "df_memory_mb": self.memory_mb,
+        }
+        _STAGE_RECORDS.append(self.record)
+        _get_performance_logger().info(json.dumps(self.record))
+        if self.logger is not None:
+            rss = (
+                f", peak RSS {peak_rss_mb} MB"
+                if peak_rss_mb is not None
+                else ""
+            )
+            self.logger.info(
+                f"Stage {self.stage} {self.record['status']} in "
+                f"{duration:.3f} s (rows in {self.rows_in}, "
+                f"rows out {self.rows_out}{rss})"
+            )
+        return False
+
+    def __call__(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            data = args[0] if args else None
+            with track_stage(
+                self.stage,
+                self.logger,
+                rows_in=data,
+                memory=bool(self.memory),
+            ) as stage:
+                result = func(*args, **kwargs)
+                stage.set_output(result)
+            return result
+
+        return wrapper
+
+
+def get_stage_records() -> List[Dict[str, Any]]:
+    """Performance records of the stages tracked so far."""
+    return list(_STAGE_RECORDS)
+
+
+def reset_stage_records() -> None:
+    """Forget the tracked stages, e.g. at the start of a run."""
+    _STAGE_RECORDS.clear()
+
+
+def format_stage_summary(
+    records: Optional[List[Dict[str, Any]]] = None
+) -> str:
+    """
+    Summarise the tracked stages as a text table, one line per stage
+    name. Stages run several times (e.g. once per chunk) are added up.
+
+    Args:
+        records: Records to summarise. Defaults to every tracked stage.
+
+    Returns:
+        The table, ready to print.
+    """
+    if records is None:
+        records = _STAGE_RECORDS
+
+    stages: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        stage = stages.setdefault(
+            record["stage"],
+            {"calls": 0, "rows": 0, "seconds": 0.0, "rss": None, "ok": True},
+        )
+        stage["calls"] += 1
+        rows = record["rows_in"]
+        if rows is None:
+            rows = record["rows_out"]
+        stage["rows"] += rows or 0
+        stage["seconds"] += record["duration_s"]
+        if record.get("peak_rss_mb") is not None:
+            stage["rss"] = max(stage["rss"] or 0.0, record["peak_rss_mb"])
+        stage["ok"] &= record["status"] == "ok"
+
+    header = (
+        f"{'stage':<32} {'calls':>6} {'rows':>12} {'seconds':>10} "
+        f"{'rows/s':>12} {'peak RSS MB':>12} {'status':>7}"
+    )
+    lines = [header, "-" * len(header)]
+    for name, stage in stages.items():
+        rate = (
+            f"{stage['rows'] / stage['seconds']:,.0f}"
+            if stage["rows"] and stage["seconds"] > 0
+            else "-"
+        )
+        rss = f"{stage['rss']:.1f}" if stage["rss"] is not None else "-"
+        lines.append(
+            f"{name:<32} {stage['calls']:>6} {stage['rows']:>12} "
+            f"{stage['seconds']:>10.3f} {rate:>12} {rss:>12} "
+            f"{'ok' if stage['ok'] else 'failed':>7}"
+        )
+    return "\n".join(lines)
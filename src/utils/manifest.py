@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+CHECKSUM_BLOCK_SIZE = 1 << 20  # 1 MB
+
+
+class InputChanges(NamedTuple):
+    """Raw files grouped by how they differ from the last run."""
+
+    new: List[str]
+    changed: List[str]
+    removed: List[str]
+    unchanged: List[str]
+
+    @property
+    def any(self) -> bool:
+        return bool(self.new or self.changed or self.removed)
+
+
+def file_checksum(path: str) -> str:
+    """SHA-256 of a file's content, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHECKSUM_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_stat(path: str) -> Dict[str, int]:
+    """Size and modification time of a file, as stored in fingerprints."""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def file_fingerprint(
+    path: str, previous: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Size, modification time and checksum of a file.
+
+    The checksum is only computed when the size or modification time
+    differ from the previous fingerprint, so checking an unchanged file
+    costs a single stat() call.
+
+    Args:
+        path (str): Path of the file.
+        previous (dict, optional): Fingerprint recorded for the file by
+            an earlier run.
+
+    Returns:
+        dict: The fingerprint, with keys size, mtime_ns and sha256.
+    """
+    fingerprint = file_stat(path)
+    if previous is not None and _same_stat(previous, fingerprint):
+        fingerprint["sha256"] = previous["sha256"]
+    else:
+        fingerprint["sha256"] = file_checksum(path)
+    return fingerprint
+
+
+def _same_stat(previous: Dict[str, Any], current: Dict[str, Any]) -> bool:
+    return (
+        previous.get("size") == current["size"]
+        and previous.get("mtime_ns") == current["mtime_ns"]
+    )
+
+
+def files_intact(recorded: Dict[str, Dict[str, Any]], root_dir: str) -> bool:
+    """
+    True when every recorded file (path relative to root_dir) still
+    exists with the recorded size and modification time, i.e. was not
+    deleted or rewritten since it was recorded.
+    """
+    for key, previous in recorded.items():
+        path = os.path.join(root_dir, key)
+        if not os.path.exists(path):
+            return False
+        if not _same_stat(previous, file_stat(path)):
+            return False
+    return True
+
+
+class RunManifest:
+    """
+    Record of the raw files an ETL run consumed and the outputs it
+    produced, saved as JSON between runs.
+
+    Inputs are compared by size and modification time first, and by
+    content checksum only when those differ, so a file that was merely
+    touched still counts as unchanged. Outputs are checked by size and
+    modification time, to notice when they were deleted or rewritten
+    outside the pipeline.
+
+    Paths are stored relative to root_dir, so the manifest survives the
+    project being moved.
+
+    Args:
+        path (str): Path of the manifest file.
+        root_dir (str): Directory the recorded paths are relative to.
+    """
+
+    def __init__(self, path: str, root_dir: str):
+        self.path = path
+        self.root_dir = root_dir
+        self.inputs: Dict[str, Dict[str, Any]] = {}
+        self.outputs: Dict[str, Dict[str, Any]] = {}
+        self.last_run: Dict[str, Any] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.inputs = data.get("inputs", {})
+            self.outputs = data.get("outputs", {})
+            self.last_run = data.get("last_run", {})
+        self._fingerprints: Dict[str, Dict[str, Any]] = {}
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root_dir)
+
+    def diff_inputs(self, paths: Iterable[str]) -> InputChanges:
+        """
+        Compare raw files with the ones recorded by the last run.
+
+        Args:
+            paths: Raw files to process now.
+
+        Returns:
+            InputChanges: New, changed, removed and unchanged files.
+            Removed files are given as recorded in the manifest.
+        """
+        changes = InputChanges([], [], [], [])
+        current = set()
+        for path in paths:
+            key = self._key(path)
+            current.add(key)
+            previous = self.inputs.get(key)
+            fingerprint = file_fingerprint(path, previous)
+            self._fingerprints[key] = fingerprint
+            if previous is None:
+                changes.new.append(path)
+            elif fingerprint["sha256"] != previous.get("sha256"):
+                changes.changed.append(path)
+            else:
+                changes.unchanged.append(path)
+
+        changes.removed.extend(sorted(set(self.inputs) - current))
+        return changes
+
+    def outputs_intact(self) -> bool:
+        """True when every recorded output still has the same size and
+        modification time. False when nothing has been recorded yet."""
+        if not self.outputs:
+            return False
+        return files_intact(self.outputs, self.root_dir)
+
+    def record_run(
+        self,
+        inputs: Iterable[str],
+        outputs: Iterable[str],
+        **details: Any,
+    ) -> None:
+        """
+        Replace the recorded inputs and outputs and save the manifest.
+
+        Args:
+            inputs: Raw files the outputs now reflect.
+            outputs: Files produced from them.
+            **details: Extra information about the run, e.g. row counts.
+        """
+        self.inputs = {}
+        for path in inputs:
+            key = self._key(path)
+            self.inputs[key] = self._fingerprints.get(
+                key
+            ) or file_fingerprint(path)
+        self.outputs = {
+            self._key(path): file_fingerprint(path)
+            for path in outputs
+            if os.path.exists(path)
+        }
+        self.last_run = {
+            "finished": datetime.now(timezone.utc).isoformat(),
+            **details,
+        }
+        self.save()
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "inputs": self.inputs,
+                    "outputs": self.outputs,
+                    "last_run": self.last_run,
+                },
+                f,
+                indent=2,
+            )
+        # Replace in one step, so a crash never leaves half a manifest
+        os.replace(tmp_path, self.path)
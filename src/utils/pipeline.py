@@ -0,0 +1,182 @@
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar
+from src.utils.logging_utils import setup_logger
+
+# Reference: Python queue and threading
+# https://docs.python.org/3/library/queue.html
+# pandas, NumPy and pyarrow release the GIL for most of their I/O and
+# number crunching, so plain threads are enough to overlap stages.
+
+logger = setup_logger(__name__, "pipeline.log")
+
+T = TypeVar("T")
+
+# Items a stage may run ahead of the next one. Bounds the memory used by
+# chunks in flight: a stage blocks when its output queue is full.
+QUEUE_SIZE = 2
+
+# How often a blocked producer checks whether the consumer has stopped
+POLL_SECONDS = 0.1
+
+_DONE = object()
+
+
+class _Failure:
+    # Carries an exception from a worker thread to the consumer
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch(items: Iterable[T], maxsize: int = QUEUE_SIZE) -> Iterator[T]:
+    """
+    Produce items on a background thread, at most maxsize ahead of the
+    consumer.
+
+    Used to overlap reading the next chunk with processing the current
+    one. Errors raised while producing are re-raised by the consumer.
+    If the consumer stops early, the producer is stopped and closed.
+
+    Args:
+        items: Iterable to consume on the background thread, e.g. a
+            generator of CSV chunks.
+        maxsize (int): Number of items buffered ahead.
+
+    Yields:
+        The items, in order.
+
+    Raises:
+        ValueError: If maxsize is not positive.
+    """
+    if maxsize <= 0:
+        raise ValueError(f"maxsize must be positive, got {maxsize}")
+    buffer: queue.Queue = queue.Queue(maxsize)
+    stopped = threading.Event()
+
+    def put(item: Any) -> bool:
+        # Block while the buffer is full, unless the consumer stopped
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_Failure(e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name="prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        producer.join()
+
+
+class BackgroundWorker:
+    """
+    Runs tasks one at a time, in submission order, on a background
+    thread.
+
+    Used for I/O that the next step does not depend on, such as writing
+    a cleaned chunk to Parquet or CSV, so it overlaps with cleaning the
+    next chunk. submit() blocks once maxsize tasks are waiting, so
+    memory stays bounded when writing is slower than cleaning.
+
+    The first error raised by a task stops the worker and is re-raised
+    by the next submit() or by close().
+
+    Args:
+        maxsize (int): Number of tasks that may wait to run.
+        name (str): Name of the thread, for logs.
+    """
+
+    def __init__(self, maxsize: int = QUEUE_SIZE, name: str = "background"):
+        if maxsize <= 0:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+        self.name = name
+        self._tasks: queue.Queue = queue.Queue(maxsize)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run, name=name, daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> "BackgroundWorker":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # Already failing: skip queued tasks, keep the original error
+            self._drain()
+            self._stop()
+
+    def _run(self) -> None:
+        while True:
+            task = self._tasks.get()
+            if task is _DONE:
+                return
+            if self._error is not None:
+                continue
+            func, args, kwargs = task
+            try:
+                func(*args, **kwargs)
+            except BaseException as e:
+                logger.error(f"Task {func.__name__} on {self.name} failed")
+                self._error = e
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                self._tasks.get_nowait()
+            except queue.Empty:
+                return
+
+    def _stop(self) -> None:
+        self._tasks.put(_DONE)
+        self._thread.join()
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> None:
+        """
+        Queue func(*args, **kwargs), waiting while the queue is full.
+
+        Raises:
+            Exception: The error of an earlier task, if one failed.
+        """
+        self._raise_error()
+        self._tasks.put((func, args, kwargs))
+
+    def close(self) -> None:
+        """
+        Wait for every queued task to finish.
+
+        Raises:
+            Exception: The error of the first task that failed.
+        """
+        self._stop()
+        self._raise_error()
@@ -0,0 +1,67 @@
+import sys
+import pandas as pd
+import pytest
+import scripts.run_etl as run_etl
+import src.extract.extract_all as extract_all
+import src.transform.transform_all as transform_all
+
+
+@pytest.fixture
+def etl_dirs(tmp_path, monkeypatch, mocker):
+    raw_dir = tmp_path / "raw"
+    output_dir = tmp_path / "processed"
+    raw_dir.mkdir()
+    monkeypatch.setattr(extract_all, "RAW_DIR", str(raw_dir))
+    monkeypatch.setattr(transform_all, "OUTPUT_DIR", str(output_dir))
+    monkeypatch.setattr(sys, "argv", ["run_etl", "dev", "--incremental"])
+    mocker.patch("config.env_config.setup_env")
+    load = mocker.patch("src.load.load.load_data")
+    return raw_dir, output_dir, load
+
+
+def write_raw(path, first_id, rows):
+    pd.DataFrame(
+        {
+            "person_id": range(first_id, first_id + rows),
+            "age": [30 + i % 40 for i in range(rows)],
+            "income": [1000.0 * (i % 7) for i in range(rows)],
+            "smoker": ["Never", "Former", "Current"] * (rows // 3),
+        }
+    ).to_csv(path, index=False)
+
+
+def test_incremental_run_skips_unchanged_and_merges_new_files(etl_dirs):
+    raw_dir, output_dir, load = etl_dirs
+    write_raw(raw_dir / "medical_insurance_01.csv", 1, 30)
+
+    run_etl.main()
+    assert load.call_count == 1
+    cleaned = pd.read_parquet(output_dir / "cleaned_customers.parquet")
+    assert len(cleaned) == 30
+
+    # Nothing changed: no extract, transform or load
+    run_etl.main()
+    assert load.call_count == 1
+
+    # A new drop is processed alone and merged into the outputs
+    write_raw(raw_dir / "medical_insurance_02.csv", 31, 15)
+    run_etl.main()
+    assert load.call_count == 2
+    cleaned = pd.read_parquet(output_dir / "cleaned_customers.parquet")
+    assert sorted(cleaned["person_id"]) == list(range(1, 46))
+
+    expected = transform_all.CorrelationAccumulator(
+        ["person_id", "age", "income", "smoker"]
+    ).update(cleaned).correlation()
+    correlation_table = load.call_args.args[0].set_index("feature")
+    pd.testing.assert_frame_equal(
+        correlation_table.loc[expected.index, expected.columns],
+        expected,
+        check_names=False,
+    )
+
+    # A removed drop forces a rebuild from the remaining files
+    (raw_dir / "medical_insurance_01.csv").unlink()
+    run_etl.main()
+    cleaned = pd.read_parquet(output_dir / "cleaned_customers.parquet")
+    assert sorted(cleaned["person_id"]) == list(range(31, 46))
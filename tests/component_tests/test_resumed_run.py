@@ -0,0 +1,95 @@
+import sys
+import pandas as pd
+import pytest
+import scripts.run_etl as run_etl
+import src.extract.extract as extract_module
+import src.extract.extract_all as extract_all
+import src.transform.transform as transform_module
+import src.transform.transform_all as transform_all
+
+
+@pytest.fixture
+def etl_run(tmp_path, monkeypatch, mocker):
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    pd.DataFrame(
+        {
+            "person_id": range(1, 31),
+            "age": [30 + i % 40 for i in range(30)],
+            "smoker": ["Never", "Former", "Current"] * 10,
+        }
+    ).to_csv(raw_dir / "medical_insurance.csv", index=False)
+    monkeypatch.setattr(extract_all, "RAW_DIR", str(raw_dir))
+    monkeypatch.setattr(transform_all, "OUTPUT_DIR", str(tmp_path / "out"))
+    monkeypatch.setattr(run_etl, "STAGE_CACHE_DIR", str(tmp_path / "cache"))
+    mocker.patch("config.env_config.setup_env")
+
+    def run(*options):
+        monkeypatch.setattr(sys, "argv", ["run_etl", "dev", *options])
+        run_etl.main()
+
+    return run
+
+
+def test_failed_load_resumes_without_extract_or_transform(etl_run, mocker):
+    extract = mocker.spy(extract_module, "extract_data")
+    transform = mocker.spy(transform_module, "transform_data")
+    load = mocker.patch(
+        "src.load.load.load_data", side_effect=ConnectionError("down")
+    )
+    with pytest.raises(SystemExit):
+        etl_run()
+    assert (extract.call_count, transform.call_count) == (1, 1)
+
+    load.side_effect = None
+    etl_run()
+
+    assert (extract.call_count, transform.call_count) == (1, 1)
+    assert load.call_count == 2
+    correlation_table, cleaned_customers = load.call_args.args
+    assert len(cleaned_customers) == 30
+    assert "feature" in correlation_table.columns
+
+    # Up to date: only the load (never cached) runs; --force transform
+    # reruns the transform
+    etl_run()
+    assert (extract.call_count, transform.call_count) == (1, 1)
+    assert load.call_count == 3
+    etl_run("--force", "transform")
+    assert (extract.call_count, transform.call_count) == (2, 2)
+    assert load.call_count == 4
+
+
+def test_deleted_output_reruns_transform(etl_run, tmp_path, mocker):
+    transform = mocker.spy(transform_module, "transform_data")
+    mocker.patch("src.load.load.load_data")
+    etl_run()
+    cleaned = tmp_path / "out" / transform_all.FILE_NAME_CLEAN_CUSTOMERS
+    assert cleaned.exists()
+
+    cleaned.unlink()
+    etl_run()
+
+    assert transform.call_count == 2
+    assert cleaned.exists()
+
+
+def test_force_only_accepts_stages_of_the_active_mode(capsys):
+    args = run_etl.parse_args(["run_etl", "dev", "--force", "transform"])
+    assert args.force == ["transform"]
+    args = run_etl.parse_args(
+        ["run_etl", "dev", "--chunk-size", "10", "--force", "load"]
+    )
+    assert args.force == ["load"]
+
+    with pytest.raises(SystemExit):
+        run_etl.parse_args(
+            ["run_etl", "dev", "--force", "extract_and_transform"]
+        )
+    with pytest.raises(SystemExit):
+        run_etl.parse_args(
+            ["run_etl", "dev", "--chunk-size", "10", "--force", "transform"]
+        )
+    assert "choose from extract_and_transform, load" in (
+        capsys.readouterr().err
+    )
@@ -0,0 +1,10 @@
+import pytest
+from src.utils.db_utils import dispose_db_engines
+
+
+@pytest.fixture(autouse=True)
+def fresh_engine_registry():
+    """Start every test without cached database engines."""
+    dispose_db_engines()
+    yield
+    dispose_db_engines()
@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import Float, String
+from src.load.bulk_copy import build_copy_statement, copy_dataframe_to_table
+
+
+@pytest.fixture
+def mock_connection():
+    connection = MagicMock()
+    connection.dialect = postgresql.dialect()
+    return connection
+
+
+@pytest.fixture
+def correlation_frame():
+    return pd.DataFrame(
+        {
+            "feature": ["age", "income", "bmi"],
+            "age": [1.0, 0.25, None],
+            "income": [0.25, 1.0, 0.5],
+        }
+    )
+
+
+def test_build_copy_statement_quotes_identifiers(mock_connection):
+    sql = build_copy_statement(
+        mock_connection, ["feature", "Age"], "rp_table", "all_2509"
+    )
+
+    assert sql == (
+        'COPY all_2509.rp_table (feature, "Age") '
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+
+
+def test_copy_dataframe_sends_one_copy_per_batch(
+    mocker, mock_connection, correlation_frame
+):
+    mock_to_sql = mocker.patch.object(pd.DataFrame, "to_sql")
+    cursor = mock_connection.connection.cursor.return_value
+    payloads = []
+    cursor.copy_expert.side_effect = lambda sql, buf: payloads.append(
+        buf.read()
+    )
+    dtype = {"feature": String(50), "age": Float(), "income": Float()}
+
+    copy_dataframe_to_table(
+        mock_connection,
+        correlation_frame,
+        "rp_table",
+        "all_2509",
+        dtype=dtype,
+        if_exists="replace",
+        batch_size=2,
+    )
+
+    # Table created from the empty frame with the same dtype mapping
+    mock_to_sql.assert_called_once_with(
+        "rp_table",
+        mock_connection,
+        schema="all_2509",
+        if_exists="replace",
+        dtype=dtype,
+        index=False,
+    )
+    assert payloads == ["age,1.0,0.25\nincome,0.25,1.0\n", "bmi,,0.5\n"]
+    cursor.close.assert_called_once()
+    mock_connection.commit.assert_called_once()
+
+
+def test_copy_dataframe_rejects_invalid_batch_size(
+    mock_connection, correlation_frame
+):
+    with pytest.raises(ValueError, match="batch_size must be positive"):
+        copy_dataframe_to_table(
+            mock_connection,
+            correlation_frame,
+            "rp_table",
+            "all_2509",
+            batch_size=0,
+        )
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.transform.correlation_engine import (
+    average_ranks,
+    correlation_matrix,
+    iter_blocks,
+    rank_columns,
+)
+
+
+@pytest.fixture
+def numeric_customers():
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame(
+        {
+            "age": rng.integers(18, 90, 600),
+            "income": rng.normal(50000, 15000, 600),
+            "bmi": np.round(rng.normal(27, 5, 600), 1),
+            "smoker": rng.choice([0, 7, 30], 600),
+        }
+    )
+    df["annual_premium"] = df["age"] * 40 + rng.normal(0, 300, 600)
+    df["region"] = "North"
+    return df
+
+
+@pytest.fixture
+def with_missing(numeric_customers):
+    df = numeric_customers.copy()
+    df.loc[[3, 10, 50, 400], "bmi"] = np.nan
+    df.loc[[10, 99], "income"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_correlation_matches_pandas(numeric_customers, method):
+    result = correlation_matrix(numeric_customers, method=method)
+
+    expected = numeric_customers.select_dtypes("number").corr(method=method)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_pairwise_missing_values_match_pandas(with_missing, method):
+    result = correlation_matrix(with_missing, method=method, block_rows=128)
+
+    expected = with_missing.select_dtypes("number").corr(method=method)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_complete_rows_only(with_missing):
+    columns = ["age", "income", "bmi"]
+
+    result = correlation_matrix(with_missing, columns, missing="complete")
+
+    pd.testing.assert_frame_equal(
+        result, with_missing[columns].dropna().corr()
+    )
+
+
+def test_float32_products_are_close(with_missing):
+    result = correlation_matrix(with_missing, dtype=np.float32)
+
+    expected = with_missing.select_dtypes("number").corr()
+    np.testing.assert_allclose(result, expected, atol=1e-5)
+
+
+def test_chunks_give_the_same_pearson_correlation(with_missing):
+    chunks = iter_blocks(with_missing, 97)
+
+    result = correlation_matrix(chunks)
+
+    pd.testing.assert_frame_equal(
+        result, with_missing.select_dtypes("number").corr()
+    )
+
+
+def test_invalid_options_are_rejected(numeric_customers):
+    with pytest.raises(ValueError):
+        correlation_matrix(numeric_customers, method="kendall")
+    with pytest.raises(ValueError):
+        correlation_matrix(numeric_customers, missing="drop")
+    with pytest.raises(ValueError):
+        correlation_matrix(numeric_customers, block_rows=0)
+    with pytest.raises(ValueError):
+        correlation_matrix(
+            iter_blocks(numeric_customers, 100), method="spearman"
+        )
+    with pytest.raises(ValueError):
+        correlation_matrix(iter([]))
+
+
+def test_ranks_match_pandas(with_missing):
+    values = np.array([[3.0, 1.0], [1.0, 1.0], [3.0, 2.0], [2.0, 1.0]])
+
+    assert average_ranks(values).tolist() == [
+        [3.5, 2.0],
+        [1.0, 2.0],
+        [3.5, 4.0],
+        [2.0, 2.0],
+    ]
+    numeric = with_missing.select_dtypes("number")
+    pd.testing.assert_frame_equal(rank_columns(numeric), numeric.rank())
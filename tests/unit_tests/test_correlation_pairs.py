@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+from src.load.load_correlation import (
+    PAIRS_TABLE,
+    TOP_TABLE,
+    load_correlation_pairs,
+)
+from src.load.versioned_load import content_run_id
+from src.transform.correlation_pairs import (
+    PAIR_COLUMNS,
+    correlation_pairs,
+    top_neighbours,
+)
+
+
+@pytest.fixture
+def correlation_table():
+    return pd.DataFrame(
+        {
+            "feature": ["age", "bmi", "income", "smoker"],
+            "age": [1.0, 0.2, -0.6, np.nan],
+            "bmi": [0.2, 1.0, 0.2, np.nan],
+            "income": [-0.6, 0.2, 1.0, np.nan],
+            "smoker": [np.nan, np.nan, np.nan, np.nan],
+        }
+    )
+
+
+def test_pairs_are_ranked_by_strength_per_feature(correlation_table):
+    pairs = correlation_pairs(correlation_table)
+
+    assert list(pairs.columns) == PAIR_COLUMNS
+    # Every ordered pair of different features
+    assert len(pairs) == 4 * 3
+    age = pairs[pairs["feature_a"] == "age"]
+    assert age["feature_b"].tolist() == ["income", "bmi", "smoker"]
+    assert age["rank"].tolist() == [1, 2, 3]
+    assert age["r"].iloc[0] == -0.6
+    assert age["abs_r"].iloc[0] == 0.6
+    # Ties are ranked by name
+    bmi = pairs[pairs["feature_a"] == "bmi"]
+    assert bmi["feature_b"].tolist() == ["age", "income", "smoker"]
+
+
+def test_pairs_match_the_matrix(correlation_table):
+    matrix = correlation_table.set_index("feature")
+
+    pairs = correlation_pairs(matrix)
+
+    for row in pairs.itertuples():
+        expected = matrix.loc[row.feature_a, row.feature_b]
+        assert row.r == expected or (np.isnan(row.r) and np.isnan(expected))
+
+
+def test_top_neighbours(correlation_table):
+    pairs = correlation_pairs(correlation_table)
+
+    top = top_neighbours(pairs, k=1)
+
+    assert top["feature_a"].tolist() == ["age", "bmi", "income", "smoker"]
+    assert top["feature_b"].tolist() == ["income", "age", "age", "age"]
+    with pytest.raises(ValueError):
+        top_neighbours(pairs, k=0)
+
+
+def test_load_correlation_pairs_loads_both_tables_with_indexes(
+    mocker, correlation_table
+):
+    mocker.patch(
+        "src.load.load_correlation.load_db_config",
+        return_value={"target_database": {"dbname": "db"}},
+    )
+    mocker.patch(
+        "src.load.load_correlation.load_pool_config", return_value={}
+    )
+    mocker.patch("src.load.load_correlation.log_table_action")
+
+    @contextmanager
+    def fake_connection(details, **pool):
+        yield MagicMock()
+
+    mocker.patch(
+        "src.load.load_correlation.db_connection", side_effect=fake_connection
+    )
+    mock_load = mocker.patch("src.load.load_correlation.load_versioned")
+
+    load_correlation_pairs(correlation_table, k=2)
+
+    loaded = {call.args[2]: call for call in mock_load.call_args_list}
+    assert list(loaded) == [PAIRS_TABLE, TOP_TABLE]
+    assert len(loaded[PAIRS_TABLE].args[1]) == 12
+    assert len(loaded[TOP_TABLE].args[1]) == 8
+    assert {call.kwargs["run_id"] for call in loaded.values()} == {
+        content_run_id(correlation_table)
+    }
+    assert loaded[TOP_TABLE].kwargs["indexes"] == {
+        f"{TOP_TABLE}_feature_rank": ["feature_a", "rank"],
+        f"{TOP_TABLE}_feature_pair": ["feature_a", "feature_b"],
+    }
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.transform.correlation_stats import CorrelationAccumulator
+
+
+@pytest.fixture
+def numeric_customers():
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame(
+        {
+            "age": rng.integers(18, 90, 500),
+            "income": rng.normal(50000, 15000, 500),
+            "bmi": rng.normal(27, 5, 500),
+        }
+    )
+    df["annual_premium"] = df["age"] * 40 + rng.normal(0, 300, 500)
+    return df
+
+
+def test_accumulated_correlation_matches_pandas(numeric_customers):
+    accumulator = CorrelationAccumulator(numeric_customers.columns)
+
+    # Feed the data in uneven chunks
+    for start in range(0, len(numeric_customers), 73):
+        accumulator.update(numeric_customers.iloc[start:start + 73])
+
+    result = accumulator.correlation()
+
+    assert accumulator.rows == len(numeric_customers)
+    pd.testing.assert_frame_equal(result, numeric_customers.corr())
+
+
+def test_missing_values_use_pairwise_complete_rows(numeric_customers):
+    with_missing = numeric_customers.copy()
+    with_missing.loc[[3, 10, 50], "bmi"] = np.nan
+    with_missing.loc[[10, 99], "income"] = np.nan
+
+    accumulator = CorrelationAccumulator(with_missing.columns)
+    for start in range(0, len(with_missing), 100):
+        accumulator.update(with_missing.iloc[start:start + 100])
+
+    assert accumulator.rows == len(with_missing)
+    assert accumulator.counts[1, 2] == len(with_missing) - 4
+    pd.testing.assert_frame_equal(
+        accumulator.correlation(), with_missing.corr()
+    )
+
+
+def test_merged_accumulators_match_single_pass(numeric_customers):
+    first = CorrelationAccumulator(numeric_customers.columns)
+    first.update(numeric_customers.iloc[:200])
+    second = CorrelationAccumulator(numeric_customers.columns)
+    second.update(numeric_customers.iloc[200:] * 1.0)
+
+    merged = CorrelationAccumulator(numeric_customers.columns)
+    merged.merge(first).merge(second)
+
+    assert merged.rows == len(numeric_customers)
+    pd.testing.assert_frame_equal(
+        merged.correlation(), numeric_customers.corr()
+    )
+
+
+def test_merge_rejects_different_columns(numeric_customers):
+    accumulator = CorrelationAccumulator(["age", "bmi"])
+
+    with pytest.raises(ValueError, match="different columns"):
+        accumulator.merge(CorrelationAccumulator(["age", "income"]))
+
+
+def test_save_and_load_round_trip(tmp_path, numeric_customers):
+    accumulator = CorrelationAccumulator(numeric_customers.columns)
+    accumulator.update(numeric_customers.iloc[:300])
+    path = tmp_path / "stats.npz"
+
+    accumulator.save(str(path))
+    restored = CorrelationAccumulator.load(str(path))
+    restored.update(numeric_customers.iloc[300:])
+
+    assert restored.columns == list(numeric_customers.columns)
+    assert restored.rows == len(numeric_customers)
+    pd.testing.assert_frame_equal(
+        restored.correlation(), numeric_customers.corr()
+    )
+
+
+def test_constant_column_has_no_correlation():
+    df = pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [5.0, 5.0, 5.0]})
+
+    result = CorrelationAccumulator(df.columns).update(df).correlation()
+
+    assert result.loc["a", "a"] == 1.0
+    assert result["b"].isna().all()
@@ -0,0 +1,210 @@
+import pytest
+from src.utils.dag import Stage, StageCache, run_dag, topological_order
+
+
+@pytest.fixture
+def raw_file(tmp_path):
+    path = tmp_path / "raw.csv"
+    path.write_text("a,b\n1,2\n")
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return StageCache(str(tmp_path / "cache"))
+
+
+def make_stages(calls, raw_file, fail_load=False, config=None):
+    def record(name, value):
+        calls.append(name)
+        return value
+
+    def load(transformed):
+        calls.append("load")
+        if fail_load:
+            raise ConnectionError("database down")
+        return None
+
+    return [
+        Stage("load", load, deps=["transform"]),
+        Stage(
+            "transform",
+            lambda data: record("transform", data * 2),
+            deps=["extract"],
+            config=config,
+        ),
+        Stage(
+            "extract",
+            lambda: record("extract", len(raw_file.read_text())),
+            inputs=lambda: [str(raw_file)],
+            cache=False,
+        ),
+    ]
+
+
+def test_topological_order_puts_dependencies_first(raw_file):
+    stages = make_stages([], raw_file)
+
+    order = [stage.name for stage in topological_order(stages)]
+
+    assert order == ["extract", "transform", "load"]
+
+
+def test_topological_order_rejects_cycles_and_unknown_deps():
+    with pytest.raises(ValueError, match="cycle"):
+        topological_order(
+            [
+                Stage("a", lambda b: b, deps=["b"]),
+                Stage("b", lambda a: a, deps=["a"]),
+            ]
+        )
+    with pytest.raises(ValueError, match="unknown"):
+        topological_order([Stage("a", lambda b: b, deps=["b"])])
+
+
+def test_up_to_date_stages_are_skipped(raw_file, cache):
+    calls = []
+    run_dag(make_stages(calls, raw_file), cache)
+    calls.clear()
+
+    outputs = run_dag(make_stages(calls, raw_file), cache)
+
+    assert calls == []
+    assert outputs == {"load": None}
+
+
+def test_rerun_resumes_from_failed_stage(raw_file, cache):
+    calls = []
+    with pytest.raises(ConnectionError):
+        run_dag(make_stages(calls, raw_file, fail_load=True), cache)
+    assert calls == ["extract", "transform", "load"]
+    calls.clear()
+
+    run_dag(make_stages(calls, raw_file), cache)
+
+    # extract is not cached, but transform is, so extract is not needed
+    assert calls == ["load"]
+
+
+def test_changed_input_or_config_reruns_stages(raw_file, cache):
+    calls = []
+    run_dag(make_stages(calls, raw_file), cache)
+
+    calls.clear()
+    run_dag(make_stages(calls, raw_file, config={"export_csv": True}), cache)
+    assert calls == ["extract", "transform", "load"]
+
+    calls.clear()
+    raw_file.write_text("a,b\n1,2\n3,4\n")
+    outputs = run_dag(
+        make_stages(calls, raw_file, config={"export_csv": True}), cache
+    )
+    assert calls == ["extract", "transform", "load"]
+    assert outputs["transform"] == 2 * len("a,b\n1,2\n3,4\n")
+
+
+def test_force_reruns_stage_and_dependents(raw_file, cache):
+    calls = []
+    run_dag(make_stages(calls, raw_file), cache)
+
+    calls.clear()
+    run_dag(make_stages(calls, raw_file), cache, force=["load"])
+    assert calls == ["load"]
+
+    calls.clear()
+    run_dag(make_stages(calls, raw_file), cache, force=["transform"])
+    assert calls == ["extract", "transform", "load"]
+
+
+def test_force_rejects_unknown_stage(raw_file, cache):
+    with pytest.raises(ValueError, match="Unknown stage"):
+        run_dag(make_stages([], raw_file), cache, force=["publish"])
+
+
+def test_without_cache_every_stage_runs(raw_file):
+    calls = []
+    run_dag(make_stages(calls, raw_file))
+    run_dag(make_stages(calls, raw_file))
+
+    assert calls == ["extract", "transform", "load"] * 2
+
+
+def test_cache_keeps_only_the_newest_output(raw_file, cache, tmp_path):
+    run_dag(make_stages([], raw_file), cache)
+    raw_file.write_text("changed\n")
+    run_dag(make_stages([], raw_file), cache)
+
+    cached = sorted(
+        path.name.split(".")[0] for path in (tmp_path / "cache").glob("*.pkl")
+    )
+    assert cached == ["load", "transform"]
+
+
+def test_deleted_or_rewritten_outputs_rerun_the_stage(
+    raw_file, cache, tmp_path
+):
+    written = tmp_path / "cleaned.parquet"
+    calls = []
+
+    def stages():
+        def transform(data):
+            calls.append("transform")
+            written.write_text(f"{data} rows")
+            return data
+
+        return [
+            Stage("extract", lambda: 1, cache=False),
+            Stage(
+                "transform",
+                transform,
+                deps=["extract"],
+                outputs=lambda: [str(written)],
+            ),
+        ]
+
+    run_dag(stages(), cache)
+    run_dag(stages(), cache)
+    assert calls == ["transform"]
+
+    written.unlink()
+    run_dag(stages(), cache)
+    assert calls == ["transform"] * 2
+    assert written.exists()
+
+    written.write_text("rewritten by hand, longer")
+    run_dag(stages(), cache)
+    assert calls == ["transform"] * 3
+
+
+def test_stage_can_store_part_of_its_output(cache, tmp_path):
+    written = tmp_path / "customers.txt"
+    calls = []
+
+    def transform():
+        calls.append("transform")
+        written.write_text("many customers")
+        return ("many customers", "small table")
+
+    def stages(loads):
+        return [
+            Stage(
+                "transform",
+                transform,
+                outputs=lambda: [str(written)],
+                to_cache=lambda output: output[1],
+                from_cache=lambda table: (written.read_text(), table),
+            ),
+            Stage("load", loads.append, deps=["transform"], cache=False),
+        ]
+
+    loads = []
+    run_dag(stages(loads), cache)
+    assert cache.load("transform", cache.key(stages([])[0], [])) == (
+        "small table"
+    )
+
+    outputs = run_dag(stages(loads), cache)
+
+    assert calls == ["transform"]
+    assert loads == [("many customers", "small table")] * 2
+    assert outputs["transform"] == ("many customers", "small table")
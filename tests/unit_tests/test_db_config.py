@@ -1,6 +1,10 @@
 import os
 import pytest
-from config.db_config import load_db_config, DatabaseConfigError
+from config.db_config import (
+    load_db_config,
+    load_pool_config,
+    DatabaseConfigError,
+)
 
 
 def test_load_db_config(mocker):
@@ -97,3 +101,30 @@ def test_load_db_config_missing_env_var_errors(mocker, env_var):
         f"Configuration error: source_database {config_key} is set to 'error'"
     )):
         load_db_config()
+
+
+def test_load_pool_config_defaults(mocker):
+    mocker.patch.dict(os.environ, {}, clear=True)
+
+    assert load_pool_config() == {
+        'pool_size': 5,
+        'max_overflow': 10,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
+
+
+def test_load_pool_config_from_env(mocker):
+    mocker.patch.dict(os.environ, {
+        'DB_POOL_SIZE': '2',
+        'DB_MAX_OVERFLOW': '0',
+        'DB_POOL_PRE_PING': 'false',
+        'DB_POOL_RECYCLE': '60',
+    })
+
+    assert load_pool_config() == {
+        'pool_size': 2,
+        'max_overflow': 0,
+        'pool_pre_ping': False,
+        'pool_recycle': 60,
+    }
@@ -0,0 +1,13 @@
+import pytest
+from unittest.mock import MagicMock
+from src.utils.db_table_check import log_table_action
+
+
+@pytest.mark.parametrize("exists", [True, False])
+def test_log_table_action_checks_catalog_once(mocker, exists):
+    inspector = MagicMock()
+    inspector.has_table.return_value = exists
+    mocker.patch("src.utils.db_table_check.sq.inspect", return_value=inspector)
+
+    assert log_table_action(MagicMock(), "rp_table", "all_2509") is exists
+    inspector.has_table.assert_called_once_with("rp_table", schema="all_2509")
@@ -3,8 +3,11 @@ from unittest.mock import MagicMock
 from sqlalchemy.exc import ArgumentError, OperationalError, SQLAlchemyError
 from src.utils.db_utils import (
     create_db_engine,
+    db_connection,
     DatabaseConnectionError,
+    dispose_db_engines,
     get_db_connection,
+    get_db_engine,
 )
 
 
@@ -224,3 +227,78 @@ def test_get_db_connection_generic_exception(
         get_db_connection(test_connection_parameters)
 
     assert "An error occurred: Unexpected error" in str(excinfo.value)
+
+
+def test_get_db_engine_reuses_engine_for_same_parameters(
+    mocker, test_connection_parameters
+):
+    mock_create = mocker.patch(
+        "src.utils.db_utils.create_db_engine", return_value=MagicMock()
+    )
+
+    first = get_db_engine(test_connection_parameters, pool_size=2)
+    second = get_db_engine(dict(test_connection_parameters))
+
+    assert first is second
+    mock_create.assert_called_once_with(
+        test_connection_parameters, pool_size=2
+    )
+
+
+def test_get_db_engine_separate_engine_per_target(
+    mocker, test_connection_parameters
+):
+    mocker.patch(
+        "src.utils.db_utils.create_db_engine",
+        side_effect=lambda params: MagicMock(),
+    )
+    other_target = {**test_connection_parameters, "dbname": "other_db"}
+
+    assert get_db_engine(test_connection_parameters) is not get_db_engine(
+        other_target
+    )
+
+
+def test_create_db_engine_passes_pool_options(
+    mocker, mock_logger, test_connection_parameters
+):
+    mock_create_engine = mocker.patch("src.utils.db_utils.create_engine")
+
+    create_db_engine(
+        test_connection_parameters, pool_size=3, pool_pre_ping=True
+    )
+
+    kwargs = mock_create_engine.call_args.kwargs
+    assert kwargs["pool_size"] == 3
+    assert kwargs["pool_pre_ping"] is True
+
+
+def test_dispose_db_engines_disposes_and_clears(
+    mocker, test_connection_parameters
+):
+    mock_engine = MagicMock()
+    mocker.patch(
+        "src.utils.db_utils.create_db_engine", return_value=mock_engine
+    )
+    get_db_engine(test_connection_parameters)
+
+    dispose_db_engines()
+
+    mock_engine.dispose.assert_called_once()
+    assert get_db_engine(test_connection_parameters) is mock_engine
+
+
+def test_db_connection_closes_connection_on_error(
+    mocker, test_connection_parameters
+):
+    mock_engine = MagicMock()
+    mocker.patch(
+        "src.utils.db_utils.create_db_engine", return_value=mock_engine
+    )
+
+    with pytest.raises(RuntimeError):
+        with db_connection(test_connection_parameters) as connection:
+            raise RuntimeError("query failed")
+
+    assert connection is mock_engine.connect.return_value
+    connection.close.assert_called_once()
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+from src.streamlit.density import (
+    density_grid,
+    scatter_or_density,
+    sparse_points,
+)
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    x = np.round(rng.normal(27, 5, 5000), 1)
+    y = np.round(rng.gamma(2, 2500, 5000), 2)
+    return x, y
+
+
+def test_density_grid_matches_histogram2d(points):
+    x, y = points
+
+    grid = density_grid(x, y, bins=(40, 30))
+
+    expected, _, _ = np.histogram2d(
+        x, y, bins=(grid.x_edges, grid.y_edges)
+    )
+    np.testing.assert_array_equal(grid.counts, expected)
+    assert grid.counts.sum() == len(x)
+    assert (grid.x_edges[0], grid.x_edges[-1]) == (x.min(), x.max())
+
+
+def test_density_grid_skips_missing_and_out_of_range_points():
+    x = np.array([0.0, 1.0, np.nan, 5.0, 10.0])
+    y = np.array([0.0, 1.0, 1.0, np.nan, 1.0])
+
+    grid = density_grid(x, y, bins=(2, 2), x_range=(0, 2))
+
+    assert grid.counts.tolist() == [[1, 0], [0, 1]]
+    with pytest.raises(ValueError):
+        density_grid(x, y[:2])
+    with pytest.raises(ValueError):
+        density_grid(x, y, x_range=(20, 30))
+
+
+def test_sparse_points_are_those_of_nearly_empty_cells():
+    x = np.array([0.0] * 10 + [9.5, np.nan])
+    y = np.array([0.0] * 10 + [9.5, 1.0])
+    grid = density_grid(x, y, bins=(10, 10))
+
+    outlier_x, outlier_y = sparse_points(x, y, grid, max_count=2)
+
+    assert outlier_x.tolist() == [9.5]
+    assert outlier_y.tolist() == [9.5]
+
+
+def test_scatter_or_density_switches_at_the_point_limit(points):
+    x, y = points
+    axes = Figure().subplots(1, 3)
+
+    assert scatter_or_density(axes[0], x, y) == "scatter"
+    assert len(axes[0].collections) == 1
+
+    assert scatter_or_density(axes[1], x, y, point_limit=1000) == "density"
+    assert len(axes[1].images) == 1
+    # The outliers are drawn on top of the image
+    assert len(axes[1].collections) == 1
+
+    scatter_or_density(axes[2], x, y, point_limit=1000, show_outliers=False)
+    assert len(axes[2].collections) == 0
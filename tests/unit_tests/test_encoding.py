@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.transform.encoding import encode_categoricals
+
+ENCODINGS = {
+    "smoker": {
+        "categories": ["Never", "Former", "Current"],
+        "codes": [0, 7, 30],
+        "default": None,
+        "dtype": "int8",
+    },
+    "alcohol_freq": {
+        "categories": ["Occasional", "Weekly", "Daily"],
+        "codes": [2, 7, 30],
+        "default": 0,
+        "dtype": "int8",
+    },
+}
+
+
+@pytest.mark.parametrize("dtype", ["object", "category"])
+def test_encode_categoricals_maps_labels_and_defaults(dtype):
+    customers = pd.DataFrame(
+        {
+            "smoker": ["Never", "Current", "Former", "Never"],
+            "alcohol_freq": ["Daily", np.nan, "Occasional", "Weekly"],
+            "region": ["North", "South", "East", "West"],
+        }
+    ).astype(dtype)
+
+    result = encode_categoricals(customers, ENCODINGS)
+
+    assert result["smoker"].tolist() == [0, 30, 7, 0]
+    assert result["alcohol_freq"].tolist() == [30, 0, 2, 7]
+    assert result["smoker"].dtype == "int8"
+    # Columns without an encoding are left alone
+    assert result["region"].dtype == dtype
+
+
+def test_encode_categoricals_rejects_unknown_labels():
+    customers = pd.DataFrame({"smoker": ["Never", "Sometimes"]})
+
+    with pytest.raises(ValueError, match="Unexpected values.*Sometimes"):
+        encode_categoricals(customers, ENCODINGS)
+
+
+def test_encode_categoricals_rejects_missing_without_default():
+    customers = pd.DataFrame({"smoker": ["Never", None]})
+
+    with pytest.raises(ValueError, match="no default"):
+        encode_categoricals(customers, ENCODINGS)
+
+
+def test_encode_categoricals_default_table_covers_existing_maps():
+    customers = pd.DataFrame(
+        {
+            "alcohol_freq": [None, "Weekly"],
+            "smoker": ["Former", "Current"],
+            "education": ["No HS", "Doctorate"],
+        }
+    )
+
+    result = encode_categoricals(customers)
+
+    assert result.to_dict("list") == {
+        "alcohol_freq": [0, 7],
+        "smoker": [7, 30],
+        "education": [0, 5],
+    }
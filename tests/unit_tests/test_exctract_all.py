@@ -2,6 +2,7 @@ import pandas as pd
 import pytest
 from src.extract.extract_all import (
     extract_all,
+    extract_all_chunks,
     TYPE,
     FILE_PATH,
     EXPECTED_PERFORMANCE,
@@ -66,3 +67,102 @@ def test_log_extract_all_error(mocker, mock_logger):
     mock_logger.error.assert_called_once_with(
         f"Error loading {FILE_PATH}: Exception message"
     )
+
+
+def test_extract_all_chunks_yields_chunks_and_logs_once(
+    mocker, mock_log_extract_success, mock_logger
+):
+    chunks = [
+        pd.DataFrame({"id": [1, 2], "name": ["Rokas", "Rokas1"]}),
+        pd.DataFrame({"id": [3], "name": ["Rokas2"]}),
+    ]
+    mock_reader = mocker.MagicMock()
+    mock_reader.__enter__.return_value = mock_reader
+    mock_reader.__next__.side_effect = chunks + [StopIteration()]
+    mocker.patch(
+        "src.extract.extract_all.pd.read_csv", return_value=mock_reader
+    )
+
+    result = list(extract_all_chunks(chunk_size=2))
+
+    assert [len(chunk) for chunk in result] == [2, 1]
+    mock_log_extract_success.assert_called_once()
+    assert mock_log_extract_success.call_args.args[2] == (3, 2)
+
+
+def test_extract_all_chunks_error(mocker, mock_logger):
+    mocker.patch(
+        "src.extract.extract_all.pd.read_csv",
+        side_effect=Exception("Exception message"),
+    )
+
+    with pytest.raises(Exception) as exc_info:
+        list(extract_all_chunks())
+
+    assert str(exc_info.value) == f"Failed to load CSV file: {FILE_PATH}"
+
+
+@pytest.fixture
+def raw_dir(tmp_path, mocker):
+    mocker.patch("src.extract.extract_all.RAW_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_extract_all_reads_every_matching_file(raw_dir, mock_logger):
+    pd.DataFrame({"person_id": [1, 2], "region": ["North", "South"]}).to_csv(
+        raw_dir / "medical_insurance_2025_01.csv", index=False
+    )
+    pd.DataFrame({"person_id": [3], "region": ["East"]}).to_csv(
+        raw_dir / "medical_insurance_2025_02.csv", index=False
+    )
+    pd.DataFrame({"person_id": [9]}).to_csv(
+        raw_dir / "other.csv", index=False
+    )
+
+    df = extract_all(max_workers=2)
+
+    assert df["person_id"].tolist() == [1, 2, 3]
+    assert isinstance(df["region"].dtype, pd.CategoricalDtype)
+    assert df["region"].tolist() == ["North", "South", "East"]
+
+
+def test_extract_all_inconsistent_schema(raw_dir, mock_logger):
+    pd.DataFrame({"person_id": [1], "region": ["North"]}).to_csv(
+        raw_dir / "medical_insurance_a.csv", index=False
+    )
+    pd.DataFrame({"person_id": [2], "sex": ["Male"]}).to_csv(
+        raw_dir / "medical_insurance_b.csv", index=False
+    )
+
+    with pytest.raises(Exception) as exc_info:
+        extract_all(max_workers=2)
+
+    assert "Inconsistent schema" in str(exc_info.value)
+
+
+def test_extract_all_chunks_streams_every_file(raw_dir, mock_logger):
+    for name, ids in [("a", [1, 2, 3]), ("b", [4, 5])]:
+        pd.DataFrame({"person_id": ids}).to_csv(
+            raw_dir / f"medical_insurance_{name}.csv", index=False
+        )
+
+    result = list(extract_all_chunks(chunk_size=2))
+
+    assert [chunk["person_id"].tolist() for chunk in result] == [
+        [1, 2],
+        [3],
+        [4, 5],
+    ]
+
+
+def test_extract_all_logs_memory_before_and_after_schema(
+    raw_dir, mock_logger
+):
+    pd.DataFrame({"person_id": [1, 2], "region": ["North", "South"]}).to_csv(
+        raw_dir / "medical_insurance.csv", index=False
+    )
+
+    extract_all()
+
+    messages = [call.args[0] for call in mock_logger.info.call_args_list]
+    assert any("MB before schema" in message for message in messages)
@@ -1,6 +1,7 @@
 import pandas as pd
 import pytest
 from unittest.mock import patch
+from config.schema_config import CUSTOMER_DTYPES
 from src.extract.extract import extract_data
 
 
@@ -11,7 +12,7 @@ def normalise_nulls(df):
 
 @pytest.fixture
 def expected_customers():
-    df = pd.read_csv("data/raw/medical_insurance.csv")
+    df = pd.read_csv("data/raw/medical_insurance.csv", dtype=CUSTOMER_DTYPES)
     return normalise_nulls(df)
 
 
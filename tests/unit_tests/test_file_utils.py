@@ -1,9 +1,18 @@
 import pytest
 import os
+import subprocess
+import sys
 import tempfile
 import pandas as pd
 from unittest.mock import patch
-from src.utils.file_utils import find_project_root, save_dataframe_to_csv
+from src.utils.file_utils import (
+    append_dataframe_to_csv,
+    find_project_root,
+    open_parquet_writer,
+    read_dataframe_from_parquet,
+    save_dataframe_to_csv,
+    save_dataframe_to_parquet,
+)
 
 
 # Classes create suites inside a test file
@@ -62,6 +71,24 @@ class TestFindProjectRoot:
                 result = find_project_root("pyproject.toml")
                 assert result == temp_dir
 
+    def test_root_paths_are_resolved_on_first_use(self):
+        """Test that importing the module loads no pandas or pyarrow."""
+        code = (
+            "import sys; import src.utils.file_utils as f; "
+            "print(sorted(m for m in ('pandas', 'pyarrow') "
+            "if m in sys.modules)); print(f.QUERY_PATH)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=find_project_root(),
+        )
+        loaded, query_path = result.stdout.splitlines()
+        assert loaded == "[]"
+        assert query_path == os.path.join(find_project_root(), "etl", "sql")
+
 
 class TestSaveDataframeToCSV:
     def test_save_dataframe_to_csv_success(self):
@@ -114,3 +141,76 @@ class TestSaveDataframeToCSV:
                 mock_print.assert_called_once_with(
                     f"Data saved to {expected_path}"
                 )
+
+
+class TestAppendDataframeToCSV:
+    def test_append_dataframe_to_csv_writes_header_once(self):
+        """Test that chunks are appended below a single header row."""
+        first = pd.DataFrame({"col1": [1, 2], "col2": ["a", "b"]})
+        second = pd.DataFrame({"col1": [3], "col2": ["c"]})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch("src.utils.file_utils.ROOT_DIR", temp_dir):
+                append_dataframe_to_csv(
+                    first, "test_output", "test.csv", overwrite=True
+                )
+                append_dataframe_to_csv(second, "test_output", "test.csv")
+
+                saved_df = pd.read_csv(
+                    os.path.join(temp_dir, "test_output", "test.csv")
+                )
+                pd.testing.assert_frame_equal(
+                    saved_df,
+                    pd.concat([first, second], ignore_index=True),
+                )
+
+
+class TestParquetStore:
+    def test_save_and_read_parquet_keeps_dtypes(self):
+        """Test that a Parquet round trip returns the same frame."""
+        df = pd.DataFrame(
+            {
+                "col1": pd.Series([1, 2], dtype="int16"),
+                "col2": ["a", "b"],
+                "col3": [0.5, 1.5],
+            }
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch("src.utils.file_utils.ROOT_DIR", temp_dir):
+                save_dataframe_to_parquet(df, "test_output", "test.parquet")
+                saved_df = read_dataframe_from_parquet(
+                    "test_output", "test.parquet"
+                )
+
+        pd.testing.assert_frame_equal(df, saved_df)
+
+    def test_read_parquet_selected_columns(self):
+        """Test that only the requested columns are read."""
+        df = pd.DataFrame({"col1": [1, 2], "col2": ["a", "b"]})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch("src.utils.file_utils.ROOT_DIR", temp_dir):
+                save_dataframe_to_parquet(df, "test_output", "test.parquet")
+                saved_df = read_dataframe_from_parquet(
+                    "test_output", "test.parquet", columns=["col2"]
+                )
+
+        assert list(saved_df.columns) == ["col2"]
+
+    def test_parquet_writer_casts_chunks_to_first_schema(self):
+        """Test that chunks are appended using the first chunk's types."""
+        first = pd.DataFrame({"col1": [1.5, 2.0]})
+        second = pd.DataFrame({"col1": [3]})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch("src.utils.file_utils.ROOT_DIR", temp_dir):
+                with open_parquet_writer("test_output", "test.parquet") as w:
+                    w(first)
+                    w(second)
+                saved_df = read_dataframe_from_parquet(
+                    "test_output", "test.parquet"
+                )
+
+        assert saved_df["col1"].tolist() == [1.5, 2.0, 3.0]
+        assert saved_df["col1"].dtype == "float64"
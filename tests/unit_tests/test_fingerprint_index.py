@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+import pytest
+import src.transform.transform_all as transform_all
+from src.transform.fingerprint_index import (
+    CHANGED,
+    NEW,
+    UNCHANGED,
+    BloomFilter,
+    FingerprintIndex,
+    hash_keys,
+    hash_rows,
+    select_new_or_changed,
+)
+
+
+@pytest.fixture
+def customers():
+    return pd.DataFrame(
+        {
+            "person_id": [1, 2, 3],
+            "income": [100.0, 200.0, 300.0],
+            "smoker": pd.Categorical(["Never", "Current", "Former"]),
+        }
+    )
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=10_000)
+    keys = hash_keys(np.arange(10_000))
+    bloom.add(keys)
+
+    assert bloom.might_contain(keys).all()
+    unseen = bloom.might_contain(hash_keys(np.arange(10_000, 30_000)))
+    assert unseen.mean() < 0.03
+
+
+def test_bloom_filter_save_and_load(tmp_path):
+    bloom = BloomFilter(capacity=100)
+    bloom.add(hash_keys([1, 2, 3]))
+    bloom.save(str(tmp_path / "bloom.npz"))
+
+    loaded = BloomFilter.load(str(tmp_path / "bloom.npz"))
+
+    assert loaded.might_contain(hash_keys([1, 2, 3])).all()
+    assert loaded.count == 3
+
+
+def test_index_finds_new_changed_and_unchanged_rows(tmp_path, customers):
+    path = str(tmp_path / "fingerprints.sqlite")
+    with FingerprintIndex(path) as index:
+        index.stage(customers["person_id"], hash_rows(customers))
+        index.commit()
+
+    updated = customers.copy()
+    updated.loc[1, "income"] = 250.0
+    updated.loc[3] = [4, 400.0, "Never"]
+
+    # Reopen, so the fingerprints and Bloom filter come from disk
+    with FingerprintIndex(path) as index:
+        status = index.lookup(updated["person_id"], hash_rows(updated))
+
+    assert status.tolist() == [UNCHANGED, CHANGED, UNCHANGED, NEW]
+
+
+def test_select_new_or_changed_stages_until_commit(tmp_path, customers):
+    with FingerprintIndex(str(tmp_path / "fp.sqlite")) as index:
+        selected, changed = select_new_or_changed(customers, index)
+        assert len(selected) == 3
+        assert len(index) == 0
+
+        index.commit()
+        selected, changed = select_new_or_changed(customers, index)
+
+    assert selected.empty
+    assert changed.size == 0
+
+
+def test_bloom_filter_rebuilt_when_missing(tmp_path, customers):
+    path = str(tmp_path / "fp.sqlite")
+    with FingerprintIndex(path) as index:
+        index.stage(customers["person_id"], hash_rows(customers))
+        index.commit()
+    (tmp_path / "fp.sqlite.bloom.npz").unlink()
+
+    with FingerprintIndex(path) as index:
+        status = index.lookup(customers["person_id"], hash_rows(customers))
+
+    assert (status == UNCHANGED).all()
+
+
+def test_clean_customers_incremental_skips_unchanged_rows(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(transform_all, "OUTPUT_DIR", str(tmp_path))
+    raw = pd.DataFrame(
+        {
+            "person_id": [1, 2, 3],
+            "income": [100.0, 200.0, 300.0],
+            "smoker": pd.Categorical(["Never", "Current", "Former"]),
+        }
+    )
+    new, merged, appendable = transform_all.clean_customers_incremental(
+        raw.copy()
+    )
+    assert len(new) == 3 and len(merged) == 3
+    assert not appendable
+    transform_all.produce_correlation_table(merged)
+
+    second = pd.concat(
+        [raw, raw.iloc[[0]].assign(person_id=4)], ignore_index=True
+    )
+    new, merged, appendable = transform_all.clean_customers_incremental(
+        second.copy()
+    )
+    assert new["person_id"].tolist() == [4]
+    assert sorted(merged["person_id"]) == [1, 2, 3, 4]
+    assert appendable
+
+    third = second.copy()
+    third.loc[0, "income"] = 150.0
+    new, merged, appendable = transform_all.clean_customers_incremental(
+        third.copy()
+    )
+    assert new["person_id"].tolist() == [1]
+    assert len(merged) == 4
+    assert merged.set_index("person_id").loc[1, "income"] == 150.0
+    assert not appendable
+
+
+def test_repeated_person_id_in_a_batch_keeps_the_last_row(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(transform_all, "OUTPUT_DIR", str(tmp_path))
+    raw = pd.DataFrame({"person_id": [1, 1, 2], "age": [30, 31, 40]})
+
+    outputs = [
+        transform_all.clean_customers_incremental(raw.copy())
+        for _ in range(3)
+    ]
+
+    new, merged, _ = outputs[0]
+    assert new[["person_id", "age"]].values.tolist() == [[1, 31], [2, 40]]
+    # Unchanged input: nothing new, the same customers every run
+    for new, merged, _ in outputs[1:]:
+        assert new.empty
+        assert merged[["person_id", "age"]].values.tolist() == [
+            [1, 31],
+            [2, 40],
+        ]
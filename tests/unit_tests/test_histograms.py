@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.transform.histograms import HistogramAccumulator, rebin
+
+
+@pytest.fixture
+def customers():
+    rng = np.random.default_rng(0)
+    n = 1000
+    return pd.DataFrame(
+        {
+            "age": rng.integers(18, 90, n),
+            "income": rng.uniform(0, 200_000, n),
+            "annual_medical_cost": rng.gamma(2, 2500, n),
+        }
+    )
+
+
+def test_histograms_match_numpy(customers):
+    histograms = HistogramAccumulator().update(customers).to_frame()
+
+    age = histograms[histograms["column"] == "age"]
+    assert age["bin_start"].iloc[0] == 18
+    assert age["bin_end"].iloc[-1] == 90
+    expected, _ = np.histogram(customers["age"], bins=np.arange(18, 91))
+    np.testing.assert_array_equal(age["count"], expected)
+
+    cost = histograms[histograms["column"] == "annual_medical_cost"]
+    edges = np.append(cost["bin_start"], cost["bin_end"].iloc[-1])
+    expected, _ = np.histogram(customers["annual_medical_cost"], bins=edges)
+    np.testing.assert_array_equal(cost["count"], expected)
+    assert cost["count"].sum() == len(customers)
+
+
+def test_merged_histograms_equal_one_histogram(customers):
+    # The second half covers a range the first does not
+    customers.loc[500:, "age"] += 20
+    merged = (
+        HistogramAccumulator()
+        .update(customers.iloc[:500])
+        .merge(HistogramAccumulator().update(customers.iloc[500:]))
+    )
+    chunked = HistogramAccumulator()
+    for start in range(0, len(customers), 300):
+        chunked.update(customers.iloc[start:start + 300])
+
+    expected = HistogramAccumulator().update(customers).to_frame()
+    pd.testing.assert_frame_equal(merged.to_frame(), expected)
+    pd.testing.assert_frame_equal(chunked.to_frame(), expected)
+
+
+def test_merge_rejects_other_bin_widths(customers):
+    with pytest.raises(ValueError):
+        HistogramAccumulator({"age": 1}).merge(
+            HistogramAccumulator({"age": 5})
+        )
+
+
+def test_missing_values_are_not_counted():
+    df = pd.DataFrame({"age": [20, np.nan, 21.5]})
+    histograms = HistogramAccumulator({"age": 1}).update(df).to_frame()
+
+    assert list(histograms["count"]) == [1, 1]
+    assert list(histograms["bin_start"]) == [20, 21]
+
+
+def test_for_columns_uses_the_columns_present():
+    histograms = HistogramAccumulator.for_columns(["person_id", "age"])
+
+    assert histograms.bin_widths == {"age": 1}
+    assert list(histograms.to_frame().columns) == [
+        "column",
+        "bin",
+        "bin_start",
+        "bin_end",
+        "count",
+    ]
+
+
+def test_rebin_merges_aligned_bins(customers):
+    histograms = HistogramAccumulator().update(customers).to_frame()
+
+    coarse = rebin(histograms, "age", factor=5)
+
+    assert list(coarse["bin_start"][:2]) == [15, 20]
+    expected, _ = np.histogram(customers["age"], bins=np.arange(15, 95, 5))
+    np.testing.assert_array_equal(coarse["count"], expected)
+
+
+def test_rebin_to_at_most_max_bins(customers):
+    histograms = HistogramAccumulator().update(customers).to_frame()
+
+    for max_bins in [1, 7, 20, 72, 500]:
+        coarse = rebin(histograms, "age", max_bins=max_bins)
+        assert len(coarse) <= max_bins
+        assert coarse["count"].sum() == len(customers)
+    assert len(rebin(histograms, "age", max_bins=500)) == 72
+
+    with pytest.raises(KeyError):
+        rebin(histograms, "bmi", factor=2)
+    with pytest.raises(ValueError):
+        rebin(histograms, "age", max_bins=0)
+    with pytest.raises(ValueError):
+        rebin(histograms, "age", factor=0)
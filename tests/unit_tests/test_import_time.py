@@ -0,0 +1,28 @@
+from benchmarks.bench_import import (
+    IMPORT_BUDGET_MS,
+    parse_importtime,
+    profile_import,
+)
+
+
+def test_parse_importtime_reads_cumulative_times_and_depth():
+    output = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       200 |        200 |   gettext",
+            "import time:      1500 |       1700 | argparse",
+        ]
+    )
+
+    assert parse_importtime(output) == [
+        ("gettext", 0.2, 1),
+        ("argparse", 1.7, 0),
+    ]
+
+
+def test_cli_import_is_within_budget_without_heavy_dependencies():
+    profile = profile_import("scripts.run_etl")
+
+    assert profile.heavy_imports() == []
+    assert "src.utils.logging_utils" not in profile.modules
+    assert profile.total_ms < IMPORT_BUDGET_MS
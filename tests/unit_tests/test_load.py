@@ -0,0 +1,46 @@
+import pandas as pd
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+from src.load.load import load_data
+from src.load.load_correlation import load_correlation_exec
+from src.load.versioned_load import content_run_id
+
+
+def test_load_correlation_exec_versions_by_content(mocker):
+    mocker.patch(
+        "src.load.load_correlation.load_db_config",
+        return_value={"target_database": {"dbname": "db"}},
+    )
+    mocker.patch(
+        "src.load.load_correlation.load_pool_config", return_value={}
+    )
+    mocker.patch("src.load.load_correlation.log_table_action")
+
+    @contextmanager
+    def fake_connection(details, **pool):
+        yield MagicMock()
+
+    mocker.patch(
+        "src.load.load_correlation.db_connection", side_effect=fake_connection
+    )
+    mock_load = mocker.patch("src.load.load_correlation.load_versioned")
+    table = pd.DataFrame(
+        {"feature": ["age", "bmi"], "age": [1.0, 0.2], "bmi": [0.2, 1.0]}
+    )
+
+    load_correlation_exec(table)
+    load_correlation_exec(table.copy())
+
+    run_ids = [call.kwargs["run_id"] for call in mock_load.call_args_list]
+    assert run_ids == [content_run_id(table)] * 2
+
+
+def test_load_data_without_correlation_table_loads_customers(mocker):
+    mock_correlation = mocker.patch("src.load.load.load_correlation")
+    mock_customers = mocker.patch("src.load.load.load_customers")
+    customers = pd.DataFrame({"person_id": [1, 2]})
+
+    load_data(None, customers)
+
+    mock_correlation.assert_not_called()
+    mock_customers.assert_called_once_with(customers)
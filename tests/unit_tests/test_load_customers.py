@@ -0,0 +1,203 @@
+import threading
+from contextlib import contextmanager
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+import sqlalchemy as sq
+from src.load.versioned_load import staging_table_name
+from src.load.load_customers import (
+    PartitionLoad,
+    TARGET_SCHEMA,
+    TARGET_TABLE,
+    load_customers_exec,
+    partition_customers,
+    summarise_partition_loads,
+    swap_in_staging,
+)
+
+STAGING_TABLE = f"{TARGET_TABLE}_staging_test"
+
+
+@pytest.fixture
+def customers():
+    return pd.DataFrame(
+        {
+            "person_id": [5, 1, 4, 2, 3, 6],
+            "region": pd.Categorical(
+                ["North", "South", "North", None, "East", "South"]
+            ),
+            "age": [30, 41, 52, 63, 24, 35],
+        }
+    )
+
+
+def test_partition_customers_by_column_keeps_missing_values(customers):
+    partitions = partition_customers(customers, "region")
+
+    assert [label for label, _ in partitions] == [
+        "region=East",
+        "region=North",
+        "region=South",
+        "region=nan",
+    ]
+    assert sum(len(part) for _, part in partitions) == len(customers)
+
+
+def test_partition_customers_by_person_id_range(customers):
+    partitions = partition_customers(customers, None, partitions=4)
+
+    assert [label for label, _ in partitions] == [
+        "person_id=1-2",
+        "person_id=3-4",
+        "person_id=5",
+        "person_id=6",
+    ]
+    ids = [list(part["person_id"]) for _, part in partitions]
+    assert ids == [[1, 2], [3, 4], [5], [6]]
+
+
+def test_partition_customers_rejects_invalid_count(customers):
+    with pytest.raises(ValueError, match="partitions must be positive"):
+        partition_customers(customers, None, partitions=0)
+
+
+def test_load_customers_exec_writes_each_partition_on_own_connection(
+    mocker, customers
+):
+    mocker.patch(
+        "src.load.load_customers.load_db_config",
+        return_value={"target_database": {"dbname": "db"}},
+    )
+    mocker.patch(
+        "src.load.load_customers.load_pool_config",
+        return_value={"pool_size": 2, "max_overflow": 0},
+    )
+    mocker.patch("src.load.load_customers.log_table_action")
+    mocker.patch(
+        "src.load.load_customers.staging_table_name",
+        return_value=STAGING_TABLE,
+    )
+    mock_to_sql = mocker.patch.object(pd.DataFrame, "to_sql")
+    connections = []
+
+    @contextmanager
+    def fake_connection(details, **pool):
+        connection = MagicMock()
+        connections.append(connection)
+        yield connection
+
+    mocker.patch(
+        "src.load.load_customers.db_connection", side_effect=fake_connection
+    )
+    writes = []
+    lock = threading.Lock()
+
+    def fake_copy(connection, part, table, schema, **kwargs):
+        assert table == STAGING_TABLE
+        with lock:
+            writes.append((connection, sorted(part["person_id"]), kwargs))
+
+    mocker.patch(
+        "src.load.load_customers.copy_dataframe_to_table",
+        side_effect=fake_copy,
+    )
+
+    swap = mocker.patch("src.load.load_customers.swap_in_staging")
+
+    loads = load_customers_exec(customers, "region")
+
+    # Staging table created once, empty, before the partitions are
+    # copied, and swapped in on its own connection after them
+    mock_to_sql.assert_called_once_with(
+        STAGING_TABLE,
+        connections[0],
+        schema=TARGET_SCHEMA,
+        if_exists="replace",
+        index=False,
+    )
+    connections[0].commit.assert_called_once()
+    assert len(connections) == 1 + len(loads) + 1 == 6
+    swap.assert_called_once_with(
+        connections[-1], TARGET_SCHEMA, STAGING_TABLE
+    )
+    assert len({id(connection) for connection, _, _ in writes}) == 4
+    assert sorted(ids for _, ids, _ in writes) == [[1, 6], [2], [3], [4, 5]]
+    assert all(kwargs["if_exists"] == "append" for _, _, kwargs in writes)
+    assert [load.rows for load in loads] == [1, 2, 2, 1]
+
+
+def test_failed_partition_leaves_the_customer_table_as_it_was(
+    mocker, customers
+):
+    mocker.patch(
+        "src.load.load_customers.load_db_config",
+        return_value={"target_database": {"dbname": "db"}},
+    )
+    mocker.patch(
+        "src.load.load_customers.load_pool_config",
+        return_value={"pool_size": 2, "max_overflow": 0},
+    )
+    mocker.patch("src.load.load_customers.log_table_action")
+    mocker.patch.object(pd.DataFrame, "to_sql")
+
+    @contextmanager
+    def fake_connection(details, **pool):
+        yield MagicMock()
+
+    mocker.patch(
+        "src.load.load_customers.db_connection", side_effect=fake_connection
+    )
+    mocker.patch(
+        "src.load.load_customers.copy_dataframe_to_table",
+        side_effect=ConnectionError("server closed the connection"),
+    )
+    swap = mocker.patch("src.load.load_customers.swap_in_staging")
+    drop = mocker.patch("src.load.load_customers.drop_staging")
+
+    with pytest.raises(Exception, match="Failed to load into database"):
+        load_customers_exec(customers, "region")
+
+    swap.assert_not_called()
+    drop.assert_called_once()
+    assert drop.call_args.args[2].startswith(f"{TARGET_TABLE}_staging_")
+
+
+def test_staging_table_names_are_unique_per_load():
+    names = {staging_table_name(TARGET_TABLE) for _ in range(3)}
+
+    assert len(names) == 3
+    # Within PostgreSQL's 63-character identifier limit
+    assert all(len(name) <= 63 for name in names)
+
+
+def test_swap_in_staging_replaces_the_table():
+    engine = sq.create_engine("sqlite://")
+    with engine.connect() as connection:
+        connection.exec_driver_sql(
+            f"ATTACH DATABASE ':memory:' AS {TARGET_SCHEMA}"
+        )
+        old = pd.DataFrame({"person_id": [1]})
+        new = pd.DataFrame({"person_id": [2, 3]})
+        old.to_sql(TARGET_TABLE, connection, schema=TARGET_SCHEMA)
+        new.to_sql(STAGING_TABLE, connection, schema=TARGET_SCHEMA)
+
+        swap_in_staging(connection, TARGET_SCHEMA, STAGING_TABLE)
+
+        loaded = pd.read_sql(
+            sq.text(f"SELECT person_id FROM {TARGET_SCHEMA}.{TARGET_TABLE}"),
+            connection,
+        )
+        inspector = sq.inspect(connection)
+        assert not inspector.has_table(STAGING_TABLE, schema=TARGET_SCHEMA)
+    engine.dispose()
+    assert loaded["person_id"].tolist() == [2, 3]
+
+
+def test_summarise_partition_loads_reports_rows_per_second():
+    loads = [PartitionLoad("a", 100, 0.5), PartitionLoad("b", 300, 1.0)]
+
+    summary = summarise_partition_loads(loads, 1.0)
+
+    assert [p["rows_per_s"] for p in summary["partitions"]] == [200, 300]
+    assert summary["rows"] == 400
+    assert summary["rows_per_s"] == 400
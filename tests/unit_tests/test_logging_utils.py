@@ -1,15 +1,31 @@
+import json
 import logging
+import logging.handlers
 import tempfile
+import threading
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+import pandas as pd
+import pytest
+
 from src.utils.logging_utils import (
     _ensure_log_directory,
     _create_formatter,
-    _create_handlers,
+    _create_file_handler,
+    _FileRouter,
+    _QueueHandler,
+    dropped_log_records,
+    flush_logs,
     setup_logger,
+    shutdown_logging,
     log_extract_success,
     log_load_success,
+    log_memory_usage,
+    track_stage,
+    get_stage_records,
+    reset_stage_records,
+    format_stage_summary,
 )
 
 
@@ -32,24 +48,25 @@ def test_create_formatter_returns_correct_format():
     assert "%(levelname)s" in fmt_str
 
 
-def test_create_handlers_returns_both_handlers():
+def test_create_file_handler_rotates_by_size_or_time():
     with tempfile.TemporaryDirectory() as temp_dir:
-        log_dir = Path(temp_dir)
-        file_handler, console_handler = _create_handlers(
-            log_dir, "test.log", logging.INFO
-        )
+        path = Path(temp_dir) / "test.log"
+        by_size = _create_file_handler(path, 1000, 3)
+        by_time = _create_file_handler(path, 1000, 3, when="midnight")
 
-        assert isinstance(file_handler, logging.FileHandler)
-        assert isinstance(console_handler, logging.StreamHandler)
-        assert file_handler.level == logging.INFO
-        assert console_handler.level == logging.INFO
+        assert isinstance(by_size, logging.handlers.RotatingFileHandler)
+        assert by_size.maxBytes == 1000
+        assert by_size.backupCount == 3
+        assert isinstance(
+            by_time, logging.handlers.TimedRotatingFileHandler
+        )
 
-        file_handler.close()
-        console_handler.close()
+        by_size.close()
+        by_time.close()
 
 
 @patch("src.utils.logging_utils.logging.getLogger")
-def test_setup_logger_creates_logger_with_handlers(mock_get_logger):
+def test_setup_logger_creates_logger_with_queue_handler(mock_get_logger):
     mock_logger = MagicMock()
     mock_logger.handlers = []
     mock_get_logger.return_value = mock_logger
@@ -58,7 +75,10 @@ def test_setup_logger_creates_logger_with_handlers(mock_get_logger):
         setup_logger("test", "test.log", base_path=temp_dir)
 
         mock_logger.setLevel.assert_called_once_with(logging.DEBUG)
-        assert mock_logger.addHandler.call_count == 2
+        mock_logger.addHandler.assert_called_once()
+        handler = mock_logger.addHandler.call_args.args[0]
+        assert isinstance(handler, _QueueHandler)
+        assert handler.log_path.endswith("test.log")
 
 
 @patch("src.utils.logging_utils.logging.getLogger")
@@ -72,15 +92,121 @@ def test_setup_logger_skips_handlers_if_already_exist(mock_get_logger):
     mock_logger.addHandler.assert_not_called()
 
 
-@patch("src.utils.logging_utils.logging.getLogger")
-def test_setup_logger_skips_handlers_if_already_exist(mock_get_logger):
-    mock_logger = MagicMock()
-    mock_logger.handlers = [MagicMock()]  # Already has handlers
-    mock_get_logger.return_value = mock_logger
+@pytest.fixture
+def log_backend(monkeypatch):
+    # A fresh backend, so the settings of the test are picked up
+    shutdown_logging()
+    yield monkeypatch
+    shutdown_logging()
 
-    setup_logger("test", "test.log")
 
-    mock_logger.addHandler.assert_not_called()
+def test_logging_is_written_by_a_background_thread(log_backend):
+    writers = set()
+    original_emit = logging.handlers.RotatingFileHandler.emit
+
+    def emit(handler, record):
+        writers.add(threading.current_thread().name)
+        original_emit(handler, record)
+
+    log_backend.setattr(logging.handlers.RotatingFileHandler, "emit", emit)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Logs go to <base_path>/../../logs, as for src/utils/*.py
+        logger = setup_logger(
+            "test_background",
+            "background.log",
+            base_path=Path(temp_dir) / "src" / "utils",
+        )
+        for i in range(100):
+            logger.info(f"chunk {i}")
+        flush_logs()
+
+        log_file = Path(temp_dir) / "logs" / "background.log"
+        lines = log_file.read_text()
+        assert lines.count("test_background - INFO - chunk") == 100
+        assert writers and threading.current_thread().name not in writers
+        logger.handlers.clear()
+
+
+def test_full_log_queue_drops_info_but_keeps_warnings(log_backend, capsys):
+    log_backend.setenv("LOG_QUEUE_SIZE", "1")
+    writing, writer_stuck = threading.Event(), threading.Event()
+    original_emit = _FileRouter.emit
+
+    def slow_emit(handler, record):
+        writing.set()
+        writer_stuck.wait(5)
+        original_emit(handler, record)
+
+    log_backend.setattr(_FileRouter, "emit", slow_emit)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        logger = setup_logger(
+            "test_full_queue",
+            "full.log",
+            base_path=Path(temp_dir) / "src" / "utils",
+        )
+        logger.info("chunk 0")
+        writing.wait(5)
+        # One record fits in the queue, the others are dropped
+        for i in range(1, 5):
+            logger.info(f"chunk {i}")
+        assert dropped_log_records() == 3
+
+        warning = threading.Thread(target=logger.warning, args=("slow",))
+        warning.start()
+        warning.join(0.2)
+        # Blocked until the writer makes room, not dropped
+        assert warning.is_alive()
+        writer_stuck.set()
+        warning.join(5)
+        flush_logs()
+
+        lines = (Path(temp_dir) / "logs" / "full.log").read_text()
+        assert "WARNING - slow" in lines
+        logger.handlers.clear()
+        shutdown_logging()
+    assert "log records were dropped" in capsys.readouterr().err
+
+
+def test_setup_logger_creates_log_directory_on_first_record(log_backend):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_directory = Path(temp_dir) / "logs"
+        logger = setup_logger(
+            "test_lazy_directory",
+            "lazy.log",
+            base_path=Path(temp_dir) / "src" / "utils",
+        )
+        assert not log_directory.exists()
+
+        logger.info("first record")
+        flush_logs()
+        assert (log_directory / "lazy.log").exists()
+        logger.handlers.clear()
+
+
+def test_logging_rotates_and_writes_json_lines(log_backend):
+    log_backend.setenv("LOG_MAX_BYTES", "2000")
+    log_backend.setenv("LOG_BACKUP_COUNT", "2")
+    log_backend.setenv("LOG_JSON", "true")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_backend.setattr(
+            "src.utils.logging_utils._log_directory",
+            lambda base_path=None: Path(temp_dir),
+        )
+        logger = setup_logger("test_rotation", "rotation.log")
+        for i in range(200):
+            logger.info(f"message {i}")
+        flush_logs()
+
+        rotated = sorted(p.name for p in Path(temp_dir).glob("rotation.*"))
+        assert rotated == ["rotation.log", "rotation.log.1", "rotation.log.2"]
+        json_lines = (Path(temp_dir) / "etl.jsonl").read_text().splitlines()
+        records = [json.loads(line) for line in json_lines]
+        # The JSON lines file is rotated too
+        assert 0 < len(records) < 200
+        assert records[-1]["message"] == "message 199"
+        assert records[-1]["logger"] == "test_rotation"
+        assert records[-1]["log_file"] == "rotation.log"
+        logger.handlers.clear()
 
 
 def test_log_extract_success_exceeds_expected_rate():
@@ -102,3 +228,134 @@ def test_log_load_success_logs_info_for_nonempty_data():
     # Should log 4 info messages (success, loaded, execution time, per-row time)
     assert mock_logger.info.call_count == 4
     mock_logger.warning.assert_not_called()
+
+
+def test_log_memory_usage_reports_megabytes():
+    mock_logger = MagicMock()
+    mock_df = MagicMock()
+    mock_df.memory_usage.return_value.sum.return_value = 2_500_000
+
+    log_memory_usage(mock_logger, "customers", mock_df)
+
+    mock_df.memory_usage.assert_called_once_with(deep=True)
+    mock_logger.info.assert_called_once_with(
+        "Memory usage for customers: 2.5 MB"
+    )
+
+
+def test_track_stage_context_manager_records_stage():
+    reset_stage_records()
+    df = pd.DataFrame({"a": range(10_000)})
+
+    with track_stage("stage_a", rows_in=df) as stage:
+        stage.set_output(df.head(4_000))
+
+    record = get_stage_records()[-1]
+    assert record["stage"] == "stage_a"
+    assert record["status"] == "ok"
+    assert record["rows_in"] == 10_000
+    assert record["rows_out"] == 4_000
+    assert record["duration_s"] >= 0
+    assert record["peak_rss_mb"] > 0
+    assert record["df_memory_mb"] > 0
+
+
+def test_track_stage_decorator_counts_rows_and_keeps_result():
+    reset_stage_records()
+
+    @track_stage("drop_first")
+    def drop_first(df):
+        return df.iloc[1:]
+
+    result = drop_first(pd.DataFrame({"a": [1, 2, 3]}))
+
+    assert len(result) == 2
+    record = get_stage_records()[-1]
+    assert (record["rows_in"], record["rows_out"]) == (3, 2)
+
+
+def test_track_stage_decorator_skips_memory_unless_asked():
+    reset_stage_records()
+
+    @track_stage("per_chunk")
+    def per_chunk(df):
+        return df
+
+    @track_stage("measured", memory=True)
+    def measured(df):
+        return df
+
+    with patch("src.utils.logging_utils.PeakRSS") as mock_rss, patch(
+        "src.utils.logging_utils._memory_mb"
+    ) as mock_memory:
+        per_chunk(pd.DataFrame({"a": [1, 2]}))
+        mock_rss.assert_not_called()
+        mock_memory.assert_not_called()
+    measured(pd.DataFrame({"a": [1, 2]}))
+
+    per_chunk_record, measured_record = get_stage_records()[-2:]
+    assert per_chunk_record["peak_rss_mb"] is None
+    assert per_chunk_record["df_memory_mb"] is None
+    assert measured_record["peak_rss_mb"] > 0
+    assert "-" in format_stage_summary(
+        [per_chunk_record]
+    ).splitlines()[-1].split()
+
+
+def test_track_stage_records_failure_and_reraises():
+    reset_stage_records()
+
+    with pytest.raises(ValueError):
+        with track_stage("broken", rows_in=5):
+            raise ValueError("boom")
+
+    record = get_stage_records()[-1]
+    assert record["status"] == "failed"
+    assert record["rows_per_s"] is None
+
+
+def test_format_stage_summary_adds_up_repeated_stages():
+    records = [
+        {
+            "stage": "chunk",
+            "status": "ok",
+            "rows_in": 100,
+            "rows_out": 90,
+            "duration_s": 0.5,
+            "peak_rss_mb": 10.0,
+        },
+        {
+            "stage": "chunk",
+            "status": "ok",
+            "rows_in": 50,
+            "rows_out": 50,
+            "duration_s": 0.25,
+            "peak_rss_mb": 12.0,
+        },
+    ]
+
+    lines = format_stage_summary(records).splitlines()
+
+    assert len(lines) == 3
+    assert lines[2].split() == [
+        "chunk", "2", "150", "0.750", "200", "12.0", "ok"
+    ]
+
+
+def test_logged_exceptions_keep_their_traceback(log_backend):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        logger = setup_logger(
+            "test_exception",
+            "exception.log",
+            base_path=Path(temp_dir) / "src" / "utils",
+        )
+        try:
+            raise ValueError("bad row")
+        except ValueError:
+            logger.exception("Cleaning %s failed", "chunk 3")
+        flush_logs()
+
+        text = (Path(temp_dir) / "logs" / "exception.log").read_text()
+        assert "ERROR - Cleaning chunk 3 failed" in text
+        assert "ValueError: bad row" in text
+        logger.handlers.clear()
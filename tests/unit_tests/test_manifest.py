@@ -0,0 +1,82 @@
+import os
+import pytest
+from src.utils.manifest import RunManifest, file_checksum, file_fingerprint
+
+
+@pytest.fixture
+def raw_file(tmp_path):
+    path = tmp_path / "raw" / "medical_insurance.csv"
+    path.parent.mkdir()
+    path.write_text("person_id,age\n1,30\n")
+    return str(path)
+
+
+def test_file_fingerprint_reuses_checksum_when_stat_matches(raw_file, mocker):
+    first = file_fingerprint(raw_file)
+    checksum = mocker.patch("src.utils.manifest.file_checksum")
+
+    second = file_fingerprint(raw_file, first)
+
+    checksum.assert_not_called()
+    assert second == first
+
+
+def test_diff_inputs_classifies_files(tmp_path, raw_file):
+    manifest = RunManifest(str(tmp_path / "manifest.json"), str(tmp_path))
+    assert manifest.diff_inputs([raw_file]).new == [raw_file]
+    manifest.record_run([raw_file], [])
+
+    other = tmp_path / "raw" / "medical_insurance_2.csv"
+    other.write_text("person_id,age\n2,40\n")
+    manifest = RunManifest(str(tmp_path / "manifest.json"), str(tmp_path))
+    changes = manifest.diff_inputs([raw_file, str(other)])
+
+    assert changes.unchanged == [raw_file]
+    assert changes.new == [str(other)]
+    assert changes.any
+
+
+def test_touched_file_is_unchanged_but_edited_file_is_changed(
+    tmp_path, raw_file
+):
+    manifest = RunManifest(str(tmp_path / "manifest.json"), str(tmp_path))
+    manifest.diff_inputs([raw_file])
+    manifest.record_run([raw_file], [])
+
+    os.utime(raw_file, ns=(1, 1))
+    assert not RunManifest(
+        str(tmp_path / "manifest.json"), str(tmp_path)
+    ).diff_inputs([raw_file]).any
+
+    with open(raw_file, "a") as f:
+        f.write("2,40\n")
+    changes = RunManifest(
+        str(tmp_path / "manifest.json"), str(tmp_path)
+    ).diff_inputs([raw_file])
+    assert changes.changed == [raw_file]
+
+
+def test_removed_files_are_reported(tmp_path, raw_file):
+    manifest = RunManifest(str(tmp_path / "manifest.json"), str(tmp_path))
+    manifest.record_run([raw_file], [])
+
+    changes = manifest.diff_inputs([])
+
+    assert changes.removed == [os.path.join("raw", "medical_insurance.csv")]
+
+
+def test_outputs_intact_notices_rewritten_output(tmp_path, raw_file):
+    output = tmp_path / "out.parquet"
+    output.write_text("v1")
+    manifest = RunManifest(str(tmp_path / "manifest.json"), str(tmp_path))
+    assert not manifest.outputs_intact()
+
+    manifest.record_run([raw_file], [str(output)])
+    assert manifest.outputs_intact()
+
+    output.write_text("v2 with more bytes")
+    assert not manifest.outputs_intact()
+
+
+def test_file_checksum_is_sha256(raw_file):
+    assert len(file_checksum(raw_file)) == 64
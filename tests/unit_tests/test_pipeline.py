@@ -0,0 +1,95 @@
+import threading
+import time
+import pytest
+from src.utils.pipeline import BackgroundWorker, prefetch
+
+
+def test_prefetch_yields_items_in_order():
+    assert list(prefetch(iter(range(10)), maxsize=3)) == list(range(10))
+
+
+def test_prefetch_runs_at_most_maxsize_ahead():
+    produced = []
+
+    def items():
+        for i in range(10):
+            produced.append(i)
+            yield i
+
+    consumer = prefetch(items(), maxsize=2)
+    assert next(consumer) == 0
+    time.sleep(0.2)
+
+    # One item taken, two buffered and one waiting to be put
+    assert len(produced) <= 4
+    consumer.close()
+
+
+def test_prefetch_reraises_producer_errors():
+    def items():
+        yield 1
+        raise ValueError("bad chunk")
+
+    consumer = prefetch(items())
+    assert next(consumer) == 1
+    with pytest.raises(ValueError, match="bad chunk"):
+        next(consumer)
+
+
+def test_prefetch_closes_producer_when_consumer_stops():
+    closed = threading.Event()
+
+    def items():
+        try:
+            for i in range(100):
+                yield i
+        finally:
+            closed.set()
+
+    for item in prefetch(items(), maxsize=1):
+        if item == 2:
+            break
+
+    assert closed.wait(1)
+
+
+def test_prefetch_rejects_invalid_maxsize():
+    with pytest.raises(ValueError, match="maxsize must be positive"):
+        list(prefetch([1], maxsize=0))
+
+
+def test_background_worker_runs_tasks_in_order_off_the_caller_thread():
+    results = []
+    threads = set()
+
+    def task(i):
+        time.sleep(0.01)
+        threads.add(threading.current_thread().name)
+        results.append(i)
+
+    with BackgroundWorker(maxsize=2, name="writer") as worker:
+        for i in range(5):
+            worker.submit(task, i)
+
+    assert results == [0, 1, 2, 3, 4]
+    assert threads == {"writer"}
+
+
+def test_background_worker_reraises_first_error_on_close():
+    def fail():
+        raise OSError("disk full")
+
+    worker = BackgroundWorker()
+    worker.submit(fail)
+    with pytest.raises(OSError, match="disk full"):
+        worker.close()
+
+
+def test_background_worker_keeps_the_callers_error():
+    ran = []
+
+    with pytest.raises(KeyError):
+        with BackgroundWorker() as worker:
+            worker.submit(time.sleep, 0.05)
+            worker.submit(ran.append, 1)
+            raise KeyError("caller failed")
@@ -0,0 +1,34 @@
+import pandas as pd
+from config.schema_config import (
+    CUSTOMER_DTYPES,
+    FLAG_COLUMNS,
+    apply_schema,
+)
+
+
+def test_schema_covers_every_insurance_column_once():
+    assert len(CUSTOMER_DTYPES) == 54
+    assert all(CUSTOMER_DTYPES[col] == "int8" for col in FLAG_COLUMNS)
+
+
+def test_apply_schema_casts_known_columns_and_logs(mocker):
+    mock_logger = mocker.patch("config.schema_config.logger")
+    df = pd.DataFrame(
+        {
+            "hypertension": [0, 1, 1],
+            "region": ["North", "South", "North"],
+            "bmi": [22.5, 31.0, 27.25],
+            "unknown": [1, 2, 3],
+        }
+    )
+
+    result = apply_schema(df)
+
+    assert result.dtypes.astype(str).to_dict() == {
+        "hypertension": "int8",
+        "region": "category",
+        "bmi": "float32",
+        "unknown": "int64",
+    }
+    mock_logger.info.assert_called_once()
+    assert "MB before schema" in mock_logger.info.call_args.args[0]
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from src.transform.seen_rows import SeenRows
+
+
+def test_add_new_keeps_first_occurrence_of_unseen_hashes():
+    with SeenRows() as seen:
+        first = seen.add_new(np.array([5, 3, 5, 9], dtype=np.uint64))
+        second = seen.add_new(np.array([9, 1, 1, 3], dtype=np.uint64))
+
+    assert first.tolist() == [True, True, False, True]
+    assert second.tolist() == [False, True, False, False]
+
+
+def test_hashes_spill_to_disk_beyond_the_memory_budget(tmp_path):
+    rng = np.random.default_rng(0)
+    hashes = rng.integers(0, 2**63, 10_000, dtype=np.uint64)
+    chunks = np.array_split(np.concatenate([hashes, hashes[:3000]]), 13)
+
+    with SeenRows(memory_rows=1000, spill_dir=str(tmp_path)) as seen:
+        kept = sum(int(seen.add_new(chunk).sum()) for chunk in chunks)
+        assert len(seen) == 10_000
+        assert len(seen._memory) < 1000
+        assert len(list(tmp_path.glob("seen_rows_*/run_*.npy"))) >= 9
+
+    assert kept == 10_000
+    # The runs are deleted on close
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_memory_rows_must_be_positive():
+    with pytest.raises(ValueError):
+        SeenRows(memory_rows=0)
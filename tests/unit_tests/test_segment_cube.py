@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.transform.segment_cube import (
+    TOTAL,
+    Z_95,
+    SegmentCube,
+    add_segments,
+    segment_means,
+)
+
+
+@pytest.fixture
+def customers():
+    rng = np.random.default_rng(0)
+    n = 500
+    return pd.DataFrame(
+        {
+            "age": rng.integers(18, 90, n),
+            "chronic_count": rng.integers(0, 7, n),
+            "smoker": rng.choice([0, 7, 30], n).astype("int8"),
+            "region": rng.choice(["North", "South", "East"], n),
+            "hypertension": rng.integers(0, 2, n),
+            "annual_medical_cost": rng.gamma(2, 2000, n),
+            "annual_premium": rng.gamma(2, 1500, n),
+        }
+    )
+
+
+def make_cube(customers):
+    return SegmentCube(
+        dimensions=[
+            "age_group",
+            "chronic_bucket",
+            "smoker",
+            "region",
+            "hypertension",
+        ]
+    ).update(customers)
+
+
+def test_cube_matches_groupby(customers):
+    cube = make_cube(customers).to_frame()
+
+    expected = customers.groupby("region")["annual_medical_cost"].agg(
+        ["count", "sum", "mean"]
+    )
+    rows = cube[cube["dimension"] == "region"].set_index("value")
+    assert list(rows.index) == ["East", "North", "South"]
+    np.testing.assert_array_equal(rows["count"], expected["count"])
+    np.testing.assert_allclose(
+        rows["annual_medical_cost_sum"], expected["sum"]
+    )
+    np.testing.assert_allclose(
+        rows["annual_medical_cost_mean"], expected["mean"]
+    )
+    np.testing.assert_allclose(
+        rows["annual_premium_sum_sq"],
+        (customers["annual_premium"] ** 2).groupby(customers["region"]).sum(),
+    )
+
+    total = cube[cube["dimension"] == TOTAL].iloc[0]
+    assert total["value"] == TOTAL
+    assert total["count"] == len(customers)
+
+
+def test_cube_derives_segments_and_skips_missing_buckets(customers):
+    cube = make_cube(customers).to_frame()
+
+    age_groups = cube[cube["dimension"] == "age_group"]
+    assert list(age_groups["value"]) == [
+        "<30",
+        "30-40",
+        "40-50",
+        "50-60",
+        "60-70",
+        "70+",
+    ]
+    assert age_groups["count"].sum() == len(customers)
+
+    buckets = cube[cube["dimension"] == "chronic_bucket"]
+    assert buckets["count"].sum() == (customers["chronic_count"] > 0).sum()
+    assert "age_group" not in customers.columns
+
+
+def test_merged_cubes_equal_one_cube(customers):
+    merged = make_cube(customers.iloc[:200]).merge(
+        make_cube(customers.iloc[200:])
+    )
+
+    pd.testing.assert_frame_equal(
+        merged.to_frame(), make_cube(customers).to_frame()
+    )
+
+
+def test_merge_rejects_other_dimensions(customers):
+    with pytest.raises(ValueError):
+        make_cube(customers).merge(
+            SegmentCube(dimensions=["region"]).update(customers)
+        )
+
+
+def test_missing_measures_are_skipped(customers):
+    customers.loc[:9, "annual_premium"] = np.nan
+    cube = make_cube(customers).to_frame()
+
+    total = cube[cube["dimension"] == TOTAL].iloc[0]
+    assert total["count"] == len(customers)
+    assert total["annual_premium_count"] == len(customers) - 10
+    assert total["annual_premium_mean"] == pytest.approx(
+        customers["annual_premium"].mean()
+    )
+
+
+def test_segment_means_have_normal_confidence_intervals(customers):
+    cube = make_cube(customers).to_frame()
+
+    means = segment_means(cube, "smoker", "annual_medical_cost")
+
+    grouped = customers.groupby("smoker")["annual_medical_cost"]
+    assert list(means["value"]) == ["0", "7", "30"]
+    np.testing.assert_allclose(means["mean"], grouped.mean())
+    np.testing.assert_allclose(means["ci"], Z_95 * grouped.sem())
+
+    with pytest.raises(KeyError):
+        segment_means(cube, "income", "annual_medical_cost")
+
+
+def test_add_segments_buckets_age_and_chronic_count():
+    customers = add_segments(
+        pd.DataFrame({"age": [29, 30, 75], "chronic_count": [0, 1, 6]})
+    )
+
+    assert list(customers["age_group"]) == ["<30", "30-40", "70+"]
+    assert customers["chronic_bucket"].isna().tolist() == [
+        True,
+        False,
+        False,
+    ]
+    assert customers["chronic_bucket"].iloc[2] == "5+"
+
+
+def test_cube_for_columns_uses_the_columns_present(customers):
+    cube = SegmentCube.for_columns(customers.columns)
+
+    assert cube.dimensions == [
+        "age_group",
+        "chronic_bucket",
+        "smoker",
+        "region",
+        "hypertension",
+    ]
+    assert cube.measures == ["annual_medical_cost", "annual_premium"]
+
+    ages_only = SegmentCube.for_columns(["person_id", "age"])
+    frame = ages_only.update(pd.DataFrame({"age": [20, 45]})).to_frame()
+    assert list(frame["dimension"]) == [TOTAL, "age_group", "age_group"]
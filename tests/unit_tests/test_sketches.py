@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.transform.sketches import HyperLogLog, TDigest
+
+
+def test_hyperloglog_estimates_distinct_count():
+    values = pd.Series(np.arange(50_000) % 20_000)
+
+    sketch = HyperLogLog().update(values)
+
+    assert sketch.count() == pytest.approx(20_000, rel=0.03)
+
+
+def test_hyperloglog_small_counts_are_exact_enough():
+    sketch = HyperLogLog().update(pd.Series(["a", "b", "b", None, "c"]))
+
+    assert sketch.count() == 3
+
+
+def test_hyperloglog_merge_counts_the_union():
+    left = HyperLogLog().update(pd.Series(np.arange(0, 30_000)))
+    right = HyperLogLog().update(pd.Series(np.arange(20_000, 50_000)))
+
+    merged = left.merge(right)
+
+    assert merged.count() == pytest.approx(50_000, rel=0.03)
+
+
+def test_hyperloglog_treats_int_and_float_alike():
+    ints = HyperLogLog().update(pd.Series([1, 2, 3]))
+    floats = HyperLogLog().update(pd.Series([1.0, 2.0, 3.0]))
+
+    assert (ints.registers == floats.registers).all()
+
+
+def test_hyperloglog_merge_rejects_other_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(14))
+
+
+def test_tdigest_quantiles_close_to_exact():
+    values = np.random.default_rng(0).normal(50, 10, 100_000)
+    digest = TDigest()
+    for chunk in np.array_split(values, 10):
+        digest.update(chunk)
+
+    assert digest.count == 100_000
+    assert digest.min == values.min()
+    assert digest.max == values.max()
+    for q in [0.01, 0.25, 0.5, 0.75, 0.99]:
+        estimate = digest.quantile(q)
+        assert (values <= estimate).mean() == pytest.approx(q, abs=0.005)
+
+
+def test_tdigest_merge_matches_single_digest():
+    values = np.random.default_rng(1).exponential(1.0, 20_000)
+    merged = TDigest().update(values[:5_000]).merge(
+        TDigest().update(values[5_000:])
+    )
+
+    assert merged.count == 20_000
+    assert merged.quantile(0.5) == pytest.approx(np.median(values), rel=0.02)
+
+
+def test_tdigest_ignores_missing_and_handles_empty():
+    digest = TDigest()
+    assert np.isnan(digest.quantile(0.5))
+
+    digest.update([np.nan, 4.0])
+
+    assert digest.count == 1
+    assert digest.quantile(0.5) == 4.0
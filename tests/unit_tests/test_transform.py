@@ -1,6 +1,8 @@
 import pandas as pd
 import pytest
+import src.transform.transform_all as transform_all
 from src.transform.transform import transform_data
+from src.utils.pipeline import BackgroundWorker
 
 
 @pytest.fixture
@@ -35,3 +37,21 @@ def test_transform_data_pipeline_integration(sample_unclean_transactions):
     # Assert correlation table DataFrame
     assert isinstance(correlation_table, pd.DataFrame)
     assert not correlation_table.empty
+
+
+def test_queued_save_is_only_logged_once_written(mocker):
+    mock_logger = mocker.patch.object(transform_all, "logger")
+    mocker.patch.object(
+        transform_all,
+        "save_dataframe_to_parquet",
+        side_effect=OSError("disk full"),
+    )
+    customers = pd.DataFrame({"person_id": [1, 2], "age": [30, 40]})
+
+    writer = BackgroundWorker(name="test_writer")
+    transform_all.clean_customers(customers, writer=writer)
+    with pytest.raises(OSError):
+        writer.close()
+
+    messages = [call.args[0] for call in mock_logger.info.call_args_list]
+    assert not any("saved to Parquet" in message for message in messages)
@@ -0,0 +1,103 @@
+import json
+import os
+import pickle
+import pandas as pd
+import pytest
+from src.transform import validate
+from src.transform.seen_rows import SeenRows
+from src.transform.validate import CsvProfile, analyze_csv, profile_csv
+from src.utils.file_utils import ROOT_DIR
+
+
+@pytest.fixture
+def sample_csv(tmp_path):
+    path = tmp_path / "customers.csv"
+    pd.DataFrame(
+        {
+            "id": [1, 2, 2, 3, 4],
+            "region": ["North", "South", "South", None, "East"],
+            "signup_date": [
+                "2024-01-01",
+                "2024-02-30",
+                "2024-02-30",
+                "2024-03-01",
+                None,
+            ],
+        }
+    ).to_csv(path, index=False)
+    return path
+
+
+def test_profile_csv_in_chunks(sample_csv):
+    profile = profile_csv(str(sample_csv), chunk_size=2).to_dict()
+
+    assert profile["rows"] == 5
+    assert profile["columns"] == 3
+    assert profile["duplicate_rows"] == 1
+    assert profile["column_profiles"]["region"]["nulls"] == 1
+    assert profile["column_profiles"]["region"]["distinct_estimate"] == 3
+    assert profile["column_profiles"]["region"]["min"] == "East"
+    assert profile["column_profiles"]["id"]["min"] == 1
+    assert profile["column_profiles"]["id"]["max"] == 4
+    assert profile["date_checks"]["signup_date"] == {
+        "valid": 2,
+        "invalid": 3,
+    }
+
+
+def test_merged_profiles_count_duplicates_across_files():
+    first = CsvProfile().update(pd.DataFrame({"a": [1, 2]}))
+    second = CsvProfile().update(pd.DataFrame({"a": [2, 3]}))
+
+    merged = CsvProfile().merge(first).merge(second)
+
+    assert merged.rows == 4
+    assert merged.duplicates == 1
+    assert merged.duplicates_approximate
+    assert not first.duplicates_approximate
+
+
+def test_profile_counts_duplicates_exactly_once_hashes_spill(
+    sample_csv, mocker
+):
+    mocker.patch(
+        "src.transform.validate.SeenRows",
+        side_effect=lambda: SeenRows(memory_rows=2),
+    )
+
+    profile = profile_csv(str(sample_csv), chunk_size=1)
+
+    assert profile.duplicates == 1
+    # The hashes are freed, so the profile is small to send back
+    assert len(profile._seen_rows) == 0
+    assert len(pickle.dumps(profile)) < 100_000
+
+
+def test_reports_are_written_to_the_project_root():
+    assert os.path.dirname(validate.LOG_FILE) == ROOT_DIR
+    assert os.path.dirname(validate.JSON_LOG_FILE) == ROOT_DIR
+
+
+def test_analyze_csv_reports_unreadable_file(tmp_path):
+    report = analyze_csv(str(tmp_path / "missing.csv"))
+
+    assert "ERROR: Could not read file" in report
+
+
+def test_main_writes_text_and_json_reports(
+    sample_csv, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(validate, "LOG_FILE", str(tmp_path / "log.txt"))
+    monkeypatch.setattr(
+        validate, "JSON_LOG_FILE", str(tmp_path / "log.json")
+    )
+    pd.read_csv(sample_csv).to_csv(tmp_path / "copy.csv", index=False)
+
+    validate.main(str(tmp_path), chunk_size=2, max_workers=2)
+
+    text = (tmp_path / "log.txt").read_text()
+    assert "Duplicate rows: 1" in text
+    assert "File: ALL FILES" in text
+    report = json.loads((tmp_path / "log.json").read_text())
+    assert len(report["files"]) == 2
+    assert report["all_files"]["duplicate_rows"] == 6
@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import pytest
+import sqlalchemy as sq
+from src.load.versioned_load import content_run_id, load_versioned
+
+SCHEMA = "all_2509"
+TABLE = "rp_capstone_load"
+
+
+@pytest.fixture
+def connection():
+    # SQLite with an attached database stands in for the target schema
+    engine = sq.create_engine("sqlite://")
+    with engine.connect() as connection:
+        connection.exec_driver_sql(f"ATTACH DATABASE ':memory:' AS {SCHEMA}")
+        yield connection
+    engine.dispose()
+
+
+def correlation(age_income: float) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "feature": ["age", "income"],
+            "age": [1.0, age_income],
+            "income": [age_income, 1.0],
+        }
+    )
+
+
+def load(connection, df, run_id, minutes, **kwargs):
+    loaded_at = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(
+        minutes=minutes
+    )
+    return load_versioned(
+        connection,
+        df,
+        TABLE,
+        SCHEMA,
+        run_id=run_id,
+        loaded_at=loaded_at,
+        bulk_copy=False,
+        **kwargs,
+    )
+
+
+def read(connection, sql):
+    return pd.read_sql(sq.text(sql), connection)
+
+
+def test_current_view_shows_newest_version(connection):
+    load(connection, correlation(0.1), "run1", 0)
+    load(connection, correlation(0.2), "run2", 1)
+
+    current = read(connection, f"SELECT * FROM {SCHEMA}.{TABLE}_current")
+    versions = read(
+        connection, f"SELECT DISTINCT run_id FROM {SCHEMA}.{TABLE}"
+    )
+
+    pd.testing.assert_frame_equal(current, correlation(0.2))
+    assert sorted(versions["run_id"]) == ["run1", "run2"]
+    assert sq.inspect(connection).get_table_names(schema=SCHEMA) == [TABLE]
+
+
+def test_reloading_a_run_replaces_it(connection):
+    load(connection, correlation(0.1), "run1", 0)
+    load(connection, correlation(0.3), "run1", 1)
+
+    table = read(connection, f"SELECT * FROM {SCHEMA}.{TABLE}")
+
+    assert len(table) == 2
+    assert set(table["income"]) == {0.3, 1.0}
+
+
+def test_old_versions_are_pruned(connection):
+    for i in range(4):
+        load(connection, correlation(i / 10), f"run{i}", i, keep_versions=2)
+
+    versions = read(
+        connection, f"SELECT DISTINCT run_id FROM {SCHEMA}.{TABLE}"
+    )
+
+    assert sorted(versions["run_id"]) == ["run2", "run3"]
+
+
+def test_changed_columns_swap_in_a_new_table(connection):
+    load(connection, correlation(0.1), "run1", 0)
+    wider = correlation(0.2).assign(bmi=[0.5, 0.4])
+
+    load(connection, wider, "run2", 1)
+
+    current = read(connection, f"SELECT * FROM {SCHEMA}.{TABLE}_current")
+    versions = read(
+        connection, f"SELECT DISTINCT run_id FROM {SCHEMA}.{TABLE}"
+    )
+    pd.testing.assert_frame_equal(current, wider)
+    assert list(versions["run_id"]) == ["run2"]
+
+
+def test_legacy_table_without_versions_is_replaced(connection):
+    correlation(0.1).to_sql(TABLE, connection, schema=SCHEMA, index=False)
+    correlation(0.1).to_sql(
+        TABLE, connection, schema=SCHEMA, index=False, if_exists="append"
+    )
+
+    load(connection, correlation(0.2), "run1", 0)
+
+    table = read(connection, f"SELECT * FROM {SCHEMA}.{TABLE}")
+    assert len(table) == 2
+    assert set(table["run_id"]) == {"run1"}
+
+
+def test_indexes_are_kept_across_merges_and_swaps(connection):
+    indexes = {"load_feature": ["feature"]}
+
+    def index_names():
+        return [
+            index["name"]
+            for index in sq.inspect(connection).get_indexes(
+                TABLE, schema=SCHEMA
+            )
+        ]
+
+    load(connection, correlation(0.1), "run1", 0, indexes=indexes)
+    load(connection, correlation(0.2), "run2", 1, indexes=indexes)
+    assert index_names() == ["load_feature"]
+
+    wider = correlation(0.3).assign(bmi=[0.5, 0.4])
+    load(connection, wider, "run3", 2, indexes=indexes)
+    assert index_names() == ["load_feature"]
+
+
+def test_content_run_id_makes_reloads_replace_their_version(connection):
+    assert content_run_id(correlation(0.1)) == content_run_id(
+        correlation(0.1)
+    )
+    assert content_run_id(correlation(0.1)) != content_run_id(
+        correlation(0.2)
+    )
+
+    for minutes, value in enumerate([0.1, 0.2, 0.1]):
+        df = correlation(value)
+        load(connection, df, content_run_id(df), minutes)
+
+    table = read(connection, f"SELECT * FROM {SCHEMA}.{TABLE}")
+    current = read(connection, f"SELECT * FROM {SCHEMA}.{TABLE}_current")
+    assert table["run_id"].nunique() == 2
+    assert len(table) == 4
+    pd.testing.assert_frame_equal(current, correlation(0.1))
+
+
+def test_reserved_columns_are_rejected(connection):
+    with pytest.raises(ValueError, match="reserved for versioning"):
+        load(connection, correlation(0.1).assign(run_id="x"), "run1", 0)
+
+
+def test_failed_load_drops_its_staging_table(connection, mocker):
+    load(connection, correlation(0.1), "run1", 0)
+    mocker.patch(
+        "src.load.versioned_load.create_current_view",
+        side_effect=RuntimeError("view failed"),
+    )
+
+    with pytest.raises(RuntimeError):
+        load(connection, correlation(0.2), "run2", 1)
+
+    assert sq.inspect(connection).get_table_names(schema=SCHEMA) == [TABLE]
+    versions = read(
+        connection, f"SELECT DISTINCT run_id FROM {SCHEMA}.{TABLE}"
+    )
+    assert list(versions["run_id"]) == ["run1"]